@@ -29,7 +29,7 @@ class MediaIndex(object):
 
         # preload indexes for internal wems
         bankname = nchunk.get_root().get_filename()
-        nsids = nchunk.finds(type='sid')
+        nsids = nchunk.select('pLoadedMedia/*/@sid')
         for nsid in nsids:
             sid = nsid.value()
             attrs = nsid.get_parent().get_attrs()
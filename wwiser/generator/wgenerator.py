@@ -238,7 +238,7 @@ class Generator(object):
                     self._globalsettings.load(nchunk)
 
                 elif chunkname == 'HircChunk':
-                    items = bank.find(name='listLoadedItem')
+                    items = bank.select1('HircChunk/listLoadedItem')
                     if not items: # media-only banks don't have items
                         continue
 
@@ -316,7 +316,7 @@ class Generator(object):
             nodes_unnamed.append(item)
 
     def _write_bank(self, bank):
-        items = bank.find(name='listLoadedItem')
+        items = bank.select1('HircChunk/listLoadedItem')
         if not items:
             return
 
@@ -157,6 +157,14 @@ _LANGUAGE_SHORTNAMES = {
 
 _LANGUAGES_ORDER = list(_LANGUAGE_SHORTNAMES.keys())
 
+# known name of a bank's lang value, or None
+def get_lang_name(version, lang_value):
+    if version <= _LANG_IDS_OLD: #set of values
+        return _LANGUAGE_IDS.get(lang_value)
+    else: #set of hashed names
+        # typical values but languages can be anything (redefined in project options)
+        return _LANGUAGE_HASHNAMES.get(lang_value)
+
 class Lang(object):
     def __init__(self, node):
         self._node = node
@@ -172,13 +180,9 @@ class Lang(object):
         version = nroot.get_version()
 
         lang_value = nlangid.value()
-        if version <= _LANG_IDS_OLD: #set of values
-            lang_name = _LANGUAGE_IDS.get(lang_value)
-        else: #set of hashed names
-            # typical values but languages can be anything (redefined in project options)
-            lang_name = _LANGUAGE_HASHNAMES.get(lang_value)
-            if not lang_name: #try loaded names (ex. Xenoblade DE uses "en" and "jp")
-                lang_name = nlangid.get_attr('hashname')
+        lang_name = get_lang_name(version, lang_value)
+        if not lang_name and version > _LANG_IDS_OLD: #try loaded names (ex. Xenoblade DE uses "en" and "jp")
+            lang_name = nlangid.get_attr('hashname')
 
         if not lang_name:
             lang_name = "%s" % (lang_value)
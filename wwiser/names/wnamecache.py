@@ -0,0 +1,86 @@
+import logging, os, sys, hashlib, marshal, zlib
+from .. import wversion
+from ..parser import wcache
+
+# Stores names parsed from companion files (SoundbanksInfo.xml/.json, (bankname).txt/.xml/.json,
+# Wwise_IDs.h) in a folder, so later runs load them at once rather than parsing big files again.
+# There is one entry per file path holding the list of rows to add (see Names._parse_rows), used
+# while file size + mtime + wwiser version don't change. Since entries are replaced when files
+# change there isn't much to clean up, unlike bank cache.
+
+DEFAULT_DIR = wcache.DEFAULT_DIR #shared folder, different entries
+CACHE_MAGIC = b'WWNCACH1'
+CACHE_EXT = '.wwncache'
+
+
+class NameCache(object):
+    def __init__(self, path=None):
+        if not path or path == '*':
+            path = os.path.join(os.path.dirname(sys.argv[0]), DEFAULT_DIR)
+        self._path = path
+        self._rebuild = False
+
+        # marshal format may change between python versions
+        version = '%s/%s/%s' % (wversion.WWISER_VERSION, sys.version_info[0:2], marshal.version)
+        self._version = version
+
+    # ignore existing entries (files are parsed and saved again)
+    def set_rebuild(self, flag):
+        self._rebuild = flag
+
+    # file state, to detect changes
+    def get_key(self, filename):
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+        return (os.path.realpath(filename), stat.st_size, stat.st_mtime_ns, self._version)
+
+    def _get_filename(self, key):
+        name = hashlib.sha1(key[0].encode('utf-8', 'surrogateescape')).hexdigest()
+        return os.path.join(self._path, name + CACHE_EXT)
+
+    # Returns file's rows, or None if not found or outdated.
+    def load(self, key):
+        if self._rebuild or not key:
+            return None
+
+        filename = self._get_filename(key)
+        try:
+            with open(filename, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        try:
+            if data[0:len(CACHE_MAGIC)] != CACHE_MAGIC:
+                raise ValueError("wrong magic")
+            entry_key, rows = marshal.loads(zlib.decompress(data[len(CACHE_MAGIC):]))
+        except (ValueError, EOFError, TypeError, zlib.error) as e:
+            logging.info("cache: ignored bad entry %s (%s)", filename, e)
+            return None
+
+        if tuple(entry_key) != key:
+            return None
+        return rows
+
+    def save(self, key, rows):
+        if not key:
+            return
+
+        try:
+            data = marshal.dumps((key, rows))
+        except ValueError as e:
+            logging.debug("cache: can't save names (%s)", e)
+            return
+
+        try:
+            os.makedirs(self._path, exist_ok=True)
+            filename = self._get_filename(key)
+            tempname = '%s.%i.tmp' % (filename, os.getpid())
+            with open(tempname, 'wb') as f:
+                f.write(CACHE_MAGIC)
+                f.write(zlib.compress(data, 1))
+            os.replace(tempname, filename)
+        except OSError as e:
+            logging.info("cache: can't save names for %s (%s)", key[0], e)
@@ -0,0 +1,169 @@
+import logging, os, os.path, sys, mmap, array, bisect, struct
+from .wnamerow import NameRow
+from . import wsqlite
+
+# wwnames.wwidx name index handler
+# Read-only alternative to wwnames.db3 for huge name lists, where opening the DB and doing
+# per-id queries gets slow. File is memory-mapped as-is, and ids are found with a binary search
+# over the sorted id table, so opening doesn't depend on list size. Made from wwnames.db3/txt
+# (see wnames.build_index).
+#
+# Format (little endian):
+# - header: magic + u32 count + u32 reserved
+# - u32 ids[count]: sorted
+# - u32 offsets[count + 1]: start of each name in string data (last is the end)
+# - string data: utf-8 names
+
+INDEX_MAGIC = b'WWNIDX01'
+INDEX_EXT = '.wwidx'
+DEFAULT_FILENAME = 'wwnames' + INDEX_EXT
+_HEADER = struct.Struct('<8sII')
+
+
+# finds name file in work dir or program folder
+def get_path(filename):
+    return wsqlite.get_path(filename, DEFAULT_FILENAME)
+
+# index files are used when set or, by default, when one exists but not a wwnames.db3 (that
+# may have newer names, ex. saved with -sd)
+def is_index(filename, db_path=None):
+    if filename:
+        return filename.lower().endswith(INDEX_EXT)
+    return not db_path and get_path(None) is not None
+
+
+class NameIndexHandler(object):
+    def __init__(self):
+        self._mm = None
+        self._ids = None
+        self._offsets = None
+        self._names_start = 0
+        self._count = 0
+
+    def is_open(self):
+        return self._mm is not None
+
+    def open(self, filename):
+        path = get_path(filename)
+        if not path:
+            logging.info("names: couldn't find %s name file", filename or DEFAULT_FILENAME)
+            return
+        logging.info("names: loading %s", path)
+
+        try:
+            with open(path, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e: #ValueError: empty file
+            logging.info("names: can't open %s (%s)", path, e)
+            return
+
+        size = len(mm)
+        magic, count = None, 0
+        if size >= _HEADER.size:
+            magic, count, _ = _HEADER.unpack_from(mm, 0)
+        ids_start = _HEADER.size
+        offsets_start = ids_start + count * 4
+        names_start = offsets_start + (count + 1) * 4
+        if magic != INDEX_MAGIC or size < names_start:
+            logging.info("names: ignored bad index %s", path)
+            mm.close()
+            return
+
+        self._mm = mm
+        self._count = count
+        self._names_start = names_start
+        self._ids = self._get_table(ids_start, count)
+        self._offsets = self._get_table(offsets_start, count + 1)
+
+    # u32 table as a sequence, mapped directly when possible
+    def _get_table(self, offset, count):
+        if sys.byteorder == 'little':
+            return memoryview(self._mm)[offset:offset + count * 4].cast('I')
+        table = array.array('I', self._mm[offset:offset + count * 4])
+        table.byteswap()
+        return table
+
+    def close(self):
+        if not self._mm:
+            return
+        # views must be released before closing
+        for table in (self._ids, self._offsets):
+            if isinstance(table, memoryview):
+                table.release()
+        self._ids = None
+        self._offsets = None
+        self._mm.close()
+        self._mm = None
+
+    def _to_namerow(self, index):
+        start = self._names_start + self._offsets[index]
+        end = self._names_start + self._offsets[index + 1]
+        name = self._mm[start:end].decode('utf-8')
+        return NameRow(self._ids[index], hashname=name)
+
+    def select_by_id(self, id):
+        if not self._mm:
+            return None
+        index = bisect.bisect_left(self._ids, id)
+        if index < self._count and self._ids[index] == id:
+            return self._to_namerow(index)
+        return None
+
+    # close id per FNV (see SqliteHandler), lowest in range
+    def select_by_id_fuzzy(self, id):
+        if not self._mm:
+            return None
+        id = id & 0xFFFFFF00
+        index = bisect.bisect_left(self._ids, id)
+        if index < self._count and self._ids[index] < id + 256:
+            return self._to_namerow(index)
+        return None
+
+    # same as SqliteHandler's
+    def select_by_ids(self, ids):
+        namerows = {}
+        for id in ids:
+            namerow = self.select_by_id(id)
+            if namerow:
+                namerows[id] = namerow
+        return namerows
+
+    def select_by_ids_fuzzy(self, ids):
+        namerows = {}
+        for id in ids:
+            id_fz = id & 0xFFFFFF00
+            if id_fz in namerows:
+                continue
+            namerow = self.select_by_id_fuzzy(id_fz)
+            if namerow:
+                namerows[id_fz] = namerow
+        return namerows
+
+
+# Writes an index file from (id, name) rows. For repeated ids first name is kept.
+def save_index(filename, rows):
+    names = {}
+    for id, name in rows:
+        if not name or id in names or not 0 <= id <= 0xFFFFFFFF:
+            continue
+        names[id] = name.encode('utf-8')
+
+    ids = array.array('I', sorted(names))
+    offsets = array.array('I', [0])
+    strings = bytearray()
+    for id in ids:
+        strings += names[id]
+        offsets.append(len(strings))
+    if sys.byteorder != 'little':
+        ids.byteswap()
+        offsets.byteswap()
+
+    tempname = filename + '.tmp'
+    with open(tempname, 'wb') as f:
+        f.write(_HEADER.pack(INDEX_MAGIC, len(ids), 0))
+        f.write(ids.tobytes())
+        f.write(offsets.tobytes())
+        f.write(strings)
+    os.replace(tempname, filename)
+
+    logging.info("names: saved %i names to %s", len(ids), filename)
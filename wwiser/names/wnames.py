@@ -1,9 +1,11 @@
-import logging, re, os, os.path, sys
+import logging, re, os, os.path, sys, itertools
 from datetime import datetime
 
 from .. import wfnv
 from ..parser import wdefs
+from . import wsqlite
 from .wsqlite import SqliteHandler
+from . import wnameindex
 from .wnamerow import NameRow
 from . import wnconfig
 from . import wnamedumper
@@ -33,6 +35,7 @@ class Names(object):
     ONREPEAT_BEST = 4 #compare caps and pick
     EMPTY_BANKTYPE = ''
     EMPTY_BANKLANG = 0
+    LST_CHUNK_LINES = 20000 #wwnames.txt lines parsed at once (per process)
 
 
     def __init__(self):
@@ -41,13 +44,27 @@ class Names(object):
         self._names = {}
         self._names_fuzzy = {}
         self._db = None
+        self._db_rows = {} #prefetched db results (id > row or None)
+        self._db_rows_fuzzy = {}
         self._loaded_wwnames = {}
         self._current_bankpaths = {} #existing banks info, in the form of (bank, localized) = path
         self._missing = {} # [hashtype] = {(bank, localized)} = [ids]
         self._fnv = wfnv.Fnv()
+        self._jobs = 1
+        self._cache = None #wnamecache.NameCache
         # flags
         self._cfg = wnconfig.Config()
 
+    # parse big wwnames.txt in N processes
+    def set_jobs(self, jobs):
+        if not jobs or jobs < 1:
+            jobs = 1
+        self._jobs = jobs
+
+    # load/save parsed companion files from a wnamecache.NameCache
+    def set_cache(self, cache):
+        self._cache = cache
+
     def set_gamename(self, gamename):
         self._gamename = gamename #path
 
@@ -185,7 +202,7 @@ class Names(object):
 
         # on db (add to names for easier access and saving list of wwnames)
         # when using db always set extended hash to allow bus names (and maybe guidnames?)
-        row_db = self._db.select_by_id(id)
+        row_db = self._select_db(id)
         if row_db:
             row = self._add_name(id, row_db.hashname, source=NameRow.NAME_SOURCE_EXTRA, exhash=True)
             if row:
@@ -195,7 +212,7 @@ class Names(object):
         # on db with a close ID
         row_df = None
         if not self._cfg.disable_fuzzy:
-            row_df = self._db.select_by_id_fuzzy(id)
+            row_df = self._select_db_fuzzy(id)
         if row_df and row_df.hashname:
             hashname_uf = self._fnv.unfuzzy_hashname(id, row_df.hashname)
             row = self._add_name(id, hashname_uf, source=NameRow.NAME_SOURCE_EXTRA, exhash=True)
@@ -205,12 +222,52 @@ class Names(object):
 
         return None
 
+    def _select_db(self, id):
+        if id in self._db_rows:
+            return self._db_rows[id]
+        return self._db.select_by_id(id)
+
+    def _select_db_fuzzy(self, id):
+        id_fz = id & 0xFFFFFF00
+        if id_fz in self._db_rows_fuzzy:
+            return self._db_rows_fuzzy[id_fz]
+        return self._db.select_by_id_fuzzy(id)
+
+    # Resolves ids in banks against the db in a few queries, since single queries (per id, when
+    # fields ask for names) are slow with many ids. Results are kept separately from names, as
+    # they are only used when other lists don't have the id (see get_namerow).
+    def _prefetch_db(self, banks):
+        if not self._db or not self._db.is_open():
+            return
+
+        ids = set()
+        for bank in banks:
+            ids.update(bank.get_root().get_field_ids())
+        ids = [id for id in ids if id and id != -1 and id not in self._names]
+        if not ids:
+            return
+
+        rows = self._db.select_by_ids(ids)
+        for id in ids:
+            self._db_rows[id] = rows.get(id)
+
+        if not self._cfg.disable_fuzzy:
+            ids_fz = [id for id in ids if id not in rows]
+            rows_fz = self._db.select_by_ids_fuzzy(ids_fz)
+            for id in ids_fz:
+                id_fz = id & 0xFFFFFF00
+                self._db_rows_fuzzy[id_fz] = rows_fz.get(id_fz)
+
+        logging.debug("names: prefetched %i ids from db (%i found)", len(ids), len(rows))
+
     # IDs come from hashed NAME (32b, where name follows rules) or hashed GUIDs (30b, where NAME is arbitrary),
     # so first we check the type. Sometimes IDs that should come from GUID (like BUS names, according to
     # AK's docs) are actually from NAMEs, so it's worth manually testing rather than trusting the caller.
     # Multiple GUIDNAMEs for an ID are possible, so we can update the results, and we can also add Wwise's
     # "Path/ObjectPath" for extra info (never hashnames, considered separate).
-    def _add_name(self, id, name, objpath=None, path=None, onrepeat=ONREPEAT_NOCAPS, exhash=False, source=None):
+    # (hash: precalculated hash of lowercase name, if known; non-exhash names with a hash were
+    # already checked as hashable by the caller)
+    def _add_name(self, id, name, objpath=None, path=None, onrepeat=ONREPEAT_NOCAPS, exhash=False, source=None, hash=None):
         if name:
             name = name.strip()
         if objpath:
@@ -220,16 +277,21 @@ class Names(object):
         if not name: #after strip
             return None
 
-        lowname = name.lower()
-        hashable = self._fnv.is_hashable(lowname)
         extended = False
-        if not hashable and exhash:
-            hashable = self._fnv.is_hashable_extended(lowname)
-            extended = hashable
+        if hash is not None and not exhash:
+            id_hash = hash
+        else:
+            lowname = name.lower()
+            hashable = self._fnv.is_hashable(lowname)
+            if not hashable and exhash:
+                hashable = self._fnv.is_hashable_extended(lowname)
+                extended = hashable
 
-        if not id and not hashable:
-            return None
-        id_hash = self._fnv.get_hash_lw(lowname)
+            if not id and not hashable:
+                return None
+            id_hash = hash
+            if id_hash is None:
+                id_hash = self._fnv.get_hash_lw(lowname)
 
         if not id:
             id = id_hash
@@ -371,16 +433,15 @@ class Names(object):
 
         # automatically from program folder, only one db3 is allowed
         self.parse_db(db)
+        self._prefetch_db(banks)
 
         self.set_bankname(None)
 
         logging.info("names: done")
 
 
-    def _parse_base(self, filename, callback):
-
-        # utf-8-sig (with or without bom) should fail if typical cp-1252 chars are found
-        encodings = ['utf-8-sig', 'iso-8859-1']
+    # (rows: callback parses names into a list of rows, that may be cached)
+    def _parse_base(self, filename, callback, rows=False):
         try:
             testpath = os.path.realpath(filename) #for relative paths
             if testpath in self._loaded_wwnames:
@@ -392,20 +453,10 @@ class Names(object):
                 return
             logging.info("names: loading " + filename)
 
-            #try encodings until one works
-            done = False
-            for encoding in encodings:
-                try:
-                    with open(filename, 'r', encoding=encoding) as infile:
-                        callback(infile)
-                        done = True
-                    break
-                except UnicodeDecodeError:
-                    #logging.info("names: file %s failed with encoding %s, trying others", filename, encoding)
-                    continue
-
-            if not done:
-                logging.info("names: error reading file %s (change encoding?)", filename)
+            if rows:
+                self._parse_rows(filename, callback)
+            else:
+                self._parse_file(filename, callback)
 
         except Exception as e:
             logging.error("names: error reading name file " + filename, e)
@@ -413,6 +464,52 @@ class Names(object):
         self._loaded_wwnames[testpath] = True
 
 
+    def _parse_file(self, filename, callback):
+        # utf-8-sig (with or without bom) should fail if typical cp-1252 chars are found
+        encodings = ['utf-8-sig', 'iso-8859-1']
+
+        #try encodings until one works
+        for encoding in encodings:
+            try:
+                with open(filename, 'r', encoding=encoding) as infile:
+                    callback(infile)
+                return True
+            except UnicodeDecodeError:
+                #logging.info("names: file %s failed with encoding %s, trying others", filename, encoding)
+                continue
+
+        logging.info("names: error reading file %s (change encoding?)", filename)
+        return False
+
+    # Files that only add names are parsed into rows first, so they can be loaded from cache
+    # next time. Rows are added in the same order, so results are the same as parsing.
+    def _parse_rows(self, filename, callback):
+        key = None
+        rows = None
+        if self._cache:
+            key = self._cache.get_key(filename)
+            rows = self._cache.load(key)
+            if rows is not None:
+                logging.debug("names: loaded %s from cache", filename)
+
+        if rows is None:
+            rows = []
+            def parse(infile):
+                rows.clear() #may be retried with other encodings
+                callback(infile, rows)
+
+            if not self._parse_file(filename, parse):
+                return
+            if self._cache:
+                self._cache.save(key, rows)
+
+        for id, name, objpath, path, onrepeat, exhash in rows:
+            self._add_name(id, name, objpath=objpath, path=path, onrepeat=onrepeat, exhash=exhash)
+
+    def _add_row(self, rows, id, name, objpath=None, path=None, onrepeat=ONREPEAT_NOCAPS, exhash=False):
+        rows.append((id, name, objpath, path, onrepeat, exhash))
+
+
     # Wwise_IDs.h ('header file')
     #
     # C++ namespaces with callable constants, as "NAME = ID". Possible namespaces (all inside from "AK"):
@@ -436,9 +533,9 @@ class Names(object):
     def parse_h(self, filename=None):
         if not filename:
             filename = self._make_filepath('Wwise_IDs.h') #maybe should try in ../ too?
-        self._parse_base(filename, self._parse_h)
+        self._parse_base(filename, self._parse_h, rows=True)
 
-    def _parse_h(self, infile):
+    def _parse_h(self, infile, rows):
         #catch ".. static const AkUniqueID THING = 12345U;" lines
         pattern_ct = re.compile(r"^.+ AkUniqueID ([a-zA-Z_][a-zA-Z0-9_]*) = ([0-9]+).*")
         #catch ".. namespace THING", while ignoring ".. // namespace THING" lines
@@ -448,14 +545,14 @@ class Names(object):
             match = pattern_ct.match(line)
             if match:
                 name, id = match.groups()
-                self._add_name(id, name, onrepeat=Names.ONREPEAT_IGNORE)
+                self._add_row(rows, id, name, onrepeat=Names.ONREPEAT_IGNORE)
                 continue
 
             match = pattern_ns.match(line)
             if match:
                 id = None
                 name, = match.groups()
-                self._add_name(id, name)
+                self._add_row(rows, id, name)
 
 
     # (bankname).txt ('bank content TXT')
@@ -481,9 +578,9 @@ class Names(object):
     def parse_txt_bnk(self, filename=None):
         if not filename:
             filename = os.path.splitext(self._bankname)[0] + '.txt'
-        self._parse_base(filename, self._parse_txt)
+        self._parse_base(filename, self._parse_txt, rows=True)
 
-    def _parse_txt(self, infile):
+    def _parse_txt(self, infile, rows):
         #catch: "	1234155799	Play_Thing			\Default Work Unit\Play_Thing	" (with path being optional)
         # must also catch buses like "3D-Submix_Bus"
         #pattern_ph = re.compile("^\t([0-9]+)\t([a-zA-Z_][a-zA-Z0-9_ ]*)(\t\t\t([^\t]+))?.*")
@@ -508,7 +605,7 @@ class Names(object):
                 id, name, info1, info2 = match.groups()
                 path, objpath = self._parse_txt_info(info1, info2)
 
-                self._add_name(id, name, objpath=objpath, path=path, exhash=bus_hash)
+                self._add_row(rows, id, name, objpath=objpath, path=path, exhash=bus_hash)
 
     # After name there can be comments, paths or objpaths. Not very consistent so do some autodetection
     def _parse_txt_info(self, info1, info2):
@@ -556,14 +653,14 @@ class Names(object):
     def parse_xml(self, filename=None):
         if not filename:
             filename = self._make_filepath('SoundbanksInfo.xml')
-        self._parse_base(filename, self._parse_xml)
+        self._parse_base(filename, self._parse_xml, rows=True)
 
     def parse_xml_bnk(self, filename=None):
         if not filename:
             filename = os.path.splitext(self._bankname)[0] + '.xml'
-        self._parse_base(filename, self._parse_xml)
+        self._parse_base(filename, self._parse_xml, rows=True)
 
-    def _parse_xml(self, infile):
+    def _parse_xml(self, infile, rows):
         #catch: "	<Thing Id="12345" Name="Play_Thing" ObjectPath="\Default Work Unit\Play_Thing">"
         pattern_in = re.compile(r'^.*<.+ Id="([0-9]+)" .*Name="([a-zA-Z0-9_]+)"(.* ObjectPath="(.+?)")?.+')
         #catch: "	<Thing Id="12345" Name="Bus Thing 1,2"/>"
@@ -591,10 +688,10 @@ class Names(object):
             if match:
                 # prev id + shortname still hanging around (shouldn't happen with buses but...)
                 if id and name:
-                    self._add_name(id, name, objpath=objpath, path=path, exhash=bus_hash)
+                    self._add_row(rows, id, name, objpath=objpath, path=path, exhash=bus_hash)
 
                 id, name, dummy, objpath = match.groups()
-                self._add_name(id, name, objpath=objpath, exhash=bus_hash)
+                self._add_row(rows, id, name, objpath=objpath, exhash=bus_hash)
                 id = name = objpath = path = None
                 continue
 
@@ -604,7 +701,7 @@ class Names(object):
             if match:
                 # prev id + shortname still hanging around
                 if id and name:
-                    self._add_name(id, name, objpath=objpath, path=path)
+                    self._add_row(rows, id, name, objpath=objpath, path=path)
 
                 id = name = objpath = path = None
                 id, = match.groups()
@@ -631,7 +728,7 @@ class Names(object):
 
         # last id + shortname still hanging around
         if id and name:
-            self._add_name(id, name, objpath=objpath, path=path, exhash=bus_hash)
+            self._add_row(rows, id, name, objpath=objpath, path=path, exhash=bus_hash)
 
 
     # SoundbanksInfo.json ('JSON metadata')
@@ -649,14 +746,14 @@ class Names(object):
     def parse_json(self, filename=None):
         if not filename:
             filename = self._make_filepath('SoundbanksInfo.json')
-        self._parse_base(filename, self._parse_json)
+        self._parse_base(filename, self._parse_json, rows=True)
 
     def parse_json_bnk(self, filename=None):
         if not filename:
             filename = os.path.splitext(self._bankname)[0] + '.json'
-        self._parse_base(filename, self._parse_json)
+        self._parse_base(filename, self._parse_json, rows=True)
 
-    def _parse_json(self, infile):
+    def _parse_json(self, infile, rows):
         #catch: '	"Id": "12345" '
         pattern_id = re.compile(r"^[ \t]+[\"]Id[\"]: [\"](.+?)[\"][, \t]*")
         #catch: '	"(field)": "(value)" '
@@ -669,7 +766,7 @@ class Names(object):
             if match:
                 # prev id + name still hanging around
                 if id and name:
-                    self._add_name(id, name, objpath=objpath, path=path)
+                    self._add_row(rows, id, name, objpath=objpath, path=path)
 
                 id = name = objpath = path = None
                 id, = match.groups()
@@ -693,7 +790,7 @@ class Names(object):
 
         # last id + name still hanging around
         if id and name:
-            self._add_name(id, name, objpath=objpath, path=path)
+            self._add_row(rows, id, name, objpath=objpath, path=path)
 
 
     # wwnames.txt
@@ -718,124 +815,65 @@ class Names(object):
         # list of processed names to quickly skips repeats
         processed = {}
 
-        # catch: "name(thing) = id" (ex. "8bit", "English(US)", "3D-Submix_Bus")
-        pattern_1 = re.compile(r"^[\t]*([a-zA-Z_0-9][a-zA-Z0-9_()\- ]*)( = )([0-9]+)[ ]*$")
-
-        # catch "name"
-        #pattern_2 = re.compile(r"^[\t]*([a-zA-Z_][a-zA-Z0-9_]*)[ ]*$")
-
-        # catch and split non-useful (FNV) characters
-        pattern_s1 = re.compile(r'[\t\n\r .<>,;.:{}\[\]()\'"$&/=!\\/#@+\^`´¨?|~]')
-        #pattern_s2 = re.compile(r'[?|]')
+        # lines are read and tokenized in chunks (in N processes for big files), then names are added
+        # in file order, as names/flags in previous lines affect which names are added
+        lines = list(itertools.islice(infile, self.LST_CHUNK_LINES))
+        if self._jobs > 1 and len(lines) >= self.LST_CHUNK_LINES:
+            self._parse_lst_jobs(infile, lines, processed)
+            return
 
-        for line in infile:
-            # ignore comments
-            if not line:
-                continue
-            if line[0] == '#':
-                if line.startswith('#@'): # special flags
-                    self._cfg.add_config(line)
+        parser = _LstParser()
+        while lines:
+            self._add_lst_items(parser.parse(lines), processed)
+            lines = list(itertools.islice(infile, self.LST_CHUNK_LINES))
+
+    def _parse_lst_jobs(self, infile, lines, processed):
+        import concurrent.futures
+
+        def get_chunks(lines):
+            while lines:
+                yield lines
+                lines = list(itertools.islice(infile, self.LST_CHUNK_LINES))
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self._jobs) as executor:
+            for result in executor.map(_parse_lst_lines, get_chunks(lines)):
+                self._add_lst_items(result, processed)
+
+    def _add_lst_items(self, result, processed):
+        kinds, names, hashes = result
+        add_name = self._add_name
+        source = NameRow.NAME_SOURCE_EXTRA
+        onrepeat = self._get_lst_onrepeat()
+        skip_named = False
+
+        for kind, name in zip(kinds, names):
+            if kind == _LST_NAMED_ELEM:
+                if skip_named:
+                    continue
+            elif kind == _LST_NAMED:
+                skip_named = name in processed
                 continue
-
-            match = pattern_1.match(line)
-            if match:
-                name, __, id = match.groups()
+            elif kind == _LST_EXHASH:
                 if name in processed:
                     continue
-
                 #special meaning of "extended hash" (for objects like buses)
-                if id == '0':
-                    processed[name] = True
-                    self._add_name(None, name, exhash=True, source=NameRow.NAME_SOURCE_EXTRA)
-                    continue
-
-            #match = pattern_2.match(line)
-            #if match:
-            #    name, = match.groups()
-            #
-            #    if name in processed:
-            #        continue
-            #    processed[name] = True
-            #
-            #    self._add_name(None, name, onrepeat=Names.ONREPEAT_BEST, source=NameRow.NAME_SOURCE_EXTRA)
-            #    continue
-
-            # get sub-parts of a line and hash those, for scripts that have lines like "C_PlayMusic( bgm_01 )"
-            # but we want "bgm_01" as the actual hashname, or XML like "<thing1 thing2='thing3'>"
-            elems = pattern_s1.split(line)
-            for elem in elems:
-                #if pattern_s2.match(elem):
-                #    continue
-                self._parse_lst_elem(elem, processed)
-
-        return
-
-    def _parse_lst_elem(self, elem, processed):
-        # not hashable
-        if not elem or elem[0].isdigit() or len(elem) > 100:
-            return
-        if '|' in elem or '?' in elem:
-            return
-
-        # maybe could help
-        if '-' in elem:
-            elem = elem.replace('-', '_')
-
-        # some elems in .exe have names like "bgm_%d" generated at runtime, simulate by making a bunch of names
-        # (ex. MGR "bgm_r%03x_start", KOF13 "game_clear_%d")
-        if '%' in elem:
-            pos = elem.index('%')
-            if pos == 0 or elem.count('%') > 1:
-                return
-
-            try:
-                fmt = elem[pos+1]
-                max = 2
-                if fmt == '0':
-                    max = int(elem[pos+2])
-                    fmt = elem[pos+3]
-                    if max > 4:
-                        max = 4 #avoid too many names
-
-                if fmt == 'd' or fmt == 'i' or fmt == 'u':
-                    base = 10
-                elif fmt == 'x' or fmt == 'X':
-                    base = 16
-                else:
-                    return
-
-                rng = range(0, pow(base, max), base)
-                for i in rng:
-                    elem_fmt = elem % (i)
-
-                    self._parse_lst_elem_add(elem_fmt, processed)
-            except (ValueError, IndexError):
-                pass #meh
-            return
-
-        # some odd game has names ending with _ but shouldn't
-        if elem.endswith("_"):
-            elem_cut = elem[:-1]
-            self._parse_lst_elem_add(elem_cut, processed)
-
-        # it's common to use vars that start with _ but maybe will get a few extra names
-        if elem.startswith("_"):
-            elem_cut = elem[1:]
-            self._parse_lst_elem_add(elem_cut, processed)
-
-        # default
-        self._parse_lst_elem_add(elem, processed)
-        return
+                processed[name] = True
+                add_name(None, name, exhash=True, source=source, hash=hashes[name])
+                continue
+            elif kind == _LST_CONFIG:
+                self._cfg.add_config(name)
+                onrepeat = self._get_lst_onrepeat()
+                continue
 
-    def _parse_lst_elem_add(self, elem, processed):
-        if elem in processed:
-            return
-        processed[elem] = True
+            if name in processed:
+                continue
+            processed[name] = True
+            add_name(None, name, source=source, onrepeat=onrepeat, hash=hashes[name])
 
-        onrepeat = Names.ONREPEAT_NOCAPS
+    def _get_lst_onrepeat(self):
         if self._cfg.repeats_update_caps:
-            onrepeat = Names.ONREPEAT_UPDATECAPS
-        self._add_name(None, elem, source=NameRow.NAME_SOURCE_EXTRA, onrepeat=onrepeat)
+            return Names.ONREPEAT_UPDATECAPS
+        return Names.ONREPEAT_NOCAPS
 
 
     # wwnames.db3
@@ -852,7 +890,11 @@ class Names(object):
         #don't reload DB
         if self._db:
             return
-        self._db = SqliteHandler()
+        # read-only alternative for big lists (wwnames.wwidx)
+        if wnameindex.is_index(filename, wsqlite.get_path(filename)):
+            self._db = wnameindex.NameIndexHandler()
+        else:
+            self._db = SqliteHandler()
         self._db.open(filename)
 
     def close(self):
@@ -872,15 +914,20 @@ class Names(object):
 
         save_all = True
         save_companion = True
-        if not self._db or not self._db.is_open():
-            #force creation of BD if didn't exist
-            #self._db.close() #not needed?
+        if not isinstance(self._db, SqliteHandler) or not self._db.is_open():
+            #force creation of BD if didn't exist (or index was used)
+            if self._db:
+                self._db.close()
             self._db = SqliteHandler()
             self._db.open(None, preinit=True)
 
         self._db.save(self._names.values(), save_all=save_all, save_companion=save_companion)
 
 
+    # hashnames as (id, name)
+    def get_hashnames(self):
+        return [(row.id, row.hashname) for row in self._names.values() if row.hashname]
+
     # banks could come from different paths
     def set_bankname(self, bankname):
         self._bankname = bankname
@@ -906,3 +953,194 @@ class Names(object):
 
     def sort_always(self):
         return self._cfg.sort_always
+
+
+# Makes a name index (see wnameindex) from wwnames.db3/wwnames.txt files. Names in first files
+# take priority when ids repeat.
+def build_index(outname, filenames):
+    if not outname:
+        outname = wnameindex.DEFAULT_FILENAME
+
+    rows = []
+    for filename in filenames:
+        if filename.lower().endswith('.db3'):
+            db = SqliteHandler()
+            db.open(filename)
+            rows.extend(db.select_all())
+            db.close()
+        else:
+            names = Names()
+            names.parse_lst(filename)
+            rows.extend(names.get_hashnames())
+
+    wnameindex.save_index(outname, rows)
+
+
+# wwnames.txt items (see _parse_lst_lines)
+_LST_ELEM = 0 #name
+_LST_NAMED = 1 #"name = id" line, whose names (following items) are ignored if name was already processed
+_LST_NAMED_ELEM = 2 #name in a "name = id" line
+_LST_EXHASH = 3 #"name = 0" line
+_LST_CONFIG = 4 #"#@" flags
+
+# catch: "name(thing) = id" (ex. "8bit", "English(US)", "3D-Submix_Bus")
+_LST_PATTERN_ID = re.compile(r"^[\t]*([a-zA-Z_0-9][a-zA-Z0-9_()\- ]*)( = )([0-9]+)[ ]*$")
+
+# catch "name"
+#_LST_PATTERN_NAME = re.compile(r"^[\t]*([a-zA-Z_][a-zA-Z0-9_]*)[ ]*$")
+
+# catch and split non-useful (FNV) characters
+_LST_PATTERN_SPLIT = re.compile(r'[\t\n\r .<>,;.:{}\[\]()\'"$&/=!\\/#@+\^`´¨?|~]')
+
+# Tokenizes and hashes wwnames.txt lines in chunks (see Names.parse_lst). Each chunk is parsed in a
+# worker process when using jobs, otherwise one parser is used for all chunks so names and tokens
+# repeated in later chunks are skipped/hashed once.
+class _LstParser(object):
+    __slots__ = ['_fnv', '_seen', '_tokens', '_lownames', '_hashes']
+
+    def __init__(self):
+        self._fnv = wfnv.Fnv()
+        # names that will be processed before any later line (repeats can be skipped)
+        self._seen = set()
+        # hashable names per token (tokens repeat a lot)
+        self._tokens = {}
+        # names to hash, and hashed names
+        self._lownames = {}
+        self._hashes = {}
+
+    # Returns item kinds + names (flat, as lots of small tuples/lists make the gc slower) plus
+    # {name: hash}, to be added by Names._add_lst_items in the same order.
+    def parse(self, lines):
+        is_hashable = self._fnv.is_hashable
+        seen = self._seen
+        tokens = self._tokens
+        lownames = self._lownames
+        hashes = self._hashes
+        kinds = bytearray()
+        names = []
+
+        for line in lines:
+            # ignore comments
+            if not line:
+                continue
+            if line[0] == '#':
+                if line.startswith('#@'): # special flags
+                    kinds.append(_LST_CONFIG)
+                    names.append(line)
+                continue
+
+            kind = _LST_ELEM
+            match = _LST_PATTERN_ID.match(line)
+            if match:
+                name, __, id = match.groups()
+                if name in seen:
+                    continue
+
+                if id == '0':
+                    seen.add(name)
+                    if name not in hashes:
+                        lownames[name] = name.strip().lower()
+                    kinds.append(_LST_EXHASH)
+                    names.append(name)
+                    continue
+
+                kinds.append(_LST_NAMED)
+                names.append(name)
+                kind = _LST_NAMED_ELEM
+
+            # get sub-parts of a line and hash those, for scripts that have lines like "C_PlayMusic( bgm_01 )"
+            # but we want "bgm_01" as the actual hashname, or XML like "<thing1 thing2='thing3'>"
+            for token in _LST_PATTERN_SPLIT.split(line):
+                token_elems = tokens.get(token)
+                if token_elems is None:
+                    elems = []
+                    _get_lst_elems(token, elems)
+                    token_elems = []
+                    for elem in elems:
+                        if elem not in lownames and elem not in hashes:
+                            lowname = elem.strip().lower()
+                            if not is_hashable(lowname):
+                                continue
+                            lownames[elem] = lowname
+                        token_elems.append(elem)
+                    # usually a single name, saved as-is as lots of long-lived tuples make the gc slower
+                    if len(token_elems) == 1:
+                        token_elems = token_elems[0]
+                    else:
+                        token_elems = tuple(token_elems)
+                    tokens[token] = token_elems
+
+                if type(token_elems) is str:
+                    token_elems = (token_elems,)
+                for elem in token_elems:
+                    if elem in seen:
+                        continue
+                    if kind == _LST_ELEM:
+                        seen.add(elem)
+                    kinds.append(kind)
+                    names.append(elem)
+
+        hashes.update(zip(lownames, self._fnv.get_hashes_lw(list(lownames.values()))))
+        lownames.clear()
+        return (kinds, names, hashes)
+
+# parses a chunk in a worker process
+def _parse_lst_lines(lines):
+    return _LstParser().parse(lines)
+
+def _get_lst_elems(elem, elems):
+    # not hashable
+    if not elem or elem[0].isdigit() or len(elem) > 100:
+        return
+    if '|' in elem or '?' in elem:
+        return
+
+    # maybe could help
+    if '-' in elem:
+        elem = elem.replace('-', '_')
+
+    # some elems in .exe have names like "bgm_%d" generated at runtime, simulate by making a bunch of names
+    # (ex. MGR "bgm_r%03x_start", KOF13 "game_clear_%d")
+    if '%' in elem:
+        pos = elem.index('%')
+        if pos == 0 or elem.count('%') > 1:
+            return
+
+        try:
+            fmt = elem[pos+1]
+            max = 2
+            if fmt == '0':
+                max = int(elem[pos+2])
+                fmt = elem[pos+3]
+                if max > 4:
+                    max = 4 #avoid too many names
+
+            if fmt == 'd' or fmt == 'i' or fmt == 'u':
+                base = 10
+            elif fmt == 'x' or fmt == 'X':
+                base = 16
+            else:
+                return
+
+            rng = range(0, pow(base, max), base)
+            for i in rng:
+                elem_fmt = elem % (i)
+
+                elems.append(elem_fmt)
+        except (ValueError, IndexError):
+            pass #meh
+        return
+
+    # some odd game has names ending with _ but shouldn't
+    if elem.endswith("_"):
+        elem_cut = elem[:-1]
+        elems.append(elem_cut)
+
+    # it's common to use vars that start with _ but maybe will get a few extra names
+    if elem.startswith("_"):
+        elem_cut = elem[1:]
+        elems.append(elem_cut)
+
+    # default
+    elems.append(elem)
+    return
@@ -5,6 +5,21 @@ from .wnamerow import NameRow
 # This is meant to be a common names database (like a default wwnames.txt)
 # However since wwise's hash is too simple and has many collisions, this isn't that useful.
 
+DEFAULT_FILENAME = 'wwnames.db3'
+
+# finds name file in work dir or program folder (also used for other name files)
+def get_path(filename, default=DEFAULT_FILENAME):
+    if not filename:
+        filename = default
+
+    workpath = os.path.join(os.path.dirname(sys.argv[0]), filename)
+    if os.path.isfile(filename):
+        return filename
+    if os.path.isfile(workpath):
+        return workpath
+    return None
+
+
 class SqliteHandler(object):
     BATCH_COUNT = 50000     #more=higher memory, but much faster for huge (500000+) sets
 
@@ -16,24 +31,16 @@ class SqliteHandler(object):
 
     def open(self, filename, preinit=False):
         if not filename:
-            filename = 'wwnames.db3' #in work dir
+            filename = DEFAULT_FILENAME #in work dir
         #if not filename:
         #    raise ValueError("filename not provided")
 
-        basepath = filename
-        workpath = os.path.dirname(sys.argv[0])
-        workpath = os.path.join(workpath, filename)
-        if os.path.isfile(basepath):
-            path = basepath
-        elif os.path.isfile(workpath):
-            path = workpath
-        else:
-            path = None #no existing db3
+        path = get_path(filename) #None if no existing db3
 
         # connect() creates DB if file doesn't exists, allow only if flag is set
         if not path:
             if not preinit:
-                logging.info("names: couldn't find %s name file", workpath)
+                logging.info("names: couldn't find %s name file", filename)
                 return
             path = filename
         logging.info("names: loading %s", filename)
@@ -121,6 +128,57 @@ class SqliteHandler(object):
             return self._to_namerow(row)
         return None
 
+    # Same as select_by_id for many ids at once, returning a dict of id > found rows. Ids go to
+    # a temp table so the lookup is a single join rather than one query per id.
+    def select_by_ids(self, ids):
+        if not self._cx:
+            return {}
+
+        cur = self._set_select_ids(ids)
+        cur.execute("SELECT names.id, names.name FROM select_ids CROSS JOIN names ON names.id = select_ids.id")
+        rows = cur.fetchall()
+        self._cx.rollback() #temp ids
+
+        namerows = {}
+        for row in rows:
+            namerow = self._to_namerow(row)
+            namerows[namerow.id] = namerow
+        return namerows
+
+    # Same as select_by_id_fuzzy for many ids at once, returning a dict of fuzzy id (id & 0xFFFFFF00) > found rows
+    def select_by_ids_fuzzy(self, ids):
+        if not self._cx:
+            return {}
+
+        cur = self._set_select_ids({id & 0xFFFFFF00 for id in ids})
+        cur.execute("SELECT names.id, names.name FROM select_ids CROSS JOIN names ON names.id >= select_ids.id AND names.id < select_ids.id + 256")
+        rows = cur.fetchall()
+        self._cx.rollback() #temp ids
+
+        # single queries return the lowest id in range (per index)
+        namerows = {}
+        for row in sorted(rows):
+            namerow = self._to_namerow(row)
+            id_fz = namerow.id & 0xFFFFFF00
+            if id_fz not in namerows:
+                namerows[id_fz] = namerow
+        return namerows
+
+    # all rows as (id, name), by id
+    def select_all(self):
+        if not self._cx:
+            return []
+        cur = self._cx.cursor()
+        cur.execute("SELECT id, name FROM names ORDER BY id")
+        return cur.fetchall()
+
+    def _set_select_ids(self, ids):
+        cur = self._cx.cursor()
+        cur.execute("CREATE TEMP TABLE IF NOT EXISTS select_ids(id integer PRIMARY KEY)")
+        cur.execute("DELETE FROM select_ids")
+        cur.executemany("INSERT OR IGNORE INTO select_ids(id) VALUES(?)", ((id,) for id in ids))
+        return cur
+
     def _setup(self):
         cx = self._cx
         #init main table is not existing
@@ -0,0 +1,134 @@
+import logging, os, sys, hashlib, marshal, zlib, gc
+from .. import wversion
+from . import wmodel
+
+# Stores parsed banks in a folder, so later runs with the same banks skip parsing. Entries are
+# keyed by bank data hash + size + wwiser version (parser changes may result in different trees),
+# and hold a flat list of node values (see wmodel.pack_nodes) rather than the live objects.
+# Old entries are removed when the folder goes over a max size (least recently used first).
+
+DEFAULT_DIR = 'wwiser.cache'
+DEFAULT_MAX_SIZE = 256 #MB
+CACHE_MAGIC = b'WWCACHE2'
+CACHE_EXT = '.wwcache'
+
+
+class BankCache(object):
+    def __init__(self, path=None, max_size=None):
+        if not path or path == '*':
+            path = os.path.join(os.path.dirname(sys.argv[0]), DEFAULT_DIR)
+        if not max_size:
+            max_size = DEFAULT_MAX_SIZE
+        self._path = path
+        self._max_size = max_size
+        self._rebuild = False
+
+        # marshal format may change between python versions
+        version = '%s/%s/%s' % (wversion.WWISER_VERSION, sys.version_info[0:2], marshal.version)
+        self._version = version.encode('utf-8')
+
+    # ignore existing entries (banks are parsed and saved again)
+    def set_rebuild(self, flag):
+        self._rebuild = flag
+
+    # r: bank's wio reader, hashed without copying its data
+    # variant: parse options that result in a different tree
+    def get_key(self, r, variant=None):
+        hash = hashlib.sha1()
+        r.update_hash(hash)
+        hash.update(self._version)
+        if variant:
+            hash.update(variant.encode('utf-8'))
+        return '%s-%x' % (hash.hexdigest(), r.get_size())
+
+    def _get_filename(self, key):
+        return os.path.join(self._path, key + CACHE_EXT)
+
+    # Loads bank's info and nodes into root, returning if it was found.
+    def load(self, key, root):
+        if self._rebuild:
+            return False
+
+        filename = self._get_filename(key)
+        try:
+            with open(filename, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return False
+
+        # rebuilding lots of nodes triggers useless gc passes (all nodes are alive)
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            try:
+                if data[0:len(CACHE_MAGIC)] != CACHE_MAGIC:
+                    raise ValueError("wrong magic")
+                info, packed = marshal.loads(zlib.decompress(data[len(CACHE_MAGIC):]))
+            except (ValueError, EOFError, TypeError, zlib.error) as e:
+                logging.info("cache: ignored bad entry %s (%s)", filename, e)
+                return False
+
+            root.set_info(info)
+            wmodel.unpack_nodes(root, packed)
+        finally:
+            if enabled:
+                gc.enable()
+
+        # mark as recently used
+        try:
+            os.utime(filename)
+        except OSError:
+            pass
+        return True
+
+    def save(self, key, root):
+        try:
+            packed = wmodel.pack_nodes(root)
+            data = marshal.dumps((root.get_info(), packed))
+        except ValueError as e:
+            # unexpected node (shouldn't happen)
+            logging.debug("cache: can't save bank (%s)", e)
+            return
+
+        try:
+            os.makedirs(self._path, exist_ok=True)
+            filename = self._get_filename(key)
+            tempname = '%s.%i.tmp' % (filename, os.getpid()) #other jobs may save the same bank
+            with open(tempname, 'wb') as f:
+                f.write(CACHE_MAGIC)
+                f.write(zlib.compress(data, 1))
+            os.replace(tempname, filename)
+        except OSError as e:
+            logging.info("cache: can't save %s (%s)", key, e)
+            return
+
+        self._evict()
+
+    # removes least recently used entries when over max size
+    def _evict(self):
+        entries = []
+        total = 0
+        with os.scandir(self._path) as it:
+            for entry in it:
+                if not entry.name.endswith(CACHE_EXT):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError: #removed by other process
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        max_size = self._max_size * 1024 * 1024
+        if total <= max_size:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= max_size:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
@@ -2292,105 +2292,121 @@ CAkHarmonizerFX__AkFilterType_0 = wfmt.FormatterLUT({
 # #############################################################################
 # VERSION SETUP
 
+# Version-dependent definitions, selected once per version and cached. Each bank keeps its
+# own (see NodeRoot.get_defs) so banks of different versions don't depend on global state.
+class VersionDefs(object):
+    __slots__ = ['version', 'AkCurveScaling', 'AkRtpcType', 'AkRTPC_ParameterID', 'AkModulatorPropID', 'AkRtpcAccum',
+                 'AkActionType', 'AkBank__AKBKSourceType', 'AkPropID', 'AkBank__AKBKHircType', 'AkBuiltInParam', 'AkClipAutomationType']
+
+    def __init__(self, version):
+        #many of these enums are very similar but annoyingly put new values in the middle,
+        #so versions without SDK to check are likely wrong. It's also hard to guess given
+        #the huge number of parameters
+        self.version = version
+
+        if   version <= 62:
+            self.AkCurveScaling = AkCurveScaling_062
+        elif   version <= 65:
+            self.AkCurveScaling = AkCurveScaling_065
+        else:
+            self.AkCurveScaling = AkCurveScaling_072
+
+        if   version <= 140:
+            self.AkRtpcType = AkRtpcType_140
+        else:
+            self.AkRtpcType = AkRtpcType_144
+
+        if   version <= 45:
+            self.AkRTPC_ParameterID = AkRTPC_ParameterID_045
+        elif version <= 53:
+            self.AkRTPC_ParameterID = AkRTPC_ParameterID_053
+        elif version <= 65:
+            self.AkRTPC_ParameterID = AkRTPC_ParameterID_065
+        elif version <= 72:
+            self.AkRTPC_ParameterID = AkRTPC_ParameterID_072
+        elif version <= 89:
+            self.AkRTPC_ParameterID = AkRTPC_ParameterID_088
+        elif version <= 113:
+            self.AkRTPC_ParameterID = AkRTPC_ParameterID_113
+        elif version <= 118:
+            self.AkRTPC_ParameterID = AkRTPC_ParameterID_118
+        elif version <= 134:
+            self.AkRTPC_ParameterID = AkRTPC_ParameterID_134
+        else:
+            self.AkRTPC_ParameterID = AkRTPC_ParameterID_135
+
+        if  version <= 145:
+            self.AkModulatorPropID = AkModulatorPropID_112
+        else:
+            self.AkModulatorPropID = AkModulatorPropID_150
+
+        if  version <= 125:
+            self.AkRtpcAccum = AkRtpcAccum_125
+        else:
+            self.AkRtpcAccum = AkRtpcAccum_128
+
+        if  version <= 56:
+            self.AkActionType = AkActionType_056
+        else:
+            self.AkActionType = AkActionType_062
+
+        if  version <= 89:
+            self.AkBank__AKBKSourceType = AkBank__AKBKSourceType_088
+        else:
+            self.AkBank__AKBKSourceType = AkBank__AKBKSourceType_112
+
+        if    version <= 62:
+            self.AkPropID = AkPropID_062
+        elif  version <= 65:
+            self.AkPropID = AkPropID_065
+        elif  version <= 89:
+            self.AkPropID = AkPropID_088
+        elif version <= 113:
+            self.AkPropID = AkPropID_113
+        elif version <= 126:
+            self.AkPropID = AkPropID_126
+        elif version <= 145:
+            self.AkPropID = AkPropID_128
+        elif version <= 150:
+            self.AkPropID = AkPropID_150
+        elif version <= 154:
+            self.AkPropID = AkPropID_154
+        else:
+            self.AkPropID = AkPropID_168
+
+        if version <= 126:
+            self.AkBank__AKBKHircType = AkBank__AKBKHircType_126
+        else:
+            self.AkBank__AKBKHircType = AkBank__AKBKHircType_128
+
+        if version <= 126:
+            self.AkBuiltInParam = AkBuiltInParam_126
+        else:
+            self.AkBuiltInParam = AkBuiltInParam_128
+
+        if version <= 89:
+            self.AkClipAutomationType = AkClipAutomationType_088
+        else:
+            self.AkClipAutomationType = AkClipAutomationType_112
+
+    # send version only when pickled, to get the cached defs again
+    def __reduce__(self):
+        return (get_defs, (self.version,))
+
+
+_defs_cache = {}
+
+def get_defs(version):
+    defs = _defs_cache.get(version)
+    if not defs:
+        defs = VersionDefs(version)
+        _defs_cache[version] = defs
+    return defs
+
+# sets module-level enums to some version (legacy, parser uses each bank's defs instead)
 def setup(version):
-    #many of these enums are very similar but annoyingly put new values in the middle,
-    #so versions without SDK to check are likely wrong. It's also hard to guess given
-    #the huge number of parameters
-
-    global AkCurveScaling
-    if   version <= 62:
-        AkCurveScaling = AkCurveScaling_062
-    elif   version <= 65:
-        AkCurveScaling = AkCurveScaling_065
-    else:
-        AkCurveScaling = AkCurveScaling_072
-
-    global AkRtpcType
-    if   version <= 140:
-        AkRtpcType = AkRtpcType_140
-    else:
-        AkRtpcType = AkRtpcType_144
-
-    global AkRTPC_ParameterID
-    if   version <= 45:
-        AkRTPC_ParameterID = AkRTPC_ParameterID_045
-    elif version <= 53:
-        AkRTPC_ParameterID = AkRTPC_ParameterID_053
-    elif version <= 65:
-        AkRTPC_ParameterID = AkRTPC_ParameterID_065
-    elif version <= 72:
-        AkRTPC_ParameterID = AkRTPC_ParameterID_072
-    elif version <= 89:
-        AkRTPC_ParameterID = AkRTPC_ParameterID_088
-    elif version <= 113:
-        AkRTPC_ParameterID = AkRTPC_ParameterID_113
-    elif version <= 118:
-        AkRTPC_ParameterID = AkRTPC_ParameterID_118
-    elif version <= 134:
-        AkRTPC_ParameterID = AkRTPC_ParameterID_134
-    else:
-        AkRTPC_ParameterID = AkRTPC_ParameterID_135
-
-    global AkModulatorPropID
-    if  version <= 145:
-        AkModulatorPropID = AkModulatorPropID_112
-    else:
-        AkModulatorPropID = AkModulatorPropID_150
-
-    global AkRtpcAccum
-    if  version <= 125:
-        AkRtpcAccum = AkRtpcAccum_125
-    else:
-        AkRtpcAccum = AkRtpcAccum_128
-
-    global AkActionType
-    if  version <= 56:
-        AkActionType = AkActionType_056
-    else:
-        AkActionType = AkActionType_062
-
-    global AkBank__AKBKSourceType
-    if  version <= 89:
-        AkBank__AKBKSourceType = AkBank__AKBKSourceType_088
-    else:
-        AkBank__AKBKSourceType = AkBank__AKBKSourceType_112
-
-    global AkPropID
-    if    version <= 62:
-        AkPropID = AkPropID_062
-    elif  version <= 65:
-        AkPropID = AkPropID_065
-    elif  version <= 89:
-        AkPropID = AkPropID_088
-    elif version <= 113:
-        AkPropID = AkPropID_113
-    elif version <= 126:
-        AkPropID = AkPropID_126
-    elif version <= 145:
-        AkPropID = AkPropID_128
-    elif version <= 150:
-        AkPropID = AkPropID_150
-    elif version <= 154:
-        AkPropID = AkPropID_154
-    else:
-        AkPropID = AkPropID_168
-
-    global AkBank__AKBKHircType
-    if version <= 126:
-        AkBank__AKBKHircType = AkBank__AKBKHircType_126
-    else:
-        AkBank__AKBKHircType = AkBank__AKBKHircType_128
-
-    global AkBuiltInParam
-    if version <= 126:
-        AkBuiltInParam = AkBuiltInParam_126
-    else:
-        AkBuiltInParam = AkBuiltInParam_128
-
-    global AkClipAutomationType
-    if version <= 89:
-        AkClipAutomationType = AkClipAutomationType_088
-    else:
-        AkClipAutomationType = AkClipAutomationType_112
-
-    return
+    defs = get_defs(version)
+    for key in VersionDefs.__slots__:
+        if key == 'version':
+            continue
+        globals()[key] = getattr(defs, key)
@@ -1,3 +1,11 @@
+from bisect import bisect_right
+
+# max indexes kept per bank (objects tend to be queried many times in a row, then not used)
+INDEX_CACHE_MAX = 1024
+# objects are indexed once finds have walked this many of their nodes (small or rarely used
+# objects are faster to walk)
+INDEX_MIN_VISITS = 1000
+
 
 # finds nodes in a node's tree based on config, external to simplify but could be optimized
 # if added to model to avoid generating attrs dicts
@@ -23,6 +31,8 @@ class NodeFinder(object):
         self.base = False
         self.contains = contains
         self.empty = not names and not types and not values and not contains
+        self.item = None
+        self.visits = 0
 
 
     def find1(self, node):
@@ -36,7 +46,10 @@ class NodeFinder(object):
 
         # aim for outer nodes first as it's slightly faster in some cases
         #self._find_inner(node)
-        self._find_outer([node])
+        if not self._find_indexed(node):
+            self._find_outer([node])
+            if self.item:
+                add_visits(self.item, self.visits)
 
         if self.results:
             if len(self.results) > 1:
@@ -52,10 +65,33 @@ class NodeFinder(object):
 
         # aim for outer nodes first as it's slightly faster in some cases
         #self._find_inner(node)
-        self._find_outer([node])
+        if not self._find_indexed(node):
+            self._find_outer([node])
+            if self.item:
+                add_visits(self.item, self.visits)
 
         return self.results
 
+    # find query with the index of node's object, if possible (same results as _find_outer)
+    def _find_indexed(self, node):
+        if self.empty:
+            return True
+        if self.contains or self.base:
+            return False
+
+        item = get_item(node)
+        if not item:
+            return False
+        index = get_index(item)
+        if not index:
+            self.item = item #register walked nodes
+            return False
+        results = index.find(node, self.names, self.types, self.values, self.first)
+        if results is None:
+            return False
+        self.results = results
+        return True
+
     # find query in tree, going in depth first:
     # A > B > C
     #         > D
@@ -101,6 +137,7 @@ class NodeFinder(object):
             return
 
         # find query on this level
+        self.visits += len(nodes)
         for node in nodes:
             self._query(node)
             # target exists and only need one result: stop
@@ -152,6 +189,180 @@ class NodeFinder(object):
         return
 
 
+# Lookup tables of a subtree (items in chunk lists, like HIRC objects), made once when first
+# searched. Has nodes per name/type/value in pre-order, so finds from any node in the subtree
+# are a slice of those (subtrees are ranges in pre-order), plus each node's position in
+# NodeFinder's search order, to return results in the same order as walking the tree.
+class NodeIndex(object):
+    ATTRS = ['name', 'type', 'value']
+
+    def __init__(self, item):
+        self._spans = {}
+        self._tables = [{}, {}, {}]
+
+        nodes = []
+        children = {}
+        self._add_spans(item, nodes, children)
+
+        orders = {}
+        self._add_orders([item], orders, children)
+
+        for pre, node in enumerate(nodes):
+            order = orders[_get_key(node)]
+            for table, attr in zip(self._tables, self.ATTRS):
+                value = node.get_attr(attr)
+                if value is None or not value and attr != 'value': #same as finder
+                    continue
+                item = table.get(value)
+                if item is None:
+                    item = ([], [])
+                    table[value] = item
+                item[0].append(pre)
+                item[1].append((order, node))
+
+    # pre-order position and last subnode position (nodes are saved as field views are recreated)
+    def _add_spans(self, node, nodes, children):
+        key = _get_key(node)
+        pre = len(nodes)
+        nodes.append(node)
+
+        subnodes = node.get_children() or []
+        children[key] = subnodes
+        for subnode in subnodes:
+            self._add_spans(subnode, nodes, children)
+
+        self._spans[key] = (pre, len(nodes) - 1)
+
+    # same order as NodeFinder._find_outer
+    def _add_orders(self, nodes, orders, children):
+        for node in nodes:
+            orders[_get_key(node)] = len(orders)
+        for node in nodes:
+            self._add_orders(children[_get_key(node)], orders, children)
+
+    # returns results like NodeFinder, or None if node isn't part of the index
+    def find(self, node, names, types, values, first):
+        span = self._spans.get(_get_key(node))
+        if span is None:
+            return None
+        start, end = span
+
+        matches = []
+        target_index = 0
+        for table, targets in zip(self._tables, (names, types, values)):
+            for target in targets:
+                target_index += 1
+                item = table.get(target)
+                if not item:
+                    continue
+                pres, entries = item
+                # subnodes only (base node isn't a result)
+                for i in range(bisect_right(pres, start), bisect_right(pres, end)):
+                    order, subnode = entries[i]
+                    matches.append((order, target_index, subnode))
+
+        if not matches:
+            return []
+        # same node may match multiple targets (added in finder's order)
+        matches.sort(key=lambda match: match[0:2])
+        if first:
+            order = matches[0][0]
+            return [match[2] for match in matches if match[0] == order]
+        return [match[2] for match in matches]
+
+def _get_key(node):
+    if node.get_nodename() == 'field':
+        return node.get_field_index()
+    return node
+
+# chunk list item that contains the node (indexed object)
+def get_item(node):
+    root = node.get_root()
+    item = node
+    while True:
+        parent = item.get_parent()
+        if parent is None:
+            return None
+        if parent.get_nodename() == 'list' and parent.get_parent().get_parent() is root:
+            return item
+        item = parent
+
+# item's index, if used enough (saved per item: walked nodes, then index)
+def get_index(item):
+    indexes = item.get_root().get_indexes()
+    index = indexes.get(item)
+    if index is None:
+        return None
+    indexes.move_to_end(item)
+    if type(index) is NodeIndex:
+        return index
+    if index < INDEX_MIN_VISITS:
+        return None
+
+    index = NodeIndex(item)
+    indexes[item] = index
+    return index
+
+def add_visits(item, visits):
+    indexes = item.get_root().get_indexes()
+    indexes[item] = indexes.get(item, 0) + visits
+    indexes.move_to_end(item)
+    if len(indexes) > INDEX_CACHE_MAX:
+        indexes.popitem(last=False)
+
+
+# Finds nodes by path from a node, walking only matching children per step, ex.
+#   'HircChunk/listLoadedItem/*/@sid'
+# Steps may be a node name, '*' for any node, or '@type' for fields of that type. Results are
+# in tree order. Paths are parsed once and reused (see get_selector).
+class NodeSelector(object):
+    def __init__(self, path):
+        self.path = path
+        self.steps = []
+        for step in path.split('/'):
+            if not step or step == '@':
+                raise ValueError("bad selector path: %s" % (path))
+            if step == '*':
+                self.steps.append((None, None))
+            elif step.startswith('@'):
+                self.steps.append(('type', step[1:]))
+            else:
+                self.steps.append(('name', step))
+
+    def select(self, node):
+        if not node:
+            return []
+        return list(self._iter(node, 0))
+
+    def select1(self, node):
+        if not node:
+            return None
+        return next(self._iter(node, 0), None)
+
+    def _iter(self, node, depth):
+        children = node.get_children()
+        if not children:
+            return
+        attr, value = self.steps[depth]
+        last = depth + 1 == len(self.steps)
+        for child in children:
+            if attr and child.get_attr(attr) != value:
+                continue
+            if last:
+                yield child
+            else:
+                yield from self._iter(child, depth + 1)
+
+_selectors = {}
+
+def get_selector(path):
+    selector = _selectors.get(path)
+    if not selector:
+        selector = NodeSelector(path)
+        _selectors[path] = selector
+    return selector
+
+
 def node_find(node, name=None, type=None, names=None, types=None, value=None, values=None):
     finder = NodeFinder(name=name, type=type, names=names, types=types)
     return finder.find(node)
@@ -104,3 +104,6 @@ class FormatterChannelConfig(object):
             mapping = "None"
 
         return "0x%05X [%s]" % (value, mapping.strip())
+
+# all formatter types (for checks)
+FORMATTERS = (FormatterHex, FormatterLUT, FormatterChannelConfig)
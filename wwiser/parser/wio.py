@@ -1,36 +1,131 @@
-import os, struct
+import os, io, re, struct, mmap, threading
+
+READER_AUTO = 'auto'
+READER_MMAP = 'mmap'
+READER_FILE = 'file'
+READER_MODES = [READER_AUTO, READER_MMAP, READER_FILE]
+
+# precompiled per endianness, to avoid re-parsing formats per read
+_S_D64LE = struct.Struct('<d')
+_S_D64BE = struct.Struct('>d')
+_S_F32LE = struct.Struct('<f')
+_S_F32BE = struct.Struct('>f')
+_S_S64LE = struct.Struct('<q')
+_S_S64BE = struct.Struct('>q')
+_S_U64LE = struct.Struct('<Q')
+_S_U64BE = struct.Struct('>Q')
+_S_S32LE = struct.Struct('<i')
+_S_S32BE = struct.Struct('>i')
+_S_U32LE = struct.Struct('<I')
+_S_U32BE = struct.Struct('>I')
+_S_S16LE = struct.Struct('<h')
+_S_S16BE = struct.Struct('>h')
+_S_U16LE = struct.Struct('<H')
+_S_U16BE = struct.Struct('>H')
+_S_S8 = struct.Struct('b')
+_S_U8 = struct.Struct('B')
+
+# c-strings end on a null or non-ASCII byte (128b only), and have an arbitrary max
+_STZ_END = re.compile(b'[\\x00\\x80-\\xff]')
+_STZ_MAX = 256
+# variable ints use 7 bits per byte, setting the high bit when more bytes follow
+_VAR_MAX = 11
+# bytes read at once when hashing files
+_HASH_CHUNK = 0x100000
+
+
+# Opens a reader for a bank file. By default memory-maps the file (reads are then done over
+# the mapped buffer without per-field syscalls) but falls back to regular file reads if the
+# file can't be mapped (empty files, non-file objects, etc).
+def open_reader(file, mode=None):
+    if not mode:
+        mode = READER_AUTO
+
+    if mode == READER_FILE:
+        return FileReader(file)
+
+    try:
+        return MappedReader(file)
+    except (ValueError, OSError):
+        if mode == READER_MMAP:
+            raise
+        file.seek(0, os.SEEK_SET)
+        return FileReader(file)
+
+
+# Applies a xorpad over the start of data at once (rather than per read).
+def unxor(data, xorpad):
+    size = min(len(data), len(xorpad))
+    if not size:
+        return data
+    head = unxor_head(data[0:size], xorpad)
+    return b''.join((head, memoryview(data)[size:]))
+
+# Applies a xorpad to a (small) block of data at the start of the bank.
+def unxor_head(head, xorpad):
+    size = min(len(head), len(xorpad))
+    value = int.from_bytes(head[0:size], 'big') ^ int.from_bytes(xorpad[0:size], 'big')
+    return value.to_bytes(size, 'big') + head[size:]
+
+
+# File wrapper that returns decrypted data for the start of the file (see FileReader.set_xorpad).
+class _XorpadFile(object):
+
+    def __init__(self, file, head):
+        self._file = file
+        self._head = head
+        self.name = file.name
+
+    def read(self, size=-1):
+        offset = self._file.tell()
+        data = self._file.read(size)
+        head_size = len(self._head)
+        if offset < head_size and data:
+            end = min(head_size, offset + len(data))
+            data = self._head[offset:end] + data[end - offset:]
+        return data
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        return self._file.seek(offset, whence)
+
+    def tell(self):
+        return self._file.tell()
+
 
 class FileReader(object):
 
     def __init__(self, file):
         self.file = file
         self.be = False
-        self._xorpad = None
+        self._name = file.name
 
         file.seek(0, os.SEEK_END)
         self.size = file.tell()
         file.seek(0, os.SEEK_SET)
 
-    #def _read_buf(self, offset, type, size):
-    #    elem = self.buf[offset:offset+size]
-    #    return struct.unpack(type, elem)[0]
-
     def _check(self, elem, size):
         if not elem or len(elem) != size:
             raise ReaderError("can't read requested 0x%x bytes at 0x%x" % (size, self.current()))
 
-    def __read(self, offset, type, size):
+    def _read(self, offset, st):
+        size = st.size
         if offset is not None:
             self.file.seek(offset, os.SEEK_SET)
         elem = self.file.read(size)
-        if self._xorpad:
-            elem = self.__unxor(elem, size)
+        self._check(elem, size)
+
+        return st.unpack(elem)[0]
 
+    def _unpack(self, offset, st):
+        size = st.size
+        if offset is not None:
+            self.file.seek(offset, os.SEEK_SET)
+        elem = self.file.read(size)
         self._check(elem, size)
 
-        return struct.unpack(type, elem)[0]
+        return st.unpack(elem)
 
-    def __read_string(self, offset, size):
+    def _read_string(self, offset, size):
         if offset is not None:
             self.file.seek(offset, os.SEEK_SET)
         if size == 0:
@@ -45,7 +140,7 @@ class FileReader(object):
         text = elem.decode('UTF-8')
         return text
 
-    def __bytes(self, offset, size):
+    def _bytes(self, offset, size):
         if offset is not None:
             self.file.seek(offset, os.SEEK_SET)
         elem = self.file.read(size)
@@ -54,27 +149,11 @@ class FileReader(object):
         elem = bytes(elem) #force
         return elem
 
-    def __unxor(self, elem, size):
-        offset = self.current() - size
-        xorpad_len = len(self._xorpad)
-        if offset >= xorpad_len:
-            return elem
-
-        max = offset + size
-        if max > xorpad_len:
-            max = xorpad_len
-
-        elem = bytearray(elem)
-        for i in range(offset, max):
-            xor = self._xorpad[i]
-            elem[i - offset] ^= xor
-        return elem
-
     def d64le(self, offset = None):
-        return self.__read(offset, '<d', 8)
+        return self._read(offset, _S_D64LE)
 
     def d64be(self, offset = None):
-        return self.__read(offset, '>d', 8)
+        return self._read(offset, _S_D64BE)
 
     def d64(self, offset = None):
         if self.be:
@@ -83,10 +162,10 @@ class FileReader(object):
             return self.d64le(offset)
 
     def f32le(self, offset = None):
-        return self.__read(offset, '<f', 4)
+        return self._read(offset, _S_F32LE)
 
     def f32be(self, offset = None):
-        return self.__read(offset, '>f', 4)
+        return self._read(offset, _S_F32BE)
 
     def f32(self, offset = None):
         if self.be:
@@ -95,16 +174,16 @@ class FileReader(object):
             return self.f32le(offset)
 
     def s64le(self, offset = None):
-        return self.__read(offset, '<q', 8)
+        return self._read(offset, _S_S64LE)
 
     def s64be(self, offset = None):
-        return self.__read(offset, '>q', 8)
+        return self._read(offset, _S_S64BE)
 
     def u64le(self, offset = None):
-        return self.__read(offset, '<Q', 8)
+        return self._read(offset, _S_U64LE)
 
     def u64be(self, offset = None):
-        return self.__read(offset, '>Q', 8)
+        return self._read(offset, _S_U64BE)
 
     def s64(self, offset = None):
         if self.be:
@@ -119,16 +198,16 @@ class FileReader(object):
             return self.u64le(offset)
 
     def s32le(self, offset = None):
-        return self.__read(offset, '<i', 4)
+        return self._read(offset, _S_S32LE)
 
     def s32be(self, offset = None):
-        return self.__read(offset, '>i', 4)
+        return self._read(offset, _S_S32BE)
 
     def u32le(self, offset = None):
-        return self.__read(offset, '<I', 4)
+        return self._read(offset, _S_U32LE)
 
     def u32be(self, offset = None):
-        return self.__read(offset, '>I', 4)
+        return self._read(offset, _S_U32BE)
 
     def s32(self, offset = None):
         if self.be:
@@ -143,10 +222,10 @@ class FileReader(object):
             return self.u32le(offset)
 
     def s16le(self, offset = None):
-        return self.__read(offset, '<h', 2)
+        return self._read(offset, _S_S16LE)
 
     def s16be(self, offset = None):
-        return self.__read(offset, '>h', 2)
+        return self._read(offset, _S_S16BE)
 
     def s16(self, offset = None):
         if self.be:
@@ -155,10 +234,10 @@ class FileReader(object):
             return self.s16le(offset)
 
     def u16le(self, offset = None):
-        return self.__read(offset, '<H', 2)
+        return self._read(offset, _S_U16LE)
 
     def u16be(self, offset = None):
-        return self.__read(offset, '>H', 2)
+        return self._read(offset, _S_U16BE)
 
     def u16(self, offset = None):
         if self.be:
@@ -167,17 +246,83 @@ class FileReader(object):
             return self.u16le(offset)
 
     def s8(self, offset = None):
-        return self.__read(offset, 'b', 1)
+        return self._read(offset, _S_S8)
 
     def u8(self, offset = None):
-        return self.__read(offset, 'B', 1)
+        return self._read(offset, _S_U8)
 
     def str(self, size, offset = None):
-        return self.__read_string(offset, size)
+        return self._read_string(offset, size)
 
     def fourcc(self, offset = None):
         #as bytes rather than string to avoid failures on bad data
-        return self.__bytes(offset, 4)
+        return self._bytes(offset, 4)
+
+    def raw(self, size, offset = None):
+        #block of bytes, for bulk decoding
+        return self._bytes(offset, size)
+
+    def unpack(self, st, offset = None):
+        #all values of a struct.Struct (with endianness already set), for bulk decoding
+        return self._unpack(offset, st)
+
+    # feeds all data to a hashlib object, in chunks rather than a full copy
+    def update_hash(self, hasher):
+        current = self.current()
+        self.file.seek(0, os.SEEK_SET)
+        while True:
+            data = self.file.read(_HASH_CHUNK)
+            if not data:
+                break
+            hasher.update(data)
+        self.file.seek(current, os.SEEK_SET)
+
+    def stz(self, offset = None):
+        if offset is not None:
+            self.seek(offset)
+        offset = self.current()
+        data = self._peek(offset, _STZ_MAX)
+        return self._decode_stz(offset, data)
+
+    def var(self, offset = None):
+        if offset is not None:
+            self.seek(offset)
+        offset = self.current()
+        data = self._peek(offset, _VAR_MAX)
+        return self._decode_var(offset, data)
+
+    # reads up to size bytes (less near EOF) without moving
+    def _peek(self, offset, size):
+        data = self.file.read(size)
+        self.file.seek(offset, os.SEEK_SET)
+        return data
+
+    # terminator is found with a single search, rather than reading byte by byte
+    def _decode_stz(self, offset, data):
+        match = _STZ_END.search(data)
+        if not match:
+            if len(data) >= _STZ_MAX:
+                raise ValueError("long string")
+            raise ReaderError("can't read requested 0x%x bytes at 0x%x" % (1, offset + len(data)))
+
+        end = match.start()
+        self.seek(offset + end + 1) #terminator is consumed too
+        return data[0:end].decode('ascii')
+
+    def _decode_var(self, offset, data):
+        value = 0
+        for i, cur in enumerate(data):
+            value = (value << 7) | (cur & 0x7F)
+            if not cur & 0x80:
+                break
+        else:
+            if len(data) < _VAR_MAX:
+                raise ReaderError("can't read requested 0x%x bytes at 0x%x" % (1, offset + len(data)))
+
+        if i + 1 >= _VAR_MAX:
+            raise ValueError("unexpected variable loop count")
+        self.seek(offset + i + 1)
+        return value
 
     def gap(self, bytes):
         offset_before = self.current()
@@ -199,7 +344,7 @@ class FileReader(object):
         return self.size
 
     def guess_endian32(self, offset):
-        current = self.file.tell()
+        current = self.current()
         var_le = self.u32le(offset)
         var_be = self.u32be(offset)
 
@@ -207,7 +352,7 @@ class FileReader(object):
             self.be = True
         else:
             self.be = False
-        self.file.seek(current, os.SEEK_SET)
+        self.seek(current)
 
     def get_endian_big(self):
         return self.be
@@ -219,13 +364,237 @@ class FileReader(object):
         return self.current() >= self.size
 
     def get_path(self):
-        return os.path.dirname(self.file.name)
+        return os.path.dirname(self._name)
 
     def get_filename(self):
-        return os.path.basename(self.file.name)
+        return os.path.basename(self._name)
 
+    # Decrypts data affected by the xorpad once, so reads don't need to decrypt it. Only the
+    # xorpad-sized start is kept in memory (encrypted banks may have big embedded media).
     def set_xorpad(self, xorpad):
-        self._xorpad = xorpad
+        current = self.current()
+        self.file.seek(0, os.SEEK_SET)
+        head = unxor_head(self.file.read(len(xorpad)), xorpad)
+        self.file = _XorpadFile(self.file, head)
+        self.file.seek(current, os.SEEK_SET)
+
+    # keeps reader usable once the file is closed (for data parsed later)
+    def detach(self):
+        current = self.current()
+        self.file.seek(0, os.SEEK_SET)
+        self.file = io.BytesIO(self.file.read())
+        self.file.seek(current, os.SEEK_SET)
+
+    def close(self):
+        pass
+
+    # parsed trees may be sent to other processes, keeping only info (reader can't be used then)
+    def __getstate__(self):
+        return {'be': self.be, 'size': self.size, '_name': self._name}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.file = None
+
+
+# Same API as FileReader but over a memory-mapped buffer, keeping the current offset in python.
+# Values are unpacked directly from the buffer, so reads don't need file seek/read calls.
+class MappedReader(FileReader):
+
+    def __init__(self, file):
+        super(MappedReader, self).__init__(file)
+        # may throw ValueError/OSError on empty or unmappable files
+        self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = self._map
+        self._pos = 0
+
+    def _check_size(self, offset, size):
+        if offset + size > self.size or offset < 0:
+            raise ReaderError("can't read requested 0x%x bytes at 0x%x" % (size, offset))
+
+    def _read(self, offset, st):
+        if offset is None:
+            offset = self._pos
+        size = st.size
+        end = offset + size
+        if end > self.size or offset < 0:
+            self._check_size(offset, size)
+        self._pos = end
+
+        return st.unpack_from(self._buf, offset)[0]
+
+    def _unpack(self, offset, st):
+        if offset is None:
+            offset = self._pos
+        size = st.size
+        end = offset + size
+        if end > self.size or offset < 0:
+            self._check_size(offset, size)
+        self._pos = end
+
+        return st.unpack_from(self._buf, offset)
+
+    def _read_string(self, offset, size):
+        if offset is not None:
+            self._pos = offset
+        if size == 0:
+            return ""
+        elem = self._bytes(None, size)
+
+        #remove c-string null terminator, .decode() retains it
+        if elem[-1] == 0:
+            elem = elem[:-1]
+        text = elem.decode('UTF-8')
+        return text
+
+    def _bytes(self, offset, size):
+        if offset is None:
+            offset = self._pos
+        self._check_size(offset, size)
+        self._pos = offset + size
+
+        return self._buf[offset:offset + size]
+
+    def var(self, offset = None):
+        if offset is None:
+            offset = self._pos
+        if 0 <= offset < self.size:
+            cur = self._buf[offset]
+            if not cur & 0x80: #most values fit in 1 byte
+                self._pos = offset + 1
+                return cur
+        return super(MappedReader, self).var(offset)
+
+    def _peek(self, offset, size):
+        if offset < 0 or offset > self.size:
+            self._check_size(offset, 1)
+        return self._buf[offset:offset + size]
+
+    def update_hash(self, hasher):
+        hasher.update(self._buf) #hashed from the map directly
+
+    def seek(self, offset):
+        self._pos = offset
+
+    def skip(self, bytes):
+        self._pos += bytes
+
+    def current(self):
+        return self._pos
+
+    # Remaps as a private copy-on-write mmap and decrypts the start in place, so only pages
+    # affected by the xorpad are copied in memory.
+    def set_xorpad(self, xorpad):
+        map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_COPY)
+        size = min(len(map), len(xorpad))
+        map[0:size] = unxor_head(map[0:size], xorpad)
+        self._map.close()
+        self._map = map
+        self._buf = map
+
+    def detach(self):
+        pass #mmap stays valid after closing the file
+
+    def close(self):
+        self._buf = None
+        self._map.close()
+
+
+# Same API as MappedReader but over bank data already in memory (see Prefetcher).
+class MemoryReader(MappedReader):
+
+    def __init__(self, name, data):
+        self.be = False
+        self._name = name
+        self.size = len(data)
+        self._map = None
+        self._buf = data
+        self._pos = 0
+
+    # data is already in memory (limited by prefetch budget), and must be kept as bytes
+    def set_xorpad(self, xorpad):
+        self._buf = unxor(self._buf, xorpad)
+
+    def close(self):
+        self._buf = None
+
+
+# Reads files in a background thread in the order they will be used, so disk reads overlap with
+# parsing. Up to budget bytes are kept in memory until taken (bigger files are skipped and should
+# be read normally).
+class Prefetcher(object):
+
+    def __init__(self, filenames, budget):
+        self._filenames = []
+        for filename in filenames:
+            if filename not in self._filenames:
+                self._filenames.append(filename)
+        self._pending = set(self._filenames)
+        self._budget = budget
+        self._used = 0
+        self._items = {}
+        self._stop = False
+        self._cond = threading.Condition()
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        for filename in self._filenames:
+            data = self._read(filename)
+            with self._cond:
+                if self._stop:
+                    return
+                self._items[filename] = data
+                self._cond.notify_all()
+
+    def _read(self, filename):
+        try:
+            size = os.path.getsize(filename)
+        except OSError:
+            return None
+        if size > self._budget:
+            return None
+
+        with self._cond:
+            while self._used + size > self._budget and not self._stop:
+                self._cond.wait()
+            if self._stop:
+                return None
+            self._used += size
+
+        try:
+            with open(filename, 'rb') as f:
+                data = f.read()
+        except OSError:
+            data = b''
+
+        with self._cond:
+            self._used += len(data) - size #in case file changed
+        return data or None
+
+    # returns file's data once read, or None if it wasn't prefetched (read normally then)
+    def get(self, filename):
+        with self._cond:
+            if filename not in self._pending:
+                return None
+            self._pending.discard(filename)
+
+            while filename not in self._items:
+                self._cond.wait()
+            data = self._items.pop(filename)
+            if data is not None:
+                self._used -= len(data)
+                self._cond.notify_all()
+        return data
+
+    def close(self):
+        with self._cond:
+            self._stop = True
+            self._items = {}
+            self._cond.notify_all()
+        self._thread.join()
+
 
 class ReaderError(Exception):
     def __init__(self, msg):
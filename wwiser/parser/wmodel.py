@@ -1,6 +1,6 @@
-import os
+import os, struct, array, copy
 from collections import OrderedDict
-from . import wdefs, wfinder
+from . import wdefs, wfinder, wfmt
 
 #maybe should be in some enum?
 TYPE_4CC = '4cc'
@@ -42,6 +42,48 @@ TYPES_SIZE = {
     TYPE_STR: -1, #variable
     TYPE_STZ: -1, #variable
 }
+# fixed-size types that can be decoded in bulk (see NodeObject.records)
+TYPES_STRUCT = {
+    TYPE_D64: 'd',
+    TYPE_S64: 'q',
+    TYPE_U64: 'Q',
+    TYPE_4CC: '4s',
+    TYPE_S32: 'i',
+    TYPE_U32: 'I',
+    TYPE_F32: 'f',
+    TYPE_SID: 'I',
+    TYPE_TID: 'I',
+    TYPE_S16: 'h',
+    TYPE_U16: 'H',
+    TYPE_S8: 'b',
+    TYPE_U8: 'B',
+}
+
+# parse profiles: how much of the bank is read in detail
+PROFILE_FULL = 'full'
+PROFILE_TXTP = 'txtp' #only what the txtp generator needs (unused HIRC types/plugin params are left as gaps)
+PROFILES = [PROFILE_FULL, PROFILE_TXTP]
+TYPES_UNSIGNED32 = {TYPE_U32, TYPE_SID, TYPE_TID}
+
+# compiled structs per record layout and endianness
+_record_structs = {}
+
+def _get_record_struct(types, be):
+    key = (types, be)
+    st = _record_structs.get(key)
+    if not st:
+        if be:
+            format = '>'
+        else:
+            format = '<'
+        for type in types:
+            if type not in TYPES_STRUCT:
+                raise ValueError("unsupported record field type " + type)
+            format += TYPES_STRUCT[type]
+        st = struct.Struct(format)
+        _record_structs[key] = st
+    return st
+
 #not used ATM, just some (rather obvious) doc
 TYPES_INFO = {
     TYPE_SID: "ShortID (uint32_t)",
@@ -65,6 +107,195 @@ TYPES_INFO = {
 }
 
 
+# Field info for a whole bank, stored in columns rather than one object per field (banks have
+# lots of fields, so this reduces memory a lot). Objects keep their fields as ranges of indexes
+# in their children, and NodeFields are created on access as views of one index.
+# Types, formatters and hashtypes are saved as codes (formatters must be defined in wdefs).
+FIELD_TYPES = [
+    TYPE_4CC, TYPE_D64, TYPE_S64, TYPE_U64, TYPE_S32, TYPE_U32, TYPE_F32, TYPE_SID, TYPE_TID,
+    TYPE_UNI, TYPE_S16, TYPE_U16, TYPE_S8, TYPE_U8, TYPE_VAR, TYPE_GAP, TYPE_STR, TYPE_STZ,
+] + ['bit%i' % (i) for i in range(64)] #subfields
+FIELD_TYPE_CODES = {type: code for code, type in enumerate(FIELD_TYPES)}
+
+FIELD_FMTS = [None] + [value for value in vars(wdefs).values() if isinstance(value, wfmt.FORMATTERS)]
+FIELD_FMT_CODES = {id(fmt): code for code, fmt in enumerate(FIELD_FMTS)}
+
+FIELD_HASHTYPES = [False, None] + [value for key, value in vars(wdefs).items() if key.startswith('fnv_') and isinstance(value, str)]
+FIELD_HASHTYPE_CODES = {hashtype: code for code, hashtype in enumerate(FIELD_HASHTYPES)}
+
+class NodeFieldStore(object):
+    __slots__ = ['offsets', 'types', 'names', 'values', 'fmts', 'hashtypes', 'subfields', 'rows']
+
+    def __init__(self):
+        self.offsets = array.array('q') #-1 = none
+        self.types = bytearray()
+        self.names = []
+        self.values = []
+        self.fmts = bytearray()
+        self.hashtypes = bytearray()
+        self.subfields = {} #index > children runs, for bit fields
+        self.rows = {} #index > cached namerow
+
+    def add(self, offset, type, name, value):
+        index = len(self.values)
+        if offset is None:
+            offset = -1
+        self.offsets.append(offset)
+        self.types.append(FIELD_TYPE_CODES[type])
+        self.names.append(name)
+        self.values.append(value)
+        self.fmts.append(0)
+        self.hashtypes.append(0)
+        return index
+
+    # adds consecutive fields at once (see FieldRun), with columns already as codes
+    def add_run(self, offsets, types, names, values, fmts, hashtypes):
+        index = len(self.values)
+        self.offsets.extend(offsets)
+        self.types.extend(types)
+        self.names.extend(names)
+        self.values.extend(values)
+        self.fmts.extend(fmts)
+        self.hashtypes.extend(hashtypes)
+        return index
+
+    def set_fmt(self, index, fmt):
+        code = FIELD_FMT_CODES.get(id(fmt))
+        if code is None:
+            raise ValueError("unknown formatter (must be in wdefs)")
+        self.fmts[index] = code
+
+    def get_fmt(self, index):
+        return FIELD_FMTS[self.fmts[index]]
+
+    def set_hashtype(self, index, hashtype):
+        self.hashtypes[index] = FIELD_HASHTYPE_CODES[hashtype]
+
+    def get_hashtype(self, index):
+        return FIELD_HASHTYPES[self.hashtypes[index]]
+
+    def get_offset(self, index):
+        offset = self.offsets[index]
+        if offset < 0:
+            return None
+        return offset
+
+    def get_type(self, index):
+        return FIELD_TYPES[self.types[index]]
+
+    # removes fields from index onwards (once their nodes aren't used)
+    def truncate(self, index):
+        del self.offsets[index:]
+        del self.types[index:]
+        del self.names[index:]
+        del self.values[index:]
+        del self.fmts[index:]
+        del self.hashtypes[index:]
+        for cache in (self.subfields, self.rows):
+            for key in [key for key in cache if key >= index]:
+                del cache[key]
+
+# adds field index to a children list, extending the last range if possible
+def _append_field(children, index):
+    if children:
+        last = children[-1]
+        if type(last) is range and last.stop == index:
+            children[-1] = range(last.start, index + 1)
+            return
+    children.append(range(index, index + 1))
+
+# same for consecutive field indexes
+def _append_fields(children, start, stop):
+    if children:
+        last = children[-1]
+        if type(last) is range and last.stop == start:
+            children[-1] = range(last.start, stop)
+            return
+    children.append(range(start, stop))
+
+# Consecutive fixed-size fields (plus their bit subfields) that can be read at once, see
+# NodeObject.fields. Items are (type, name, fmt, hashtype, bits), with bits as a list of
+# (name, bit, mask, fmt), and field columns are precalculated in the order they'd be added
+# when reading one by one, so the bank's fields end up the same.
+class FieldRun(object):
+    __slots__ = ['items', 'structs', 'offsets', 'type_codes', 'names', 'fmt_codes', 'hashtype_codes', 'rows', 'spans', 'subfields', 'unsigned32']
+
+    def __init__(self, items):
+        self.items = items
+        self.offsets = [] #relative to run start, -1 = subfield
+        self.type_codes = bytearray()
+        self.names = []
+        self.fmt_codes = bytearray()
+        self.hashtype_codes = bytearray()
+        self.rows = [] #(item index, bit, mask), mask None = item's value
+        self.spans = [] #(start, stop) rows of consecutive items, added as object's children
+        self.subfields = [] #(item row, number of bits)
+        self.unsigned32 = [] #items that need -1 fix
+
+        offset = 0
+        for index, (type, name, fmt, hashtype, bits) in enumerate(self.items):
+            if type not in TYPES_STRUCT:
+                raise ValueError("unsupported run field type " + type)
+            if type in TYPES_UNSIGNED32:
+                self.unsigned32.append(index)
+            row = len(self.rows)
+            if self.spans and self.spans[-1][1] == row:
+                self.spans[-1] = (self.spans[-1][0], row + 1)
+            else:
+                self.spans.append((row, row + 1))
+            if bits:
+                self.subfields.append((row, len(bits)))
+            self._add_row(offset, type, name, fmt, hashtype, index, 0, None)
+
+            for bit_name, bit, mask, bit_fmt in bits:
+                if not bit_fmt and mask > 1:
+                    bit_fmt = wdefs.fmt_hex
+                self._add_row(-1, 'bit' + str(bit), bit_name, bit_fmt, None, index, bit, mask)
+            offset += TYPES_SIZE[type]
+
+        types = tuple(item[0] for item in items)
+        self.structs = (_get_record_struct(types, False), _get_record_struct(types, True)) #LE, BE
+
+    def _add_row(self, offset, type, name, fmt, hashtype, index, bit, mask):
+        fmt_code = 0
+        if fmt:
+            fmt_code = FIELD_FMT_CODES.get(id(fmt))
+            if fmt_code is None:
+                raise ValueError("unknown formatter (must be in wdefs)")
+        hashtype_code = 0
+        if hashtype:
+            hashtype_code = FIELD_HASHTYPE_CODES[hashtype]
+
+        self.offsets.append(offset)
+        self.type_codes.append(FIELD_TYPE_CODES[type])
+        self.names.append(name)
+        self.fmt_codes.append(fmt_code)
+        self.hashtype_codes.append(hashtype_code)
+        self.rows.append((index, bit, mask))
+
+_new_object = object.__new__
+
+# converts children with field ranges to nodes
+def _get_field_children(parent, children, fields):
+    nodes = []
+    for child in children:
+        if type(child) is range:
+            for index in child:
+                nodes.append(NodeField.view(fields, index, parent))
+        else:
+            nodes.append(child)
+    return nodes
+
+# same, but reusing the nodes made last time while children don't change (only the last item is
+# replaced or new ones are added), so field views are made once per parent. Cache is (count, last, nodes).
+def _get_cached_children(parent, children, fields):
+    cache = parent._nodes
+    if cache is None or cache[0] != len(children) or cache[1] is not children[-1]:
+        cache = (len(children), children[-1], _get_field_children(parent, children, fields))
+        parent._nodes = cache
+    return cache[2]
+
+
 # base parent class for nodes
 class NodeElement(object):
     __slots__ = ['__nodename', '_parent', '_children', '_root', '_error_count', '_skip_count', '_omax']
@@ -101,8 +332,11 @@ class NodeElement(object):
 
     # *** external access ***
 
-    def get_attrs(self): #generic access to node's attributes
-        return {} #use throw away dicts
+    def get_attrs(self): #generic access to node's attributes (throw away dicts)
+        return dict(self.get_attr_items())
+
+    def get_attr_items(self): #same as get_attrs but as (key, value) tuples, without making dicts
+        return ()
 
     def get_attr(self, attr): #access to node's attribute (faster than get_attrs)
         return None
@@ -127,6 +361,26 @@ class NodeElement(object):
         return None
 
 
+    # copy of this node and its children under another parent (see NodeRoot.make_copy)
+    def _clone(self, parent):
+        node = _new_object(type(self))
+        node._parent = parent
+        node._root = parent._root
+        self._copy_attrs(node)
+        children = self._children
+        if children:
+            node._children = [child if type(child) is range else child._clone(node) for child in children]
+        else:
+            node._children = children
+        return node
+
+    # sets this node's attributes in a new node (subclasses add their own)
+    def _copy_attrs(self, node):
+        node.__nodename = self.__nodename
+        node._error_count = self._error_count
+        node._skip_count = self._skip_count
+        node._omax = self._omax
+
     def get_error_count(self):
         return self._error_count
 
@@ -144,10 +398,17 @@ class NodeElement(object):
     def finds(self, **args):
         return wfinder.NodeFinder(**args).finds(self)
 
+    # nodes by path (see wfinder.NodeSelector), faster than finds when structure is known
+    def select(self, path):
+        return wfinder.get_selector(path).select(self)
+
+    def select1(self, path):
+        return wfinder.get_selector(path).select1(self)
+
 
 # root node with special definitions (represents a bank)
 class NodeRoot(NodeElement):
-    __slots__ = ['__r', '__filename', '__path', '_version', '_id', '_lang', '_feedback', '_custom', '_subversion', '_names', '_strings']
+    __slots__ = ['__r', '__filename', '__path', '_version', '_defs', '_profile', '_fields', '_stream', '_indexes', '_parse_stats', '_id', '_lang', '_feedback', '_custom', '_subversion', '_names', '_strings']
 
     def __init__(self, r, version=0):
         super(NodeRoot, self).__init__(None, 'root')
@@ -155,6 +416,12 @@ class NodeRoot(NodeElement):
         self.__filename = r.get_filename()
         self.__path = r.get_path()
         self._version = version
+        self._defs = None
+        self._profile = PROFILE_FULL
+        self._fields = NodeFieldStore()
+        self._stream = None
+        self._indexes = None
+        self._parse_stats = None
 
         self._id = None
         self._subversion = None
@@ -167,13 +434,12 @@ class NodeRoot(NodeElement):
 
     # *** inheritance ***
 
-    def get_attrs(self):
-        attrs = OrderedDict([
+    def get_attr_items(self):
+        return (
             ('filename', self.__filename),
             ('path', self.__path),
             ('version', self._version),
-        ])
-        return attrs
+        )
 
     # *** node helpers ***
 
@@ -204,11 +470,65 @@ class NodeRoot(NodeElement):
     def get_path(self):
         return self.__path
 
+    # same bank loaded from another file (exact copy), with its own nodes (so get_root() in them
+    # returns the copy) but sharing this bank's fields
+    def make_copy(self, filename):
+        root = copy.copy(self)
+        root._root = root
+        root.__filename = os.path.basename(filename)
+        root.__path = os.path.dirname(filename)
+        root._indexes = None
+        if self._children:
+            root._children = [child._clone(root) for child in self._children]
+        return root
+
     def get_version(self):
         return self._version
 
     def set_version(self, version):
         self._version = version
+        self._defs = wdefs.get_defs(version)
+
+    # version-dependent definitions (enums) for this bank
+    def get_defs(self):
+        return self._defs
+
+    def get_profile(self):
+        return self._profile
+
+    def set_profile(self, profile):
+        self._profile = profile
+
+    # sid/tid values in parsed fields (to prefetch names)
+    def get_field_ids(self):
+        fields = self._fields
+        codes = (FIELD_TYPE_CODES[TYPE_SID], FIELD_TYPE_CODES[TYPE_TID])
+        values = fields.values
+        return {values[index] for index, code in enumerate(fields.types) if code in codes}
+
+    # wstats.ParseStats to record parsed parts, if set
+    def get_parse_stats(self):
+        return self._parse_stats
+
+    def set_parse_stats(self, stats):
+        self._parse_stats = stats
+
+    # Sets a callback(list, item) that receives items of lists in chunks once parsed, so they
+    # don't need to be kept in memory (items are removed from the list after the call).
+    def set_stream(self, callback):
+        self._stream = callback
+
+    # removes parsed chunks and their fields (when streaming, once used)
+    def release_chunks(self):
+        self._children = None
+        self._fields.truncate(0)
+        self._indexes = None
+
+    # cached wfinder.NodeIndex per object
+    def get_indexes(self):
+        if self._indexes is None:
+            self._indexes = OrderedDict()
+        return self._indexes
 
     def get_id(self):
         return self._id
@@ -246,10 +566,20 @@ class NodeRoot(NodeElement):
     def is_be(self):
         return self.__r.get_endian_big()
 
+    # bank info besides nodes, for caches
+    def get_info(self):
+        return (self._version, self._id, self._lang, self._feedback, self._custom, self._subversion,
+                self._strings, self._error_count, self._skip_count)
+
+    def set_info(self, info):
+        version, self._id, self._lang, self._feedback, self._custom, self._subversion, \
+            self._strings, self._error_count, self._skip_count = info
+        self.set_version(version)
+
 
 # logical node container of other nodes, with data reading helpers (represents a class)
 class NodeObject(NodeElement):
-    __slots__ = ['__r', '__name', 'lastval', '_index']
+    __slots__ = ['__r', '__name', 'lastval', '_index', '_nodes']
 
     def __init__(self, parent, r, name):
         super(NodeObject, self).__init__(parent, 'object')
@@ -257,16 +587,14 @@ class NodeObject(NodeElement):
         self.__name = name
         self._index = None
         self.lastval = None
+        self._nodes = None
 
     # *** inheritance ***
 
-    def get_attrs(self):
-        attrs = OrderedDict([
-            ('name', self.__name),
-        ])
+    def get_attr_items(self):
         if self._index is not None:
-            attrs['index'] = self._index
-        return attrs
+            return (('name', self.__name), ('index', self._index))
+        return (('name', self.__name),)
 
     def get_attr(self, attr):
         if attr == 'name':
@@ -278,6 +606,28 @@ class NodeObject(NodeElement):
     def get_name(self):
         return self.__name
 
+    def get_children(self):
+        children = self._children
+        if not children:
+            return children
+        return _get_cached_children(self, children, self._root._fields)
+
+    def _copy_attrs(self, node):
+        super(NodeObject, self)._copy_attrs(node)
+        node.__r = self.__r
+        node.__name = self.__name
+        node.lastval = self.lastval
+        node._index = self._index
+        node._nodes = None
+
+    def append(self, node):
+        if type(node) is NodeField:
+            if self._children is None:
+                self._children = []
+            _append_field(self._children, node.get_field_index())
+            return
+        super(NodeObject, self).append(node)
+
     # changes name, mainly to alter subclasses
     def set_name(self, name):
         self.__name = name
@@ -285,6 +635,9 @@ class NodeObject(NodeElement):
     def get_index(self):
         return self._index
 
+    def _get_reader(self):
+        return self.__r
+
     # *** node helpers ***
 
     def four(self, name):
@@ -411,18 +764,7 @@ class NodeObject(NodeElement):
                 value = size
 
             elif type == TYPE_STZ:
-                # sorry...
-                stz = ""
-                max = 0
-                while True:
-                    elem = r.s8()
-                    if elem == 0 or elem < 0: #ASCII 128b only
-                        break
-                    stz += chr(elem)
-                    max += 1
-                    if max > 255: #arbitary max
-                        raise ValueError("long string")
-                value = stz
+                value = r.stz()
 
             elif type == TYPE_UNI:
                 # union of f32+u32 determined by Wwise subclass, do some simple guessing instead
@@ -433,16 +775,7 @@ class NodeObject(NodeElement):
                     value = r.f32()
 
             elif type == TYPE_VAR:
-                cur = r.u8()
-                value = (cur & 0x7F)
-
-                max = 0
-                while (cur & 0x80) and max < 10:
-                    cur = r.u8()
-                    value = (value << 7) | (cur & 0x7F)
-                    max += 1
-                if max >= 10: #arbitary max
-                    raise ValueError("unexpected variable loop count")
+                value = r.var()
             else:
                 raise ValueError("unknown field type " + type)
 
@@ -453,13 +786,16 @@ class NodeObject(NodeElement):
         #self.__dict__[name] = value
 
         # register new field as info
-        child = NodeField(self, offset, type, name, value)
-        self.append(child)
+        fields = self._root._fields
+        index = fields.add(offset, type, name, value)
+        if self._children is None:
+            self._children = []
+        _append_field(self._children, index)
 
-        return child
+        return NodeField.view(fields, index, self)
 
     # register and add a list node and return iterator with new nodes
-    def list(self, name, subname, count):
+    def list(self, name, subname, count, lazy=False):
         child = NodeList(self, name)
         self.append(child)
 
@@ -468,7 +804,165 @@ class NodeObject(NodeElement):
             raise ParseError("unlikely count %s" % count, self)
         if subname is None:
             subname = name
-        return NodeListIterator(child, self.__r, subname, count)
+        return NodeListIterator(child, self.__r, subname, count, lazy=lazy)
+
+    # register and add a list node of fixed-size records, decoded at once rather than field by field.
+    # Layout is a list of (type, name, fmt=None, hashtype=None) per record field, ex.
+    #   [(TYPE_SID, 'id', None, wdefs.fnv_no), (TYPE_U32, 'uOffset', wdefs.fmt_hex)]
+    # Resulting nodes are the same as reading each field with list() + field(). Layout may also be
+    # a FieldRun (without bits), precompiled by callers that read the same records often.
+    def records(self, name, subname, count, layout):
+        child = NodeList(self, name)
+        self.append(child)
+
+        if count > 0x30000: #arbitary max (same as list)
+            raise ParseError("unlikely count %s" % count, self)
+        if subname is None:
+            subname = name
+
+        r = self.__r
+        st = self._get_layout_struct(layout, count)
+        is_run = type(layout) is FieldRun
+        if not st:
+            # read normally so errors are handled the same
+            for elem in NodeListIterator(child, r, subname, count):
+                if is_run:
+                    elem._read_run(layout)
+                else:
+                    elem._read_layout(layout)
+            return child
+
+        offset = r.current()
+        data = r.raw(st.size * count)
+        index = 0
+        for values in st.iter_unpack(data):
+            elem = NodeObject(child, r, subname)
+            elem._index = index
+            child.append(elem)
+            if is_run:
+                elem._add_run(layout, values, offset)
+                offset += st.size
+            else:
+                offset = elem._add_layout(layout, values, offset)
+            index += 1
+        return child
+
+    # register fixed-size fields repeated N times in this object, decoded at once
+    def repeat(self, count, layout):
+        r = self.__r
+        st = self._get_layout_struct(layout, count)
+        if not st:
+            for _i in range(count):
+                self._read_layout(layout)
+            return self
+
+        offset = r.current()
+        data = r.raw(st.size * count)
+        for values in st.iter_unpack(data):
+            offset = self._add_layout(layout, values, offset)
+        return self
+
+    # register a run of fixed-size fields decoded at once (see FieldRun)
+    def fields(self, run):
+        r = self.__r
+        offset = r.current()
+        if r.get_endian_big():
+            st = run.structs[1]
+        else:
+            st = run.structs[0]
+
+        max = offset + st.size
+        if self._omax and max > self._omax or max > r.get_size():
+            # read normally so errors are handled the same
+            self._read_run(run)
+            return self
+
+        self._add_run(run, r.unpack(st), offset)
+        return self
+
+    def _read_run(self, run):
+        for type, name, fmt, hashtype, bits in run.items:
+            child = self.field(type, name)
+            if fmt:
+                child.fmt(fmt)
+            if hashtype:
+                child.fnv(hashtype)
+            for bit_name, bit, mask, bit_fmt in bits:
+                child.bit(bit_name, self.lastval, bit, mask, bit_fmt)
+
+    # registers run's fields from decoded values
+    def _add_run(self, run, values, offset):
+        if run.unsigned32:
+            values = list(values)
+            for index in run.unsigned32:
+                if values[index] == 0xFFFFFFFF:
+                    values[index] = -1
+
+        if run.subfields:
+            row_values = [values[index] if mask is None else (values[index] >> bit) & mask for index, bit, mask in run.rows]
+        else:
+            row_values = values
+
+        fields = self._root._fields
+        offsets = [-1 if item < 0 else offset + item for item in run.offsets]
+        index = fields.add_run(offsets, run.type_codes, run.names, row_values, run.fmt_codes, run.hashtype_codes)
+
+        if self._children is None:
+            self._children = []
+        children = self._children
+        for start, stop in run.spans:
+            _append_fields(children, index + start, index + stop)
+        for row, count in run.subfields:
+            start = index + row + 1
+            fields.subfields[index + row] = [range(start, start + count)]
+
+        self.lastval = values[-1]
+
+    # gets compiled layout if all records can be read in one go (otherwise must read one by one)
+    def _get_layout_struct(self, layout, count):
+        if count <= 0:
+            return None
+        r = self.__r
+        if type(layout) is FieldRun:
+            st = layout.structs[1] if r.get_endian_big() else layout.structs[0]
+        else:
+            types = tuple(item[0] for item in layout)
+            st = _get_record_struct(types, r.get_endian_big())
+
+        max = r.current() + st.size * count
+        if self._omax and max > self._omax or max > r.get_size():
+            return None
+        return st
+
+    def _read_layout(self, layout):
+        for item in layout:
+            child = self.field(item[0], item[1])
+            self._set_layout_info(child, item)
+
+    def _add_layout(self, layout, values, offset):
+        fields = self._root._fields
+        if self._children is None:
+            self._children = []
+        children = self._children
+        for item, value in zip(layout, values):
+            type = item[0]
+            if value == 0xFFFFFFFF and type in TYPES_UNSIGNED32:
+                value = -1
+            index = fields.add(offset, type, item[1], value)
+            if len(item) > 2 and item[2]:
+                fields.set_fmt(index, item[2])
+            if len(item) > 3 and item[3]:
+                fields.set_hashtype(index, item[3])
+            _append_field(children, index)
+            self.lastval = value
+            offset += TYPES_SIZE[type]
+        return offset
+
+    def _set_layout_info(self, child, item):
+        if len(item) > 2 and item[2]:
+            child.fmt(item[2])
+        if len(item) > 3 and item[3]:
+            child.fnv(item[3])
 
     # register a list with items
     def items(self, name, items):
@@ -538,6 +1032,90 @@ class NodeObject(NodeElement):
         return (omax, offset)
 
 
+# object whose contents are parsed on first access (represents an indexed HIRC item).
+# Until then only knows its name and first sid (from the item index), so it can be registered
+# and filtered without parsing; any other access parses the object, with the same end result.
+class NodeLazyObject(NodeObject):
+    __slots__ = ['_lazy', '_nsid']
+
+    def __init__(self, parent, r, name):
+        super(NodeLazyObject, self).__init__(parent, r, name)
+        self._lazy = None
+        self._nsid = None
+
+    # sets callback to parse data at offset later, and skips to object's end
+    def defer(self, loader, arg, offset, name, nsid):
+        self._lazy = (loader, arg, offset)
+        if name:
+            self.set_name(name)
+        self._nsid = nsid
+
+        r = self._get_reader()
+        r.gap(self._omax - offset)
+
+    def is_loaded(self):
+        return self._lazy is None
+
+    def load(self):
+        lazy = self._lazy
+        if lazy is None:
+            return
+        self._lazy = None #before parsing to avoid recursion
+
+        loader, arg, offset = lazy
+        r = self._get_reader()
+        current = r.current()
+        r.seek(offset)
+        try:
+            loader(self, arg)
+        finally:
+            self._nsid = None
+            r.seek(current)
+
+    # when loading, the sid field made for find1 is reused once read again, rather than adding it twice
+    def field(self, type, name, value=None, size=None):
+        nsid = self._nsid
+        if nsid is None or value is not None:
+            return super(NodeLazyObject, self).field(type, name, value=value, size=size)
+        self._nsid = None
+
+        fields = self._root._fields
+        index = nsid.get_field_index()
+        r = self._get_reader()
+        if r.current() != fields.offsets[index] or type != fields.get_type(index) or name != fields.names[index]:
+            return super(NodeLazyObject, self).field(type, name, size=size)
+
+        r.skip(TYPES_SIZE[type])
+        self.lastval = fields.values[index]
+        if self._children is None:
+            self._children = []
+        _append_field(self._children, index)
+        return nsid
+
+    # *** inheritance ***
+
+    def get_attr_items(self):
+        self.load()
+        return super(NodeLazyObject, self).get_attr_items()
+
+    def get_children(self):
+        self.load()
+        return super(NodeLazyObject, self).get_children()
+
+    def find1(self, **args):
+        # shortcut for the usual "get object's sid"
+        if self._lazy and self._nsid and args == {'type': TYPE_SID}:
+            return self._nsid
+        return super(NodeLazyObject, self).find1(**args)
+
+    def _copy_attrs(self, node):
+        super(NodeLazyObject, self)._copy_attrs(node)
+        node._lazy = self._lazy
+        node._nsid = None
+        if self._nsid:
+            node._nsid = self._nsid._clone(node)
+
+
 # simple subnode container (represents an array)
 class NodeList(NodeElement):
     __slots__ = ['__name']
@@ -548,16 +1126,11 @@ class NodeList(NodeElement):
 
     # *** inheritance ***
 
-    def get_attrs(self):
+    def get_attr_items(self):
         count = 0
         if self._children:
             count = len(self._children)
-
-        attrs = OrderedDict([
-            ('name', self.__name),
-            ('count', count),
-        ])
-        return attrs
+        return (('name', self.__name), ('count', count))
 
     def get_attr(self, attr):
         if attr == 'name':
@@ -572,63 +1145,114 @@ class NodeList(NodeElement):
     def get_name(self):
         return self.__name
 
+    def _copy_attrs(self, node):
+        super(NodeList, self)._copy_attrs(node)
+        node.__name = self.__name
+
 
 # semi-leaf node describing a physical data "field" (represents a primitive member)
+# Field info is saved in the bank's NodeFieldStore, and this is a view of one of its items,
+# so nodes may be created multiple times for the same field.
 class NodeField(NodeElement):
-    __slots__ = ['__offset', '__type', '__name', '__value', '__fmt', '__hashtype', '__row']
+    __slots__ = ['__fields', '__index', '_nodes']
 
+    # adds a new field to the bank (parent must add it to its children)
     def __init__(self, parent, offset, type, name, value):
-        super(NodeField, self).__init__(parent, 'field')
-        self.__offset = offset
-        self.__type = type
-        self.__name = name
-        self.__value = value
-        self.__fmt = None
-        self.__hashtype = False
-        self.__row = None
+        fields = parent._root._fields
+        self.__fields = fields
+        self.__index = fields.add(offset, type, name, value)
+        self._parent = parent
+        self._root = parent._root
+        self._nodes = None
+
+    # creates a view of an existing field (faster than regular init)
+    @staticmethod
+    def view(fields, index, parent):
+        node = _new_object(NodeField)
+        node.__fields = fields
+        node.__index = index
+        node._parent = parent
+        node._root = parent._root
+        node._nodes = None
+        return node
+
+    def _clone(self, parent):
+        return NodeField.view(self.__fields, self.__index, parent)
 
     # *** inheritance ***
 
-    def get_attrs(self):
-        attrs = OrderedDict()
-        if self.__offset:
-            attrs['offset'] = self.__offset
-        attrs['type'] = self.__type
-        attrs['name'] = self.__name
-        attrs['value'] = self.__value
-        if self.__fmt:
-            attrs['valuefmt'] = self.__fmt.format(self.__type, self.__value)
-
-        if self.__type in [TYPE_SID, TYPE_TID]:
+    def get_nodename(self):
+        return 'field'
+
+    def get_children(self):
+        children = self.__fields.subfields.get(self.__index)
+        if not children:
+            return None
+        return _get_cached_children(self, children, self.__fields)
+
+    # fields don't init NodeElement's parse state (errors/skips are counted in objects)
+    def get_error_count(self):
+        return 0
+
+    def get_skip_count(self):
+        return 0
+
+    def append(self, node):
+        if type(node) is not NodeField:
+            raise ValueError("fields can only contain fields")
+        children = self.__fields.subfields.setdefault(self.__index, [])
+        _append_field(children, node.__index)
+
+    def get_attr_items(self):
+        # columns are read directly as this is called for every field when printing
+        fields = self.__fields
+        index = self.__index
+        offset = fields.offsets[index]
+        type = FIELD_TYPES[fields.types[index]]
+        value = fields.values[index]
+
+        if offset > 0:
+            items = [('offset', offset), ('type', type), ('name', fields.names[index]), ('value', value)]
+        else:
+            items = [('type', type), ('name', fields.names[index]), ('value', value)]
+
+        fmt_code = fields.fmts[index]
+        if fmt_code:
+            items.append(('valuefmt', FIELD_FMTS[fmt_code].format(type, value)))
+
+        if type == TYPE_SID or type == TYPE_TID:
             row = self._get_namerow()
             if row:
-                if row.hashname and self.__hashtype != wdefs.fnv_no:
-                    attrs['hashname'] = row.hashname
+                if row.hashname and fields.get_hashtype(index) != wdefs.fnv_no:
+                    items.append(('hashname', row.hashname))
                 if row.guidname:
-                    attrs['guidname'] = row.guidname
+                    items.append(('guidname', row.guidname))
                 if row.path:
-                    attrs['path'] = row.path
+                    items.append(('path', row.path))
                 if row.objpath:
-                    attrs['objpath'] = row.objpath
+                    items.append(('objpath', row.objpath))
 
-        return attrs
+        return items
 
     def get_attr(self, attr):
+        fields = self.__fields
+        index = self.__index
         if attr == 'offset':
-            return self.__offset
+            return fields.get_offset(index)
         if attr == 'type':
-            return self.__type
+            return fields.get_type(index)
         if attr == 'name':
-            return self.__name
+            return fields.names[index]
         if attr == 'value':
-            return self.__value
+            return fields.values[index]
         if attr == 'valuefmt':
-            if self.__fmt:
-                return self.__fmt.format(self.__type, self.__value)
+            fmt = fields.get_fmt(index)
+            if fmt:
+                return fmt.format(fields.get_type(index), fields.values[index])
             return None
         if attr == 'hashname':
             row = self._get_namerow()
-            if row and row.hashname and self.__hashtype != wdefs.fnv_no:
+            if row and row.hashname and fields.get_hashtype(index) != wdefs.fnv_no:
                 return row.hashname
             return None
         if attr == 'guidname': # and self.__row
@@ -638,22 +1262,30 @@ class NodeField(NodeElement):
         return None
 
     def get_name(self):
-        return self.__name
+        return self.__fields.names[self.__index]
+
+    def get_field_index(self):
+        return self.__index
 
     def _get_namerow(self):
+        fields = self.__fields
+        index = self.__index
+
         # row in cache
-        if self.__row is not None:
-            return self.__row
+        row = fields.rows.get(index)
+        if row is not None:
+            return row
 
         # signal "tried to load but no results" by default
-        self.__row = False
+        row = False
 
         names = self.get_root()._names
         if names:
-            row = names.get_namerow(self.__value, hashtype=self.__hashtype, node=self)
-            if row:
-                self.__row = row
-        return self.__row
+            row = names.get_namerow(fields.values[index], hashtype=fields.get_hashtype(index), node=self)
+            if not row:
+                row = False
+        fields.rows[index] = row
+        return row
 
     # *** node helpers ***
 
@@ -687,23 +1319,23 @@ class NodeField(NodeElement):
 
     # sets a value formatter
     def fmt(self, fmt):
-        self.__fmt = fmt
+        self.__fields.set_fmt(self.__index, fmt)
         return self
 
     # sets parent object's max offset with current value
     def omax(self):
-        return self.get_parent().omax(self.__value)
+        return self.get_parent().omax(self.value())
 
     # get parent alias
     def up(self):
         return self.get_parent()
 
     def value(self):
-        return self.__value
+        return self.__fields.values[self.__index]
 
     # field's ID comes from a FNV hashname
     def fnv(self, hashtype):
-        self.__hashtype = hashtype
+        self.__fields.set_hashtype(self.__index, hashtype)
         return self
 
 
@@ -718,12 +1350,13 @@ class NodeSkip(NodeElement):
 
     # *** inheritance ***
 
-    def get_attrs(self):
-        attrs = OrderedDict([
-            ('offset', self.__offset),
-            ('size', self.__size),
-        ])
-        return attrs
+    def get_attr_items(self):
+        return (('offset', self.__offset), ('size', self.__size))
+
+    def _copy_attrs(self, node):
+        super(NodeSkip, self)._copy_attrs(node)
+        node.__offset = self.__offset
+        node.__size = self.__size
 
 # leaf node that signals some error in data
 class NodeError(NodeElement):
@@ -735,31 +1368,45 @@ class NodeError(NodeElement):
 
     # *** inheritance ***
 
-    def get_attrs(self):
-        attrs = OrderedDict([
-            ('message', self.__msg),
-        ])
-        return attrs
+    def get_attr_items(self):
+        return (('message', self.__msg),)
+
+    def _copy_attrs(self, node):
+        super(NodeError, self)._copy_attrs(node)
+        node.__msg = self.__msg
 
 
 # Iterator used to create new NodeObjects until count, if they don't exist.
 # This delayed creation is needed b/c objs set current offset, and it only
 # makes sense after previous object is first read
 class NodeListIterator:
-    __slots__ = ['__parent', '__r', '__subname', '__subname', '__index', '__count', '__list']
+    __slots__ = ['__parent', '__r', '__subname', '__subname', '__index', '__count', '__list', '__cls', '__stream', '__mark']
 
-    def __init__(self, parent, r, subname, count):
+    def __init__(self, parent, r, subname, count, lazy=False):
         self.__parent = parent
         self.__r = r
         self.__subname = subname
         self.__index = 0
         self.__count = count
+        self.__cls = NodeObject
+        if lazy:
+            self.__cls = NodeLazyObject
+
+        # items in chunk lists are sent to the bank's stream once parsed (see NodeRoot.set_stream)
+        self.__stream = None
+        self.__mark = None
+        root = parent._root
+        if root._stream and parent._parent._parent is root:
+            self.__stream = root._stream
 
     def __iter__(self):
         self.__index = 0
         return self
 
     def _next(self): # for python2
+        if self.__stream:
+            self._stream_last()
+
         list = self.__parent.get_children()
         if list is None:
             list_len = -1
@@ -774,7 +1421,9 @@ class NodeListIterator:
         #if self.__index < len(self.__list):
         #    return self.__list[self.__index]
 
-        obj = NodeObject(self.__parent, self.__r, self.__subname)
+        if self.__stream:
+            self.__mark = len(self.__parent._root._fields.values)
+        obj = self.__cls(self.__parent, self.__r, self.__subname)
         obj._index = self.__index
 
         #self.__list.append(obj)
@@ -789,14 +1438,162 @@ class NodeListIterator:
     def __next__(self): # for python3
         return self._next()
 
+    # sends the last (fully parsed) item to the stream and removes it, along with its fields
+    def _stream_last(self):
+        parent = self.__parent
+        children = parent._children
+        if not children:
+            return
+        item = children.pop()
+        self.__stream(parent, item)
+        parent._root._fields.truncate(self.__mark)
+
     #pre-generate all (empty) objects, used when object's fields need to be read in weird order
     def preload(self):
+        self.__stream = None #items are iterated again
         items = []
         for item in self:
             items.append(item)
         return items
 
 
+# counts node and subnodes, without loading lazy nodes or making field nodes
+def count_nodes(node):
+    subfields = node._root._fields.subfields
+    count = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if type(node) is range:
+            count += len(node)
+            if subfields:
+                for index in node:
+                    runs = subfields.get(index)
+                    if runs:
+                        stack.extend(runs)
+            continue
+        count += 1
+        if node._children:
+            stack.extend(node._children)
+    return count
+
+
+# Converts nodes to a flat list of plain values (in tree order), and back. Meant for caches,
+# so rebuilding skips regular node init (node classes/attrs must be kept in sync).
+# Fields are saved separately as the bank's field columns.
+NODE_OBJECT = 0
+NODE_LIST = 1
+NODE_FIELDS = 2
+NODE_SKIP = 3
+NODE_ERROR = 4
+
+def pack_nodes(root):
+    records = []
+    stack = [iter(root._children or [])]
+    while stack:
+        node = next(stack[-1], None)
+        if node is None:
+            stack.pop()
+            continue
+
+        cls = type(node)
+        if cls is range:
+            records.append((NODE_FIELDS, 0, node.start, node.stop))
+            continue
+
+        children = node._children
+        count = len(children) if children else 0
+
+        if cls is NodeObject:
+            record = (NODE_OBJECT, count, node._NodeObject__name, node._index)
+        elif cls is NodeList:
+            record = (NODE_LIST, count, node._NodeList__name)
+        elif cls is NodeSkip:
+            record = (NODE_SKIP, count, node._NodeSkip__offset, node._NodeSkip__size)
+        elif cls is NodeError:
+            record = (NODE_ERROR, count, node._NodeError__msg)
+        else:
+            raise ValueError("can't pack node %s" % (cls.__name__))
+        records.append(record)
+
+        if count:
+            stack.append(iter(children))
+
+    fields = root._fields
+    subfields = {index: [(run.start, run.stop) for run in runs] for index, runs in fields.subfields.items()}
+    columns = (fields.offsets.tobytes(), bytes(fields.types), fields.names, fields.values,
+               bytes(fields.fmts), bytes(fields.hashtypes), subfields)
+    return (records, columns)
+
+def unpack_nodes(root, packed):
+    records, columns = packed
+
+    fields = NodeFieldStore()
+    offsets, types, fields.names, fields.values, fmts, hashtypes, subfields = columns
+    fields.offsets.frombytes(offsets)
+    fields.types = bytearray(types)
+    fields.fmts = bytearray(fmts)
+    fields.hashtypes = bytearray(hashtypes)
+    fields.subfields = {index: [range(start, stop) for start, stop in runs] for index, runs in subfields.items()}
+    root._fields = fields
+
+    new = _new_object
+    parents = []
+    parent = root
+    left = -1
+    for record in records:
+        type = record[0]
+        if type == NODE_FIELDS:
+            children = parent._children
+            if children is None:
+                children = parent._children = []
+            children.append(range(record[2], record[3]))
+            left -= 1
+            while left == 0 and parents:
+                parent, left = parents.pop()
+            continue
+
+        if type == NODE_OBJECT:
+            node = new(NodeObject)
+            _, count, node._NodeObject__name, node._index = record
+            node._NodeObject__r = None
+            node.lastval = None
+            node._nodes = None
+            node._NodeElement__nodename = 'object'
+        elif type == NODE_LIST:
+            node = new(NodeList)
+            _, count, node._NodeList__name = record
+            node._NodeElement__nodename = 'list'
+        elif type == NODE_SKIP:
+            node = new(NodeSkip)
+            _, count, node._NodeSkip__offset, node._NodeSkip__size = record
+            node._NodeElement__nodename = 'skip'
+        else:
+            node = new(NodeError)
+            _, count, node._NodeError__msg = record
+            node._NodeElement__nodename = 'error'
+
+        node._parent = parent
+        node._root = root
+        node._children = None
+        node._error_count = 0
+        node._skip_count = 0
+        node._omax = None
+        children = parent._children
+        if children is None:
+            children = parent._children = []
+        children.append(node)
+
+        left -= 1
+        if count:
+            parents.append((parent, left))
+            parent = node
+            left = count
+        else:
+            while left == 0 and parents:
+                parent, left = parents.pop()
+
+
 class ParseError(Exception):
     def __init__(self, msg, obj):
         super(ParseError, self).__init__(msg)
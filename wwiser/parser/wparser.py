@@ -1,5 +1,6 @@
-import logging
-from . import wmodel, wio, wdefs, wparser_cls as wcls, wparser_plg as wplg
+import logging, time, hashlib, gc
+from .. import wlogs
+from . import wmodel, wio, wdefs, wstats, wparser_cls as wcls, wparser_plg as wplg, wparser_plan as wplan
 
 
 # parser mimics AK's functions, naming and some internals as to simplify debugging.
@@ -21,6 +22,10 @@ def get_version(obj):
     root = obj.get_root()
     return root.get_version()
 
+def get_defs(obj):
+    root = obj.get_root()
+    return root.get_defs()
+
 def has_feedback(obj):
     root = obj.get_root()
     return root.has_feedback()
@@ -56,13 +61,28 @@ def parse_plugin(obj, name='ulPluginID'):
 
 #helper
 def parse_rtpc_graph(obj, name='pRTPCMgr', subname='AkRTPCGraphPoint'):
-    for elem in obj.list(name, 'AkRTPCGraphPoint', obj.lastval):
-        elem.f32('From')
-        elem.f32('To')
-        elem.U32('Interp').fmt(wdefs.AkCurveInterpolation)
+    #for elem in obj.list(name, 'AkRTPCGraphPoint', obj.lastval):
+    #    elem.f32('From')
+    #    elem.f32('To')
+    #    elem.U32('Interp').fmt(wdefs.AkCurveInterpolation)
+    obj.records(name, 'AkRTPCGraphPoint', obj.lastval, [
+        (wmodel.TYPE_F32, 'From'),
+        (wmodel.TYPE_F32, 'To'),
+        (wmodel.TYPE_U32, 'Interp', wdefs.AkCurveInterpolation),
+    ])
+    return
+
+#helper
+def parse_prop_floats(obj, cls, id_type, id_fmt):
+    elems = obj.list('pProps', 'AkPropBundle', obj.lastval).preload()
+    for elem in elems:
+        elem.field(id_type, 'pID').fmt(id_fmt)
+    for elem in elems:
+        elem.f32('pValue')
     return
 
 #128>=
+@wplan.compiled
 def AkPropBundle_float_unsigned_short___SetInitialParams(obj, cls):
     #AkPropBundle<float,unsigned short>::SetInitialParams
     #AkPropBundle<float,unsigned short,(AkMemID)0>::SetInitialParams #135
@@ -71,11 +91,7 @@ def AkPropBundle_float_unsigned_short___SetInitialParams(obj, cls):
 
     # despite the generic name this is used by CAkState only
     obj.u16('cProps')
-    elems = obj.list('pProps', 'AkPropBundle', obj.lastval).preload()
-    for elem in elems:
-        elem.U16('pID').fmt(wdefs.AkRTPC_ParameterID) #not a AkPropID (states-params are like mini-RTPCs)
-    for elem in elems:
-        elem.f32('pValue')
+    obj.call(parse_prop_floats, wmodel.TYPE_U16, get_defs(obj).AkRTPC_ParameterID) #not a AkPropID (states-params are like mini-RTPCs)
 
 #    count = obj.lastval
 #    for i in range(count):
@@ -85,17 +101,14 @@ def AkPropBundle_float_unsigned_short___SetInitialParams(obj, cls):
     return
 
 #072>= 128<= (062>=?)
+@wplan.compiled
 def AkPropBundle_float___SetInitialParams(obj, cls):
     #AkPropBundle<float>::SetInitialParams
     obj = obj.node('AkPropBundle<float>') #AkPropBundle
 
     # despite the generic name this is used by CAkState only
     obj.u8i('cProps')
-    elems = obj.list('pProps', 'AkPropBundle', obj.lastval).preload()
-    for elem in elems:
-        elem.U8x('pID').fmt(wdefs.AkRTPC_ParameterID) #not a AkPropID (states-params are like mini-RTPCs)
-    for elem in elems:
-        elem.f32('pValue')
+    obj.call(parse_prop_floats, wmodel.TYPE_U8, get_defs(obj).AkRTPC_ParameterID) #not a AkPropID (states-params are like mini-RTPCs)
 
 #    count = obj.lastval
 #    for i in range(count):
@@ -104,24 +117,10 @@ def AkPropBundle_float___SetInitialParams(obj, cls):
 #        obj.f32('pValue')
     return
 
-#072>= (062>=?)
-def AkPropBundle_AkPropValue_unsigned_char___SetInitialParams(obj, cls, modulator=False):
-    #AkPropBundle<AkPropValue>::SetInitialParams
-    #AkPropBundle<AkPropValue,unsigned char>::SetInitialParams #v128>=
-    #AkPropBundle<AkPropValue,unsigned char,(AkMemID)0>::SetInitialParams #v135>=
-    #AkPropBundleBase<AkPropValue,unsigned char,(AkMemID)0>::SetInitialParams #v150>=
-    #AkPropBundleBase<AkPropValue,unsigned char,(AkMemID)1>::SetInitialParams #v150>=
-    obj = obj.node('AkPropBundle<AkPropValue,unsigned char>') #AkPropBundle
-
-    if modulator:
-        prop_fmt = wdefs.AkModulatorPropID
-        prop_tids = wdefs.AkModulatorPropID_tids
-    else:
-        prop_fmt = wdefs.AkPropID
-        prop_tids = wdefs.AkPropID_tids
+#helper
+def parse_prop_values(obj, cls, prop_fmt, prop_tids):
     props = []
 
-    obj.u8i('cProps')
     elems = obj.list('pProps', 'AkPropBundle', obj.lastval).preload()
     for elem in elems:
         elem.U8x('pID').fmt(prop_fmt)
@@ -136,6 +135,27 @@ def AkPropBundle_AkPropValue_unsigned_char___SetInitialParams(obj, cls, modulato
             elem.uni('pValue')
 
         num += 1
+    return
+
+#072>= (062>=?)
+@wplan.compiled
+def AkPropBundle_AkPropValue_unsigned_char___SetInitialParams(obj, cls, modulator=False):
+    #AkPropBundle<AkPropValue>::SetInitialParams
+    #AkPropBundle<AkPropValue,unsigned char>::SetInitialParams #v128>=
+    #AkPropBundle<AkPropValue,unsigned char,(AkMemID)0>::SetInitialParams #v135>=
+    #AkPropBundleBase<AkPropValue,unsigned char,(AkMemID)0>::SetInitialParams #v150>=
+    #AkPropBundleBase<AkPropValue,unsigned char,(AkMemID)1>::SetInitialParams #v150>=
+    obj = obj.node('AkPropBundle<AkPropValue,unsigned char>') #AkPropBundle
+
+    if modulator:
+        prop_fmt = get_defs(obj).AkModulatorPropID
+        prop_tids = wdefs.AkModulatorPropID_tids
+    else:
+        prop_fmt = get_defs(obj).AkPropID
+        prop_tids = wdefs.AkPropID_tids
+
+    obj.u8i('cProps')
+    obj.call(parse_prop_values, prop_fmt, prop_tids)
 
 #    count = obj.lastval
 #    for i in range(count):
@@ -144,7 +164,18 @@ def AkPropBundle_AkPropValue_unsigned_char___SetInitialParams(obj, cls, modulato
 #        obj.uni('pValue')
     return
 
+#helper
+def parse_prop_ranges(obj, cls, prop_fmt):
+    elems = obj.list('pProps', 'AkPropBundle', obj.lastval).preload()
+    for elem in elems:
+        elem.U8x('pID').fmt(prop_fmt)
+    for elem in elems:
+        elem.uni('min')
+        elem.uni('max')
+    return
+
 #072>= (062>=?)
+@wplan.compiled
 def AkPropBundle_RANGED_MODIFIERS_AkPropValue__unsigned_char___SetInitialParams(obj, cls, modulator=False):
     #AkPropBundle<RANGED_MODIFIERS<AkPropValue>>::SetInitialParams
     #AkPropBundle<RANGED_MODIFIERS<AkPropValue>,unsigned char>::SetInitialParams #v128>=
@@ -155,17 +186,12 @@ def AkPropBundle_RANGED_MODIFIERS_AkPropValue__unsigned_char___SetInitialParams(
     obj = obj.node('AkPropBundle<RANGED_MODIFIERS<AkPropValue>>') #AkPropBundle
 
     if modulator:
-        prop_fmt = wdefs.AkModulatorPropID
+        prop_fmt = get_defs(obj).AkModulatorPropID
     else:
-        prop_fmt = wdefs.AkPropID
+        prop_fmt = get_defs(obj).AkPropID
 
     obj.u8i('cProps')
-    elems = obj.list('pProps', 'AkPropBundle', obj.lastval).preload()
-    for elem in elems:
-        elem.U8x('pID').fmt(prop_fmt)
-    for elem in elems:
-        elem.uni('min')
-        elem.uni('max')
+    obj.call(parse_prop_ranges, prop_fmt)
 
 #    count = obj.lastval
 #    for i in range(count):
@@ -175,23 +201,9 @@ def AkPropBundle_RANGED_MODIFIERS_AkPropValue__unsigned_char___SetInitialParams(
 #        obj.uni('max')
     return
 
-#026>=
-def CAkBankMgr__LoadSource(obj, cls, subnode=False):
-    #CAkBankMgr::LoadSource
-    if not subnode:
-        obj = obj.node('AkBankSourceData')
-
-    parse_plugin(obj)
-    plugin_id = obj.lastval
-    PluginType = (plugin_id & 0x0F)
-
-    if   cls.version <= 89:
-        obj.U32('StreamType').fmt(wdefs.AkBank__AKBKSourceType)
-    else:
-        obj.U8x('StreamType').fmt(wdefs.AkBank__AKBKSourceType)
-    stream_type = obj.lastval
-
-
+#helper
+@wplan.compiled
+def parse_media_information(obj, cls, stream_type):
     if cls.version <= 46:
         elem = obj.node('AkAudioFormat')
         if cls.version <= 26: #26=TH
@@ -268,6 +280,28 @@ def CAkBankMgr__LoadSource(obj, cls, subnode=False):
             .bit('bPrefetch', elem.lastval,1) \
             .bit('bNonCachable', elem.lastval, 3) \
             .bit('bHasSource', elem.lastval, 7)
+    return
+
+#026>=
+def CAkBankMgr__LoadSource(obj, cls, subnode=False):
+    #CAkBankMgr::LoadSource
+    if not subnode:
+        obj = obj.node('AkBankSourceData')
+
+    parse_plugin(obj)
+    plugin_id = obj.lastval
+    PluginType = (plugin_id & 0x0F)
+
+    if   cls.version <= 89:
+        obj.U32('StreamType').fmt(get_defs(obj).AkBank__AKBKSourceType)
+    else:
+        obj.U8x('StreamType').fmt(get_defs(obj).AkBank__AKBKSourceType)
+    stream_type = obj.lastval
+
+    # media info only checks types 1/2 (other values are handled the same), compiled per type
+    if stream_type not in (1, 2):
+        stream_type = 0
+    parse_media_information(obj, cls, stream_type)
 
     if cls.version <= 26:
         has_param = True #(PluginType == 2) #technically checks 2 but always has size
@@ -286,6 +320,7 @@ def CAkBankMgr__LoadSource(obj, cls, subnode=False):
     return
 
 #046>=
+@wplan.compiled
 def CAkParameterNode__SetAdvSettingsParams(obj, cls):
     #CAkParameterNode::SetAdvSettingsParams
     obj = obj.node('AdvSettingsParams')
@@ -409,6 +444,7 @@ def CAkParameterNode__SetInitialFxParams(obj, cls):
     return
 
 #046>=
+@wplan.compiled
 def CAkParameterNode__SetInitialParams(obj, cls):
     #CAkParameterNode::SetInitialParams
     obj = obj.node('NodeInitialParams')
@@ -460,7 +496,27 @@ def CAkParameterNodeBase__SetAdvSettingsParams(obj, cls):
     #CAkParameterNodeBase::SetAdvSettingsParams
     raise wmodel.ParseError("dummy virtual function", obj)
 
+#helper
+def parse_aux_ids(obj, cls):
+    if cls.version <= 89:
+        has_aux = obj.lastval != 0
+    else:
+        has_aux = (obj.lastval >> 3) & 1
+
+    if has_aux:
+        for _i in range(4):
+            obj.tid('auxID')
+
+    if cls.version <= 134:
+        pass
+    elif cls.version <= 135 and is_custom(obj):
+        pass
+    else:
+        obj.tid('reflectionsAuxBus')
+    return
+
 #125>=
+@wplan.compiled
 def CAkParameterNodeBase__SetAuxParams(obj, cls):
     #CAkParameterNodeBase::SetAuxParams
     obj = obj.node('AuxParams')
@@ -470,24 +526,13 @@ def CAkParameterNodeBase__SetAuxParams(obj, cls):
         obj.U8x('bUseGameAuxSends')
         obj.U8x('bOverrideUserAuxSends')
         obj.U8x('bHasAux')
-        has_aux = obj.lastval != 0
     else:
         obj.U8x('byBitVector') \
            .bit('bOverrideUserAuxSends', obj.lastval, 2) \
            .bit('bHasAux', obj.lastval, 3) \
            .bit('bOverrideReflectionsAuxBus', obj.lastval, 4) # bHasAux in v122, > 135
-        has_aux = (obj.lastval >> 3) & 1
-
-    if has_aux:
-        for _i in range(4):
-            obj.tid('auxID')
 
-    if cls.version <= 134:
-        pass
-    elif cls.version <= 135 and is_custom(obj):
-        pass
-    else:
-        obj.tid('reflectionsAuxBus')
+    obj.call(parse_aux_ids)
     return
 
 #072>= 120<=
@@ -516,8 +561,8 @@ def CAkStateAware__ReadStateChunk(obj, cls):
 
     obj.var('ulNumStateProps')
     for elem in obj.list('stateProps', 'AkStatePropertyInfo', obj.lastval):
-        elem.var('PropertyId').fmt(wdefs.AkRTPC_ParameterID) #not a AkPropID (states-params are like mini-RTPCs)
-        elem.U8x('accumType').fmt(wdefs.AkRtpcAccum)
+        elem.var('PropertyId').fmt(get_defs(elem).AkRTPC_ParameterID) #not a AkPropID (states-params are like mini-RTPCs)
+        elem.U8x('accumType').fmt(get_defs(elem).AkRtpcAccum)
         if   cls.version <= 126:
             pass
         else:
@@ -630,27 +675,27 @@ def SetInitialRTPC_CAkParameterNodeBase_(obj, cls, modulator=False):
         if   cls.version <= 89:
             pass
         else:
-            elem.U8x('rtpcType').fmt(wdefs.AkRtpcType) #gap0 in later versions
-            elem.U8x('rtpcAccum').fmt(wdefs.AkRtpcAccum) #gap0 in later versions
+            elem.U8x('rtpcType').fmt(get_defs(elem).AkRtpcType) #gap0 in later versions
+            elem.U8x('rtpcAccum').fmt(get_defs(elem).AkRtpcAccum) #gap0 in later versions
 
         if   cls.version <= 89:
-            elem.U32('ParamID').fmt(wdefs.AkRTPC_ParameterID)
+            elem.U32('ParamID').fmt(get_defs(elem).AkRTPC_ParameterID)
         elif cls.version <= 113:
-            elem.U8x('ParamID').fmt(wdefs.AkRTPC_ParameterID)
+            elem.U8x('ParamID').fmt(get_defs(elem).AkRTPC_ParameterID)
         else:
             if modulator:
                 param_fmt = wdefs.AkRTPC_ModulatorParamID
             else:
-                param_fmt = wdefs.AkRTPC_ParameterID
+                param_fmt = get_defs(elem).AkRTPC_ParameterID
             elem.var('ParamID').fmt(param_fmt)
 
         elem.sid('rtpcCurveID')
 
         if cls.version <= 36: #36=UFC
-            elem.U32('eScaling').fmt(wdefs.AkCurveScaling)
+            elem.U32('eScaling').fmt(get_defs(elem).AkCurveScaling)
             elem.u32('ulSize')
         else: #44=AC2
-            elem.U8x('eScaling').fmt(wdefs.AkCurveScaling) #gap0 in later versions
+            elem.U8x('eScaling').fmt(get_defs(elem).AkCurveScaling) #gap0 in later versions
             elem.u16('ulSize')
         parse_rtpc_graph(elem) #indirectly in _vptr$CAkIndexable + 63
     return
@@ -684,7 +729,16 @@ def SetInitialRTPC_CAkModulator_(obj, cls):
     SetInitialRTPC_CAkParameterNodeBase_(obj, cls, modulator=True)
     return
 
+#helper
+def parse_state_items(obj, cls):
+    for elem in obj.list('pStates', 'AKBKStateItem', obj.lastval):
+        elem.tid('ulStateID').fnv(wdefs.fnv_val)
+        elem.U8x('bIsCustom')
+        elem.tid('ulStateInstanceID').fnv(wdefs.fnv_no)
+    return
+
 #046>=
+@wplan.compiled
 def CAkParameterNodeBase__SetNodeBaseParams(obj, cls):
     #CAkParameterNodeBase::SetNodeBaseParams
     obj = obj.node('NodeBaseParams')
@@ -728,9 +782,9 @@ def CAkParameterNodeBase__SetNodeBaseParams(obj, cls):
 
 
     if   cls.version <= 122:
-        CAkParameterNode__SetPositioningParams(obj, cls) #callback, but only possible value
+        obj.call(CAkParameterNode__SetPositioningParams) #callback, but only possible value
     else:
-        CAkParameterNodeBase__SetPositioningParams(obj, cls)
+        obj.call(CAkParameterNodeBase__SetPositioningParams)
 
     if   cls.version <= 65: #65=DmC
         pass
@@ -753,26 +807,23 @@ def CAkParameterNodeBase__SetNodeBaseParams(obj, cls):
             sub.U8x('eStateSyncType').fmt(wdefs.AkSyncType)
             sub.u16('ulNumStates')
 
-        for elem in sub.list('pStates', 'AKBKStateItem', sub.lastval):
-            elem.tid('ulStateID').fnv(wdefs.fnv_val)
-            elem.U8x('bIsCustom')
-            elem.tid('ulStateInstanceID').fnv(wdefs.fnv_no)
+        sub.call(parse_state_items)
 
     elif cls.version <= 122:
-        CAkParameterNodeBase__ReadStateChunk(obj, cls)
+        obj.call(CAkParameterNodeBase__ReadStateChunk)
 
     elif cls.version <= 126:
-        CAkStateAware__ReadStateChunk(obj, cls)
+        obj.call(CAkStateAware__ReadStateChunk)
 
     else:
         cls.CAkClass__ReadStateChunk(obj, cls) #_vptr$CAkStateAware + 14 (same thing though)
 
 
-    SetInitialRTPC_CAkParameterNodeBase_(obj, cls)
+    obj.call(SetInitialRTPC_CAkParameterNodeBase_)
 
 
     if   cls.version <= 126:
-        CAkParameterNodeBase__ReadFeedbackInfo(obj, cls)
+        obj.call(CAkParameterNodeBase__ReadFeedbackInfo)
     else:
         pass
 
@@ -1055,11 +1106,12 @@ def CAkBankMgr__ReadState(obj):
 # HIRC: Sound
 
 #026>=
+@wplan.compiled
 def CAkSound__SetInitialValues(obj, cls):
     #CAkSound::SetInitialValues
     obj = obj.node('SoundInitialValues')
 
-    CAkBankMgr__LoadSource(obj, cls)
+    obj.call(CAkBankMgr__LoadSource)
 
     CAkParameterNodeBase__SetNodeBaseParams(obj, cls)
 
@@ -1088,6 +1140,7 @@ def CAkBankMgr__ReadSourceParent_CAkSound_(obj):
 # HIRC: Event Action
 
 #046>=
+@wplan.compiled
 def CAkActionExcept__SetExceptParams(obj, cls):
     #CAkAction::SetExceptParams #053/056, same but prints error if list size is set
     #CAkActionExcept::SetExceptParams
@@ -1098,15 +1151,21 @@ def CAkActionExcept__SetExceptParams(obj, cls):
     else:
         obj.var('ulExceptionListSize')
 
-    for elem in obj.list('listElementException', 'WwiseObjectIDext', obj.lastval):
-        elem.tid('ulID')
-        if cls.version <= 65: #65=ZoE HD
-            pass
-        else:
-            elem.U8x('bIsBus')
+    #for elem in obj.list('listElementException', 'WwiseObjectIDext', obj.lastval):
+    #    elem.tid('ulID')
+    #    elem.U8x('bIsBus')
+    layout = [
+        (wmodel.TYPE_TID, 'ulID'),
+    ]
+    if cls.version <= 65: #65=ZoE HD
+        pass
+    else:
+        layout.append((wmodel.TYPE_U8, 'bIsBus', wdefs.fmt_hex))
+    obj.records('listElementException', 'WwiseObjectIDext', obj.lastval, layout)
     return
 
 #046>=
+@wplan.compiled
 def CAkAction__SetActionSpecificParams(obj, cls):
     #CAkAction::SetActionSpecificParams
     if cls.version <= 56:
@@ -1117,6 +1176,7 @@ def CAkAction__SetActionSpecificParams(obj, cls):
     return
 
 #046>=
+@wplan.compiled
 def CAkActionPause__SetActionSpecificParams(obj, cls):
     #CAkActionPause::SetActionSpecificParams
     obj = obj.node('PauseActionSpecificParams')
@@ -1139,6 +1199,7 @@ def CAkActionResetPlaylist__SetActionSpecificParams(obj, cls):
     return
 
 #046>=
+@wplan.compiled
 def CAkActionResume__SetActionSpecificParams(obj, cls):
     #CAkActionResume::SetActionSpecificParams
     obj = obj.node('ResumeActionSpecificParams')
@@ -1156,6 +1217,7 @@ def CAkActionResume__SetActionSpecificParams(obj, cls):
     return
 
 #046>=
+@wplan.compiled
 def CAkActionSetAkProp__SetActionSpecificParams(obj, cls):
     #CAkActionSetPitch::SetActionSpecificParams #056<=
     #CAkActionSetVolume::SetActionSpecificParams #056<=
@@ -1185,6 +1247,7 @@ def CAkActionSetAkProp__SetActionSpecificParams(obj, cls):
     return
 
 #056>=
+@wplan.compiled
 def CAkActionSetGameParameter__SetActionSpecificParams(obj, cls):
     #CAkActionSetGameParameter::SetActionSpecificParams
     obj = obj.node('GameParameterActionSpecificParams')
@@ -1206,6 +1269,7 @@ def CAkActionSetGameParameter__SetActionSpecificParams(obj, cls):
     return
 
 #125>=
+@wplan.compiled
 def CAkActionStop__SetActionSpecificParams(obj, cls):
     #CAkActionStop::SetActionSpecificParams
     obj = obj.node('StopActionSpecificParams')
@@ -1222,6 +1286,7 @@ def CAkAction__SetActionParams(obj, cls):
     return
 
 #046>=
+@wplan.compiled
 def CAkActionActive__SetActionParams(obj, cls):
     #CAkActionActive::SetActionParams
     obj = obj.node('ActiveActionParams')
@@ -1242,6 +1307,7 @@ def CAkActionActive__SetActionParams(obj, cls):
     return
 
 #150>=
+@wplan.compiled
 def CAkActionSetFX__SetActionParams(obj, cls):
     #CAkActionSetFX::SetActionParams
     obj = obj.node('SetFXActionParams')
@@ -1255,6 +1321,7 @@ def CAkActionSetFX__SetActionParams(obj, cls):
     return
 
 #046>=
+@wplan.compiled
 def CAkActionBypassFX__SetActionParams(obj, cls):
     #CAkActionBypassFX::SetActionParams
     obj = obj.node('BypassFXActionParams')
@@ -1271,6 +1338,7 @@ def CAkActionBypassFX__SetActionParams(obj, cls):
     return
 
 #046>=
+@wplan.compiled
 def CAkActionPlay__SetActionParams(obj, cls):
     #CAkActionPlay::SetActionParams
     obj = obj.node('PlayActionParams')
@@ -1317,6 +1385,7 @@ def CAkActionRelease__SetActionParams(obj, cls):
     return
 
 #046>=
+@wplan.compiled
 def CAkActionSetRTPC__SetActionParams(obj, cls):
     #CAkActionSetRTPC::SetActionParams
     #named differently 056>=?
@@ -1327,6 +1396,7 @@ def CAkActionSetRTPC__SetActionParams(obj, cls):
     return
 
 #048>=
+@wplan.compiled
 def CAkActionSeek__SetActionParams(obj, cls):
     #CAkActionSeek::SetActionParams
     obj = obj.node('SeekActionParams')
@@ -1342,6 +1412,7 @@ def CAkActionSeek__SetActionParams(obj, cls):
     return
 
 #046>=
+@wplan.compiled
 def CAkActionSetState__SetActionParams(obj, cls):
     #CAkActionSetState::SetActionParams
     obj = obj.node('StateActionParams')
@@ -1351,6 +1422,7 @@ def CAkActionSetState__SetActionParams(obj, cls):
     return
 
 #046>=
+@wplan.compiled
 def CAkActionSetSwitch__SetActionParams(obj, cls):
     #CAkActionSetSwitch::SetActionParams
     obj = obj.node('SwitchActionParams')
@@ -1360,6 +1432,7 @@ def CAkActionSetSwitch__SetActionParams(obj, cls):
     return
 
 #046>=
+@wplan.compiled
 def CAkActionSetValue__SetActionParams(obj, cls):
     #CAkActionSetValue::SetActionParams
     obj = obj.node('ValueActionParams')
@@ -1379,7 +1452,14 @@ def CAkActionSetValue__SetActionParams(obj, cls):
     CAkActionExcept__SetExceptParams(obj, cls)
     return
 
+#helper
+def parse_action_subsection(obj, cls):
+    if obj.lastval > 0:
+        cls.CAkClass__SetActionParams(obj, cls)
+    return
+
 #026>=
+@wplan.compiled
 def CAkAction__SetInitialValues(obj, cls):
     #CAkAction::SetInitialValues
     obj = obj.node('ActionInitialValues')
@@ -1390,8 +1470,7 @@ def CAkAction__SetInitialValues(obj, cls):
         obj.s32('tDelayMin')
         obj.s32('tDelayMax')
         obj.U32('ulSubSectionSize')
-        if obj.lastval > 0:
-            cls.CAkClass__SetActionParams(obj, cls)
+        obj.call(parse_action_subsection)
 
     else:
         if cls.version <= 65: #65=DmC
@@ -1422,9 +1501,9 @@ def CAkBankMgr__ReadAction(obj):
     obj.sid('ulID').fnv(wdefs.fnv_no)
 
     if get_version(obj) <= 56:
-        obj.U32('ulActionType').fmt(wdefs.AkActionType)
+        obj.U32('ulActionType').fmt(get_defs(obj).AkActionType)
     else: #62=Blands2
-        obj.U16('ulActionType').fmt(wdefs.AkActionType)
+        obj.U16('ulActionType').fmt(get_defs(obj).AkActionType)
 
     cls = wcls.CAkAction__Create(obj, obj.lastval)
     obj.set_name(cls.name)
@@ -1437,6 +1516,7 @@ def CAkBankMgr__ReadAction(obj):
 # HIRC: Event Sequence
 
 #026>=
+@wplan.compiled
 def CAkEvent__SetInitialValues(obj, cls):
     #CAkEvent::SetInitialValues
     obj = obj.node('EventInitialValues')
@@ -1453,8 +1533,11 @@ def CAkEvent__SetInitialValues(obj, cls):
     else:
         obj.var('ulActionListSize')
 
-    for elem in obj.list('actions', 'Action', obj.lastval):
-        elem.tid('ulActionID').fnv(wdefs.fnv_no)
+    #for elem in obj.list('actions', 'Action', obj.lastval):
+    #    elem.tid('ulActionID').fnv(wdefs.fnv_no)
+    obj.records('actions', 'Action', obj.lastval, [
+        (wmodel.TYPE_TID, 'ulActionID', None, wdefs.fnv_no),
+    ])
     return
 
 #-
@@ -1958,7 +2041,7 @@ def CAkBus__SetInitialValues(obj, cls):
         if cls.version <= 65: #65=DmC
             pass
         else:
-            elem.U8x('TargetProp').fmt(wdefs.AkPropID)
+            elem.U8x('TargetProp').fmt(get_defs(elem).AkPropID)
 
     cls.CAkClass__SetInitialFxParams(obj, cls) #_vptr$CAkIndexable + 71 (v135<=), _vptr$IAkEffectSlotsOwner + 70
 
@@ -2029,7 +2112,7 @@ def CAkLayer__SetInitialValues(obj, cls):
     if cls.version <= 89:
         pass
     else:
-        obj.U8x('rtpcType').fmt(wdefs.AkRtpcType)
+        obj.U8x('rtpcType').fmt(get_defs(obj).AkRtpcType)
 
     if cls.version <= 56:
         obj.f32('fCrossfadingRTPCDefaultValue')
@@ -2284,7 +2367,7 @@ def CAkMusicTrack__SetInitialValues(obj, cls):
         obj.u32('numClipAutomationItem')
         for elem in obj.list('pItems', 'AkClipAutomation', obj.lastval):
             elem.u32('uClipIndex')
-            elem.U32('eAutoType').fmt(wdefs.AkClipAutomationType)
+            elem.U32('eAutoType').fmt(get_defs(elem).AkClipAutomationType)
             elem.u32('uNumPoints')
             parse_rtpc_graph(elem, name='pArrayGraphPoints')
 
@@ -2802,10 +2885,10 @@ def CAkAttenuation__SetInitialValues(obj, cls):
 
     for elem in obj.list('curves', 'CAkConversionTable', obj.lastval):
         if cls.version <= 36: #36=UFC
-            elem.U32('eScaling').fmt(wdefs.AkCurveScaling)
+            elem.U32('eScaling').fmt(get_defs(elem).AkCurveScaling)
             elem.u32('ulSize')
         else:
-            elem.U8x('eScaling').fmt(wdefs.AkCurveScaling)
+            elem.U8x('eScaling').fmt(get_defs(elem).AkCurveScaling)
             elem.u16('ulSize')
         parse_rtpc_graph(elem)
 
@@ -2984,17 +3067,17 @@ def CAkFxBase__SetInitialValues(obj, cls):
         obj.u16('ulNumInit')
         for elem in obj.list('rtpcinit', 'RTPCInit', obj.lastval):
             if cls.version <= 113:
-                elem.U8x('ParamID').fmt(wdefs.AkRTPC_ParameterID)
+                elem.U8x('ParamID').fmt(get_defs(elem).AkRTPC_ParameterID)
             else:
-                elem.var('ParamID').fmt(wdefs.AkRTPC_ParameterID)
+                elem.var('ParamID').fmt(get_defs(elem).AkRTPC_ParameterID)
             elem.f32('fInitValue')
     else:
         cls.CAkClass__ReadStateChunk(obj, cls)
 
         obj.u16('numValues')
         for elem in obj.list('propertyValues', 'PluginPropertyValue', obj.lastval):
-            elem.var('propertyId').fmt(wdefs.AkRTPC_ParameterID)
-            elem.U8x('rtpcAccum').fmt(wdefs.AkRtpcAccum)
+            elem.var('propertyId').fmt(get_defs(elem).AkRTPC_ParameterID)
+            elem.U8x('rtpcAccum').fmt(get_defs(elem).AkRtpcAccum)
             elem.f32('fValue')
 
     return
@@ -3225,45 +3308,178 @@ def get_hirc_dispatch(obj):
             0x17: CAkBankMgr__ReadSidechainMix, #168>=
         })
 
+    if obj.get_root().get_profile() == wmodel.PROFILE_TXTP:
+        for hirc_type, dispatch in hirc_dispatch.items():
+            hirc_dispatch[hirc_type] = hirc_placeholder_txtp.get(dispatch, dispatch)
+
     return hirc_dispatch
 
+# info for lazy HIRC items, so they can be registered and filtered before being parsed
+# (must match what each reader sets: class name, and first sid's name + hashtype)
+hirc_lazy_info = {
+    CAkBankMgr__ReadState: (wcls.CAkState, 'ulStateID', wdefs.fnv_no),
+    CAkBankMgr__ReadSourceParent_CAkSound_: (wcls.CAkSound, 'ulID', wdefs.fnv_no),
+    CAkBankMgr__ReadAction: (None, 'ulID', wdefs.fnv_no), #name depends on action type
+    CAkBankMgr__ReadEvent: (wcls.CAkEvent, 'ulID', wdefs.fnv_evt),
+    CAkBankMgr__StdBankRead_CAkRanSeqCntr_CAkParameterNodeBase_: (wcls.CAkRanSeqCntr, 'ulID', wdefs.fnv_no),
+    CAkBankMgr__StdBankRead_CAkSwitchCntr_CAkParameterNodeBase_: (wcls.CAkSwitchCntr, 'ulID', wdefs.fnv_no),
+    CAkBankMgr__StdBankRead_CAkActorMixer_CAkParameterNodeBase_: (wcls.CAkActorMixer, 'ulID', wdefs.fnv_no),
+    CAkBankMgr__ReadBus: (wcls.CAkBus, 'ulID', wdefs.fnv_bus),
+    CAkBankMgr__StdBankRead_CAkLayerCntr_CAkParameterNodeBase_: (wcls.CAkLayerCntr, 'ulID', wdefs.fnv_no),
+    CAkBankMgr__StdBankRead_CAkMusicSegment_CAkParameterNodeBase_: (wcls.CAkMusicSegment, 'ulID', wdefs.fnv_no),
+    CAkBankMgr__ReadSourceParent_CAkMusicTrack_: (wcls.CAkMusicTrack, 'ulID', wdefs.fnv_no),
+    CAkBankMgr__StdBankRead_CAkMusicSwitchCntr_CAkParameterNodeBase_: (wcls.CAkMusicSwitchCntr, 'ulID', wdefs.fnv_no),
+    CAkBankMgr__StdBankRead_CAkMusicRanSeqCntr_CAkParameterNodeBase_: (wcls.CAkMusicRanSeqCntr, 'ulID', wdefs.fnv_no),
+    CAkBankMgr__StdBankRead_CAkAttenuation_CAkAttenuation_: (wcls.CAkAttenuation, 'ulID', wdefs.fnv_no),
+    CAkBankMgr__StdBankRead_CAkDialogueEvent_CAkDialogueEvent_: (wcls.CAkDialogueEvent, 'ulID', wdefs.fnv_evt),
+    CAkBankMgr__StdBankRead_CAkFeedbackBus_CAkParameterNodeBase_: (wcls.CAkFeedbackBus, 'ulID', wdefs.fnv_bus),
+    CAkBankMgr__ReadSourceParent_CAkFeedbackNode_: (wcls.CAkFeedbackNode, 'ulID', wdefs.fnv_no),
+    CAkBankMgr__StdBankRead_CAkFxShareSet_CAkFxShareSet_: (wcls.CAkFxShareSet, 'ulID', wdefs.fnv_sfx),
+    CAkBankMgr__StdBankRead_CAkFxCustom_CAkFxCustom_: (wcls.CAkFxCustom, 'ulID', None),
+    CAkBankMgr__StdBankRead_CAkAuxBus_CAkParameterNodeBase_: (wcls.CAkAuxBus, 'ulID', wdefs.fnv_bus),
+    CAkBankMgr__StdBankRead_CAkLFOModulator_CAkModulator_: (wcls.CAkLFOModulator, 'ulID', wdefs.fnv_no),
+    CAkBankMgr__StdBankRead_CAkEnvelopeModulator_CAkModulator_: (wcls.CAkEnvelopeModulator, 'ulID', wdefs.fnv_no),
+    CAkBankMgr__StdBankRead_CAkAudioDevice_CAkAudioDevice_: (wcls.CAkAudioDevice, 'ulID', wdefs.fnv_sfx),
+    CAkBankMgr__StdBankRead_CAkTimeModulator_CAkModulator_: (wcls.CAkTimeModulator, 'ulID', wdefs.fnv_no),
+    CAkBankMgr__ReadSidechainMix: (wcls.CAkSidechainMixIndexable, 'ulID', wdefs.fnv_no),
+}
+
+# Makes a reader that only sets the item's class and sid (so it can still be found), leaving
+# the rest as a gap. Used for items that aren't needed in some parse profiles.
+def get_hirc_placeholder(dispatch):
+    name, sidname, hashtype = hirc_lazy_info[dispatch]
+
+    def parse_hirc_placeholder(obj):
+        obj.set_name(name)
+        nsid = obj.sid(sidname)
+        if hashtype:
+            nsid.fnv(hashtype)
+        omax, offset = obj.offset_info()
+        obj.gap('placeholder', omax - offset)
+
+    return parse_hirc_placeholder
+
+# HIRC items ignored by the txtp generator (wmodel.PROFILE_TXTP)
+hirc_placeholder_txtp = {
+    dispatch: get_hirc_placeholder(dispatch) for dispatch in [
+        CAkBankMgr__StdBankRead_CAkAttenuation_CAkAttenuation_,
+        CAkBankMgr__ReadSourceParent_CAkFeedbackNode_,
+        CAkBankMgr__StdBankRead_CAkLFOModulator_CAkModulator_,
+        CAkBankMgr__StdBankRead_CAkEnvelopeModulator_CAkModulator_,
+        CAkBankMgr__StdBankRead_CAkTimeModulator_CAkModulator_,
+        CAkBankMgr__ReadSidechainMix,
+    ]
+}
+
+#AkBank::AKBKSubHircSection
+def parse_hirc_section(elem, version):
+    if version <= 48:
+        elem.U32('eHircType').fmt(get_defs(elem).AkBank__AKBKHircType)
+    else:
+        elem.U8x('eHircType').fmt(get_defs(elem).AkBank__AKBKHircType)
+    hirc_type = elem.lastval
+    elem.U32('dwSectionSize').omax()
+    return hirc_type
+
+def parse_hirc_item(elem, dispatch):
+    #Section.eHircType switch
+    try:
+        dispatch(elem)
+    except wmodel.ParseError as e:
+        elem.add_error(str(e))
+
+    elem.consume()
+
+# parses an item deferred by parse_hirc_item_lazy, reporting issues as when loading the bank
+# (those were already reported by then)
+def parse_hirc_item_deferred(elem, dispatch):
+    root = elem.get_root()
+    error_count = root.get_error_count()
+    skip_count = root.get_skip_count()
+
+    parse_hirc_item(elem, dispatch)
+
+    log_issues(root.get_error_count() - error_count, root.get_skip_count() - skip_count)
+
+def log_issues(error_count, skip_count):
+    if error_count > 0:
+        logging.info("parser: ERRORS! %i found (report issue)" % error_count)
+    if skip_count > 0:
+        logging.info("parser: SKIPS! %i found (report issue)" % skip_count)
+
+# Only reads item's section and index info (type/sid/offset/size), and registers a callback
+# to parse the rest when the item is accessed.
+def parse_hirc_item_lazy(elem, dispatch):
+    version = get_version(elem)
+    omax, offset = elem.offset_info()
+
+    lazy_info = hirc_lazy_info.get(dispatch)
+    if not lazy_info or offset + 0x04 > omax:
+        # unknown/tiny items aren't worth delaying
+        parse_hirc_item(elem, dispatch)
+        return
+
+    name, sidname, hashtype = lazy_info
+    r = elem._get_reader()
+    sid = r.u32(offset)
+    if sid == 0xFFFFFFFF:
+        sid = -1
+    if dispatch == CAkBankMgr__ReadAction:
+        if version <= 56:
+            action_size = 0x04
+        else:
+            action_size = 0x02
+        if offset + 0x04 + action_size <= omax:
+            if action_size == 0x04:
+                action_type = r.u32()
+            else:
+                action_type = r.u16()
+            name = wcls.get_action_name(version, action_type)
+    r.seek(offset)
+
+    nsid = wmodel.NodeField(elem, offset, wmodel.TYPE_SID, sidname, sid)
+    if hashtype:
+        nsid.fnv(hashtype)
+
+    elem.defer(parse_hirc_item_deferred, dispatch, offset, name, nsid)
+
+
 #026>=
-def CAkBankMgr__ProcessHircChunk(obj):
+def CAkBankMgr__ProcessHircChunk(obj, lazy=False):
     #CAkBankMgr::ProcessHircChunk
     obj.set_name('HircChunk')
 
     version  = get_version(obj)
 
     hirc_dispatch = get_hirc_dispatch(obj)
+    stats = obj.get_root().get_parse_stats()
 
     count = 0
     try:
         obj.u32('NumReleasableHircItem')
-        for elem in obj.list('listLoadedItem', 'AkListLoadedItem', obj.lastval):
-
-            #AkBank::AKBKSubHircSection
-            if version <= 48:
-                elem.U32('eHircType').fmt(wdefs.AkBank__AKBKHircType)
+        for elem in obj.list('listLoadedItem', 'AkListLoadedItem', obj.lastval, lazy=lazy):
+            if stats:
+                state = stats.start(elem)
+            hirc_type = parse_hirc_section(elem, version)
+
+            dispatch = hirc_dispatch.get(hirc_type, parse_hirc_default)
+            if lazy:
+                parse_hirc_item_lazy(elem, dispatch)
             else:
-                elem.U8x('eHircType').fmt(wdefs.AkBank__AKBKHircType)
-            hirc_type = elem.lastval
-            elem.U32('dwSectionSize').omax()
-
-            #Section.eHircType switch
-            try:
-                dispatch = hirc_dispatch.get(hirc_type, parse_hirc_default)
-                dispatch(elem)
-            except wmodel.ParseError as e:
-                elem.add_error(str(e))
-
-            elem.consume()
+                parse_hirc_item(elem, dispatch)
             count += 1
 
+            if stats:
+                stats.add(wstats.SECTION_HIRC, '0x%02x %s' % (hirc_type, elem.get_name()), elem, state)
+
     except wio.ReaderError as e:
         raise wio.ReaderError('failed parsing HIRC item %s' %  (count)) #from e ##chain
 
     return
 
+def CAkBankMgr__ProcessHircChunk_lazy(obj):
+    CAkBankMgr__ProcessHircChunk(obj, lazy=True)
+
 
 #******************************************************************************
 # BKHD
@@ -3401,15 +3617,15 @@ def parse_data_old(objp, chunk_size):
 
     chunk_size -= 0x20
 
-    for elem in obj.list('pLoadedMedia', 'MediaHeader', count):
-        elem.u32('unknown') #always -1
-        elem.U32('unknown') #always 0
-        elem.u32('trackID?') #number (usually entry number) or -1
-        elem.U32('unknown') #5 or -1?
-        elem.U32('uOffset') #stream offset (from DATA) or -1 if none
-        elem.U32('uSize') #stream size or 0 if none
-
-        chunk_size -= 0x18
+    obj.records('pLoadedMedia', 'MediaHeader', count, [
+        (wmodel.TYPE_U32, 'unknown'), #always -1
+        (wmodel.TYPE_U32, 'unknown', wdefs.fmt_hex), #always 0
+        (wmodel.TYPE_U32, 'trackID?'), #number (usually entry number) or -1
+        (wmodel.TYPE_U32, 'unknown', wdefs.fmt_hex), #5 or -1?
+        (wmodel.TYPE_U32, 'uOffset', wdefs.fmt_hex), #stream offset (from DATA) or -1 if none
+        (wmodel.TYPE_U32, 'uSize', wdefs.fmt_hex), #stream size or 0 if none
+    ])
+    chunk_size -= 0x18 * count
 
     obj.gap('pPadding', padding)
 
@@ -3473,13 +3689,13 @@ def CAkBankMgr__ProcessFxParamsChunk(obj):
                 elem2.U32('pBufferToFill')
                 elem2.u8i('uFXIndex')
             elem2.tid('RTPCID').fnv(wdefs.fnv_gmx) #depends on target (ex. modulator=guidname, curve=hashname)
-            elem2.U32('ParamID').fmt(wdefs.AkRTPC_ParameterID)
+            elem2.U32('ParamID').fmt(get_defs(elem2).AkRTPC_ParameterID)
             elem2.sid('rtpcCurveID') #fnv?
             if version <= 34: #34=LOTR (probably for 36 too since other parts need it
-                elem2.u32('eScaling').fmt(wdefs.AkCurveScaling)
+                elem2.u32('eScaling').fmt(get_defs(elem2).AkCurveScaling)
                 elem2.u32('ulSize')
             else:
-                elem2.U8x('eScaling').fmt(wdefs.AkCurveScaling)
+                elem2.U8x('eScaling').fmt(get_defs(elem2).AkCurveScaling)
                 elem2.u16('ulSize')
             parse_rtpc_graph(elem2)
 
@@ -3494,8 +3710,10 @@ def parse_stid_old_entries(obj, type, size):
     count = obj.lastval
 
     elem = obj.node('Offsets')
-    for _i in range(0, count):
-        elem.U32('offset') #points after all offsets, can be -1 (but name still exists)
+    #points after all offsets, can be -1 (but name still exists)
+    elem.repeat(count, [
+        (wmodel.TYPE_U32, 'offset', wdefs.fmt_hex),
+    ])
 
     gap_size = size - 0x04 - count * 0x04
     obj.gap('strings', gap_size)
@@ -3642,9 +3860,9 @@ def CAkBankMgr__ProcessGlobalSettingsChunk(obj):
                 elem2.tid('ulStateType') #ulStateID
 
                 if version <= 48:
-                    elem2.u32('eHircType').fmt(wdefs.AkBank__AKBKHircType)
+                    elem2.u32('eHircType').fmt(get_defs(elem2).AkBank__AKBKHircType)
                 else:
-                    elem2.U8x('eHircType').fmt(wdefs.AkBank__AKBKHircType)
+                    elem2.U8x('eHircType').fmt(get_defs(elem2).AkBank__AKBKHircType)
                 elem2.u32('dwSectionSize')
 
                 obj_state = elem2.node('state')
@@ -3665,7 +3883,7 @@ def CAkBankMgr__ProcessGlobalSettingsChunk(obj):
         if version <= 89:
             pass
         else:
-            elem.U8x('rtpcType').fmt(wdefs.AkRtpcType)
+            elem.U8x('rtpcType').fmt(get_defs(elem).AkRtpcType)
         elem.u32('ulSize')
         parse_rtpc_graph(elem, name='pSwitchMgr', subname='AkSwitchGraphPoint')
 
@@ -3685,7 +3903,7 @@ def CAkBankMgr__ProcessGlobalSettingsChunk(obj):
             elem.u32('rampType').fmt(wdefs.AkTransitionRampingType)
             elem.f32('fRampUp')
             elem.f32('fRampDown')
-            elem.u8i('eBindToBuiltInParam').fmt(wdefs.AkBuiltInParam)
+            elem.u8i('eBindToBuiltInParam').fmt(get_defs(elem).AkBuiltInParam)
 
     if   version <= 118:
         pass
@@ -3768,10 +3986,10 @@ def CAkBankMgr__ProcessEnvSettingsChunk(obj):
                 elem = obj.node('ObsOccCurve[%s][%s]' % (wdefs.eCurveXType.enum[i], wdefs.eCurveYType.enum[j]))
                 elem.u8i('bCurveEnabled') #when != 0
                 if version <= 36: #36=UFC
-                    elem.u32('eCurveScaling').fmt(wdefs.AkCurveScaling)
+                    elem.u32('eCurveScaling').fmt(get_defs(elem).AkCurveScaling)
                     elem.u32('ulCurveSize')
                 else:
-                    elem.u8i('eCurveScaling').fmt(wdefs.AkCurveScaling)
+                    elem.u8i('eCurveScaling').fmt(get_defs(elem).AkCurveScaling)
                     elem.u16('ulCurveSize')
                 parse_rtpc_graph(elem, name='aPoints', subname='AkRTPCGraphPoint')
     else:
@@ -3791,10 +4009,11 @@ def CAkBankMgr__LoadMediaIndex(obj):
     chunk_size = obj.lastval
 
     uNumMedias = chunk_size // 0x0c
-    for elem in obj.list('pLoadedMedia', 'MediaHeader', uNumMedias):
-        elem.sid('id').fnv(wdefs.fnv_no)
-        elem.U32('uOffset')
-        elem.U32('uSize')
+    obj.records('pLoadedMedia', 'MediaHeader', uNumMedias, [
+        (wmodel.TYPE_SID, 'id', None, wdefs.fnv_no),
+        (wmodel.TYPE_U32, 'uOffset', wdefs.fmt_hex),
+        (wmodel.TYPE_U32, 'uSize', wdefs.fmt_hex),
+    ])
     return
 
 
@@ -3854,6 +4073,13 @@ chunk_dispatch = {
     b'INIT': CAkBankMgr__ProcessPluginChunk, #118>=
 }
 
+# chunks with bank info, when other chunks are skipped
+chunk_info_tags = {b'BKHD', b'STID'}
+
+def parse_chunk_gap(obj):
+    omax, offset = obj.offset_info()
+    obj.gap('pData', omax - offset)
+
 def parse_chunk_akbk(obj):
     try:
         obj.four('dwTag').fmt(wdefs.chunk_type)
@@ -3863,8 +4089,12 @@ def parse_chunk_akbk(obj):
         obj.add_error(str(e))
     return
 
-def parse_chunk(obj):
+def parse_chunk(obj, lazy=False, info=False):
     #CAkBankMgr::LoadBank
+    stats = obj.get_root().get_parse_stats()
+    if stats:
+        state = stats.start(obj)
+
     chunk = None
     try:
         obj.four('dwTag').fmt(wdefs.chunk_type)
@@ -3873,6 +4103,10 @@ def parse_chunk(obj):
         obj.U32('dwChunkSize').omax()
 
         dispatch = chunk_dispatch.get(tag)
+        if lazy and tag == b'HIRC':
+            dispatch = CAkBankMgr__ProcessHircChunk_lazy
+        if info and dispatch and tag not in chunk_info_tags:
+            dispatch = parse_chunk_gap
         if not dispatch:
             if tag == b'\x00\x00\x00\x00':
                 raise wmodel.VersionError("error, padding chunk found (maybe incorrectly ripped, recheck tools)", obj)
@@ -3884,6 +4118,9 @@ def parse_chunk(obj):
         raise wio.ReaderError('failed parsing chunk %s' %  (chunk)) from e
 
     obj.consume()
+
+    if stats:
+        stats.add(wstats.SECTION_CHUNK, chunk.decode('latin-1'), obj, state)
     return
 
 # #############################################################################
@@ -3909,10 +4146,31 @@ class Parser(object):
         MULTIBANK_SMALLEST,
     ]
 
+    # garbage collector handling when parsing banks
+    GC_AUTO     = 'auto'    # paused while parsing, then parsed banks are frozen
+    GC_PAUSE    = 'pause'   # paused while parsing
+    GC_NONE     = 'none'    # default python handling
+    GC_MODES = [
+        GC_AUTO,
+        GC_PAUSE,
+        GC_NONE,
+    ]
+
     def __init__(self):
         #self._ignore_version = ignore_version
         self._banks = {}
+        self._filenames = {} #loaded or skipped banks in load order (see get_filenames)
         self._names = None
+        self._reader_mode = None
+        self._lazy = False
+        self._jobs = 1
+        self._cache = None
+        self._profile = wmodel.PROFILE_FULL
+        self._stream = False
+        self._repeat_mode = None
+        self._prefetch = 0
+        self._gc_mode = self.GC_AUTO
+        self._parse_stats = None
 
 
     def _check_header(self, r, bank):
@@ -3978,41 +4236,272 @@ class Parser(object):
 
         r.seek(current)
 
-        wdefs.setup(version)
         wcls.setup()
         return version
 
     def parse_banks(self, filenames):
+        requested = filenames
+        copies = {}
+        if len(filenames) > 1:
+            filenames, copies = self._dedupe_banks(filenames)
+
+        gc_enabled = self._pause_gc()
+        try:
+            if self._jobs > 1 and len(filenames) > 1 and not self._lazy and not self._stream:
+                loaded_filenames = self._parse_banks_jobs(filenames, copies)
+            else:
+                loaded_filenames = self._parse_banks_serial(filenames, copies)
+        finally:
+            self._resume_gc(gc_enabled)
+
+        # repeated banks skipped by _dedupe_banks are still valid banks for names lookup
+        selected = set(filenames)
+        for filename in requested:
+            if filename in self._banks or filename not in selected:
+                self._filenames[filename] = True
+
+        self._freeze_gc()
+
+        logging.info("parser: done")
+        return loaded_filenames
+
+    # Parsing makes millions of nodes that are kept, and since they reference parents (cycles) the gc
+    # keeps scanning them in useless passes. Returns previous state.
+    def _pause_gc(self):
+        enabled = gc.isenabled()
+        if self._gc_mode != self.GC_NONE:
+            gc.disable()
+        return enabled
+
+    def _resume_gc(self, enabled):
+        if enabled:
+            gc.enable()
+
+    # Banks are used until the end, so move them (and anything alive) to gc's permanent generation, so
+    # later passes (while generating txtp) skip them. Temp garbage from parsing is frozen too (until
+    # unfreeze_gc), as collecting it first needs a full pass that takes longer than what is saved.
+    def _freeze_gc(self):
+        if self._gc_mode != self.GC_AUTO:
+            return
+        gc.freeze()
+        logging.debug("parser: frozen %i gc objects", gc.get_freeze_count())
+
+    # allows gc to collect frozen banks again (call when banks aren't needed)
+    def unfreeze_gc(self):
+        if self._gc_mode != self.GC_AUTO:
+            return
+        gc.unfreeze()
+
+    def _parse_banks_serial(self, filenames, copies):
+        prefetcher = None
+        if self._prefetch and len(filenames) > 1 and not self._stream:
+            prefetcher = wio.Prefetcher([filename for filename in filenames if filename not in copies], self._prefetch)
+
         loaded_filenames = []
+        try:
+            for filename in filenames:
+                if filename in copies:
+                    if self._add_bank_copy(filename, copies[filename]):
+                        loaded_filenames.append(filename)
+                    continue
+
+                data = None
+                if prefetcher:
+                    data = prefetcher.get(filename)
+                loaded_filename = self.parse_bank(filename, data=data)
+                if loaded_filename:
+                    loaded_filenames.append(loaded_filename)
+        finally:
+            if prefetcher:
+                prefetcher.close()
+
+        return loaded_filenames
+
+    # Finds repeated banks (same id + lang) by reading their headers, and removes the ones get_banks
+    # would discard anyway per repeat mode before parsing them. Kept banks are moved to the first
+    # repeated bank's position, as get_banks would. Repeated banks are also hashed, so exact copies
+    # aren't parsed twice: in modes that keep all banks they are returned as {copy: original}, to
+    # reuse the original's nodes.
+    def _dedupe_banks(self, filenames):
+        mode = self._repeat_mode or self.MULTIBANK_AUTO
+        keep_all = mode in (self.MULTIBANK_AUTO, self.MULTIBANK_MANUAL)
+        keep_last = mode in (self.MULTIBANK_LAST, self.MULTIBANK_BIGGEST_LAST)
+
+        infos = {}
+        groups = {}
         for filename in filenames:
-            loaded_filename = self.parse_bank(filename)
-            if loaded_filename:
-                loaded_filenames.append(loaded_filename)
+            if filename in self._banks or filename in infos:
+                continue #handled when parsing
+
+            info = self.scan_bank(filename)
+            if info['error'] or info['id'] is None:
+                continue #handled when parsing
+            infos[filename] = info
+            groups.setdefault((info['id'], info['lang']), []).append(filename)
+
+        repeated = [group for group in groups.values() if len(group) > 1]
+        if not repeated:
+            return (filenames, {})
+
+        copies = {}
+        for group in repeated:
+            originals = {}
+            for filename in list(group):
+                hash = self._get_bank_hash(filename)
+                original = originals.get(hash)
+                if not original:
+                    originals[hash] = filename
+                    continue
+
+                if keep_all:
+                    copies[filename] = original
+                elif keep_last:
+                    # later copies win when favoring last banks
+                    logging.info("parser: ignoring %s (same as %s)", original, filename)
+                    group.remove(original)
+                    originals[hash] = filename
+                else:
+                    logging.info("parser: ignoring %s (same as %s)", filename, original)
+                    group.remove(filename)
+
+        if keep_all:
+            if self._stream:
+                copies = {} #parsed separately when streaming
+            return (filenames, copies)
+
+        selected = []
+        done = set()
+        for filename in filenames:
+            info = infos.get(filename)
+            if not info:
+                selected.append(filename)
+                continue
+
+            key = (info['id'], info['lang'])
+            if key in done:
+                continue
+            done.add(key)
+
+            group = groups[key]
+            if len(group) == 1:
+                selected.append(group[0])
+                continue
+
+            entries = [(entry, infos[entry]['size']) for entry in group]
+            entry = self._select_repeated(entries)
+            selected.append(entry[0])
+
+            for other in entries:
+                if other is not entry:
+                    logging.info("parser: ignoring %s (repeated bank)", other[0])
+
+        return (selected, {})
+
+    def _get_bank_hash(self, filename):
+        hash = hashlib.sha1()
+        with open(filename, 'rb') as infile:
+            r = wio.open_reader(infile, self._reader_mode)
+            r.update_hash(hash)
+            r.close()
+        return hash.digest()
+
+    # registers an exact copy of a parsed bank, without parsing it again
+    def _add_bank_copy(self, filename, original):
+        item = self._banks.get(original)
+        if not item:
+            return False #original failed
+        logging.info("parser: loaded %s (same as %s)", filename, original)
+
+        bank, sid, lang, size = item
+        self._banks[filename] = (bank.make_copy(filename), sid, lang, size)
+        return True
+
+    # same rules as get_banks for each repeat mode, for (filename, size) entries in load order
+    def _select_repeated(self, group):
+        mode = self._repeat_mode
+        selected = group[0]
+        for entry in group[1:]:
+            size = entry[1]
+            old_size = selected[1]
+            if (mode == self.MULTIBANK_LAST or
+                    mode == self.MULTIBANK_BIGGEST and size > old_size or
+                    mode == self.MULTIBANK_BIGGEST_LAST and size >= old_size or
+                    mode == self.MULTIBANK_SMALLEST and size < old_size):
+                selected = entry
+        return selected
+
+    # Parses banks in worker processes, then adds results and their logs in the same order
+    # as parse_bank would, since repeated banks handling depends on load order.
+    def _parse_banks_jobs(self, filenames, copies):
+        import concurrent.futures
+
+        level = logging.getLogger().getEffectiveLevel()
+        futures = {}
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self._jobs) as executor:
+            for filename in filenames:
+                if filename in self._banks or filename in futures or filename in copies:
+                    continue
+                futures[filename] = executor.submit(_parse_bank_job, filename, self._reader_mode, self._profile, self._cache, self._gc_mode, self._parse_stats is not None, level)
+
+            loaded_filenames = []
+            for filename in filenames:
+                if filename in copies:
+                    if self._add_bank_copy(filename, copies[filename]):
+                        loaded_filenames.append(filename)
+                    continue
+
+                future = futures.pop(filename, None)
+                if not future:
+                    logging.info("parser: ignoring %s (already parsed)", filename)
+                    continue
+
+                try:
+                    item, records, stats = future.result()
+                except Exception as e:
+                    logging.error("parser: error parsing %s, error: %s", filename, e)
+                    continue
+
+                wlogs.replay_records(records)
+                if stats:
+                    self._parse_stats.merge(stats)
+                if not item:
+                    continue
+
+                bank = item[0]
+                bank.set_parse_stats(self._parse_stats)
+                if self._names:
+                    bank.set_names(self._names)
+                self._banks[filename] = item
+                loaded_filenames.append(filename)
 
-        logging.info("parser: done")
         return loaded_filenames
 
     # Parses a whole bank into memory and adds to the list. Can be kinda big (ex. ~50MB in RAM)
     # but since games also load banks in memory should be within reasonable limits.
-    def parse_bank(self, filename):
+    # (data: file already read in memory, see set_prefetch)
+    def parse_bank(self, filename, data=None):
         if filename in self._banks:
             logging.info("parser: ignoring %s (already parsed)", filename)
             return
 
         logging.info("parser: parsing %s", filename)
+        start = time.perf_counter()
 
         try:
-            with open(filename, 'rb') as infile:
-                #real_filename = infile.name
-                r = wio.FileReader(infile)
-                r.guess_endian32(0x04)
-                res = self._process(r, filename)
+            if data:
+                r = wio.MemoryReader(filename, data)
+                res = self._parse_reader(r, filename)
+            else:
+                with open(filename, 'rb') as infile:
+                    #real_filename = infile.name
+                    r = wio.open_reader(infile, self._reader_mode)
+                    res = self._parse_reader(r, filename)
 
             if res:
                 logging.info("parser: %s", res)
                 return None
 
-            logging.debug("parser: done %s", filename)
+            logging.debug("parser: done %s (%.3fs)", filename, time.perf_counter() - start)
             return filename
 
         except wio.ReaderError as e:
@@ -4024,6 +4513,184 @@ class Parser(object):
 
         return None
 
+    def _parse_reader(self, r, filename):
+        try:
+            r.guess_endian32(0x04)
+            res = self._process(r, filename)
+            # lazy items need the reader later
+            if self._lazy and not res:
+                r.detach()
+                r = None
+        finally:
+            if r:
+                r.close()
+        return res
+
+    # Parses a bank sending nodes to a listener as they are parsed rather than keeping them, so
+    # big banks can be processed (dumped) in constant memory. Listener is called with:
+    # - start_bank(bank): after reading the header
+    # - stream_item(list, item): each item in chunk lists, removed after the call
+    # - end_chunk(chunk): each chunk, removed after the call (items already streamed)
+    # - end_bank(bank)
+    def stream_bank(self, filename, listener):
+        logging.info("parser: streaming %s", filename)
+        start = time.perf_counter()
+
+        try:
+            with open(filename, 'rb') as infile:
+                r = wio.open_reader(infile, self._reader_mode)
+                try:
+                    r.guess_endian32(0x04)
+                    res = self._process_stream(r, listener)
+                finally:
+                    r.close()
+
+            if res:
+                logging.info("parser: %s", res)
+                return False
+
+            logging.debug("parser: done %s (%.3fs)", filename, time.perf_counter() - start)
+            return True
+
+        except wio.ReaderError as e:
+            error_info = self._print_errors(e)
+            logging.error("parser: error parsing %s (corrupted file?), error:\n%s" % (filename, error_info))
+        except Exception as e:
+            logging.error("parser: error parsing %s: %s", filename, e)
+
+        return False
+
+    def _process_stream(self, r, listener):
+        bank = wmodel.NodeRoot(r)
+        bank.set_profile(self._profile)
+        bank.set_parse_stats(self._parse_stats)
+        if self._names:
+            bank.set_names(self._names)
+
+        try:
+            version = self._check_header(r, bank)
+
+            bank.set_stream(listener.stream_item)
+            listener.start_bank(bank)
+
+            if version <= 14:
+                obj = bank.node('chunk')
+                parse_chunk_akbk(obj)
+                listener.end_chunk(obj)
+                bank.release_chunks()
+
+            while not r.is_eof():
+                obj = bank.node('chunk')
+                parse_chunk(obj)
+                listener.end_chunk(obj)
+                bank.release_chunks()
+
+            listener.end_bank(bank)
+
+        except wmodel.VersionError as e:
+            return e.msg
+
+        log_issues(bank.get_error_count(), bank.get_skip_count())
+        return None
+
+    # Reads bank info from headers only (BKHD plus each chunk's tag/size, skipping bodies), for
+    # quick triage of many banks. Returns a list of dicts per bank, same order as filenames.
+    def scan_banks(self, filenames):
+        if self._jobs > 1 and len(filenames) > 1:
+            return self._scan_banks_jobs(filenames)
+
+        return [self.scan_bank(filename) for filename in filenames]
+
+    def _scan_banks_jobs(self, filenames):
+        import concurrent.futures
+
+        level = logging.getLogger().getEffectiveLevel()
+        infos = []
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self._jobs) as executor:
+            # small tasks, so send a few at once to reduce overhead
+            chunksize = max(1, min(64, len(filenames) // (self._jobs * 4)))
+            args = [(filename, self._reader_mode, level) for filename in filenames]
+            for info, records in executor.map(_scan_bank_job, args, chunksize=chunksize):
+                wlogs.replay_records(records)
+                infos.append(info)
+        return infos
+
+    def scan_bank(self, filename):
+        info = {
+            'filename': filename,
+            'size': None,
+            'version': None,
+            'custom': False,
+            'be': False,
+            'id': None,
+            'lang': None,
+            'chunks': [],
+            'hirc_items': None,
+            'error': None,
+        }
+
+        try:
+            with open(filename, 'rb') as infile:
+                r = wio.open_reader(infile, self._reader_mode)
+                try:
+                    r.guess_endian32(0x04)
+                    self._scan(r, info)
+                finally:
+                    r.close()
+
+        except wmodel.VersionError as e:
+            info['error'] = e.msg
+        except (wio.ReaderError, ValueError) as e:
+            info['error'] = str(e)
+        except OSError as e:
+            info['error'] = str(e)
+
+        if info['error']:
+            logging.debug("parser: can't scan %s (%s)", filename, info['error'])
+        return info
+
+    def _scan(self, r, info):
+        bank = wmodel.NodeRoot(r)
+        size = r.get_size()
+        info['size'] = size
+
+        # same as parsing (custom versions, xorpad, etc)
+        version = self._check_header(r, bank)
+        info['version'] = version
+        info['custom'] = bank.is_custom()
+        info['be'] = bank.is_be()
+
+        chunks = info['chunks']
+        if version <= 14:
+            # AKBK mini header without size
+            chunks.append(('AKBK', 0x08))
+            r.skip(0x0c)
+
+        while not r.is_eof():
+            offset = r.current()
+            tag = r.fourcc()
+            chunk_size = r.u32()
+            tag_name = tag.decode('ascii', errors='replace')
+            chunks.append((tag_name, chunk_size))
+
+            end = offset + 0x08 + chunk_size
+            if end > size:
+                info['error'] = "truncated chunk %s at 0x%x" % (tag_name, offset)
+                break
+
+            if tag == b'BKHD':
+                # tiny, parsed normally to get the same values (and fixes) as a full parse
+                r.seek(offset)
+                obj = bank.node('chunk')
+                parse_chunk(obj)
+            elif tag == b'HIRC':
+                info['hirc_items'] = r.u32()
+
+            r.seek(end)
+
+        info['id'] = bank.get_id()
+        info['lang'] = bank.get_lang()
+
     def _print_errors(self, e):
         import traceback
 
@@ -4045,18 +4712,32 @@ class Parser(object):
 
     def _process(self, r, filename):
         bank = wmodel.NodeRoot(r)
+        bank.set_profile(self._profile)
+        if not self._stream: #counted when streamed
+            bank.set_parse_stats(self._parse_stats)
+
+        key = None
+        if self._cache and not self._stream:
+            key = self._cache.get_key(r, self._profile)
 
         try:
             version = self._check_header(r, bank)
 
-            # first chunk in ancient versions doesn't follow the usual rules
-            if version <= 14:
-                obj = bank.node('chunk')
-                parse_chunk_akbk(obj)
+            if key and self._cache.load(key, bank):
+                logging.debug("parser: loaded %s from cache", filename)
+            else:
+                # first chunk in ancient versions doesn't follow the usual rules
+                if version <= 14:
+                    obj = bank.node('chunk')
+                    parse_chunk_akbk(obj)
 
-            while not r.is_eof():
-                obj = bank.node('chunk')
-                parse_chunk(obj)
+                while not r.is_eof():
+                    obj = bank.node('chunk')
+                    parse_chunk(obj, lazy=self._lazy, info=self._stream)
+
+                # lazy banks aren't fully parsed
+                if key and not self._lazy:
+                    self._cache.save(key, bank)
 
         except wmodel.VersionError as e:
             return e.msg
@@ -4064,10 +4745,7 @@ class Parser(object):
         #except wmodel.ParseError as e:
             #bank.add_error(str(e))
 
-        if bank.get_error_count() > 0:
-            logging.info("parser: ERRORS! %i found (report issue)" % bank.get_error_count())
-        if bank.get_skip_count() > 0:
-            logging.info("parser: SKIPS! %i found (report issue)" % bank.get_skip_count())
+        log_issues(bank.get_error_count(), bank.get_skip_count())
 
         if self._names:
             bank.set_names(self._names)
@@ -4147,8 +4825,14 @@ class Parser(object):
 
         return banks
 
+    # Loaded banks plus repeated banks that weren't parsed (see _dedupe_banks), since their folders
+    # may have companion files for names.
     def get_filenames(self):
-        return list(self._banks.keys())
+        filenames = list(self._filenames.keys())
+        for filename in self._banks:
+            if filename not in self._filenames:
+                filenames.append(filename) #loaded with parse_bank
+        return filenames
 
     def set_names(self, names):
         self._names = names
@@ -4156,6 +4840,63 @@ class Parser(object):
             bank = items[0]
             bank.set_names(names)
 
+    # how banks are read (see wio.READER_*)
+    def set_reader_mode(self, mode):
+        if mode and mode not in wio.READER_MODES:
+            logging.warning("parser: WARNING, unknown reader mode '%s'" % (mode))
+            mode = None
+        self._reader_mode = mode
+
+    # parse HIRC items on access rather than when loading the bank
+    def set_lazy(self, flag):
+        self._lazy = flag
+
+    # parse multiple banks in N processes (lazy parsing needs the bank file so isn't used then)
+    def set_jobs(self, jobs):
+        if not jobs or jobs < 1:
+            jobs = 1
+        self._jobs = jobs
+
+    # load/save parsed banks from a wcache.BankCache
+    def set_cache(self, cache):
+        self._cache = cache
+
+    # skip parsing repeated banks, per get_banks mode (see MULTIBANK_*, default auto)
+    def set_repeat_mode(self, mode):
+        self._repeat_mode = mode
+
+    # read next banks in memory in a background thread while parsing, up to N bytes
+    def set_prefetch(self, size):
+        if not size or size < 0:
+            size = 0
+        self._prefetch = size
+
+    # garbage collector handling when parsing banks (see GC_*)
+    def set_gc_mode(self, mode):
+        if not mode:
+            mode = self.GC_AUTO
+        if mode not in self.GC_MODES:
+            logging.warning("parser: WARNING, unknown gc mode '%s'" % (mode))
+            mode = self.GC_AUTO
+        self._gc_mode = mode
+
+    # record parse time/bytes/nodes per chunk and HIRC type in a wstats.ParseStats (or None)
+    def set_parse_stats(self, stats):
+        self._parse_stats = stats
+
+    # only parse bank info (header/strings) when loading, as banks are parsed again with stream_bank
+    def set_stream(self, flag):
+        self._stream = flag
+
+    # how much of the bank is parsed (see wmodel.PROFILE_*)
+    def set_profile(self, profile):
+        if not profile:
+            profile = wmodel.PROFILE_FULL
+        if profile not in wmodel.PROFILES:
+            logging.warning("parser: WARNING, unknown parse profile '%s'" % (profile))
+            profile = wmodel.PROFILE_FULL
+        self._profile = profile
+
     #def set_ignore_version(self, value):
     #    self._ignore_version = value
 
@@ -4166,3 +4907,43 @@ class Parser(object):
 
         logging.info("parser: unloading " + filename)
         self._banks.pop(filename)
+        self._filenames.pop(filename, None)
+        # frozen banks can't be freed otherwise (remaining banks are frozen again on next parse)
+        self.unfreeze_gc()
+
+
+# Parses a single bank in a worker process (see Parser.set_jobs). Returns the bank info
+# plus log messages (and parse stats), so the main process can report them like when parsing serially.
+def _parse_bank_job(filename, reader_mode, profile, cache, gc_mode, parse_stats, level):
+    records = wlogs.setup_records_logging(level)
+
+    stats = None
+    if parse_stats:
+        stats = wstats.ParseStats()
+
+    parser = Parser()
+    parser.set_reader_mode(reader_mode)
+    parser.set_profile(profile)
+    parser.set_cache(cache)
+    parser.set_gc_mode(gc_mode)
+    parser.set_parse_stats(stats)
+    gc_enabled = parser._pause_gc()
+    try:
+        parser.parse_bank(filename)
+    finally:
+        parser._resume_gc(gc_enabled)
+    item = parser._banks.get(filename)
+
+    return (item, records, stats)
+
+
+# Scans a single bank in a worker process (see Parser.scan_banks).
+def _scan_bank_job(args):
+    filename, reader_mode, level = args
+    records = wlogs.setup_records_logging(level)
+
+    parser = Parser()
+    parser.set_reader_mode(reader_mode)
+    info = parser.scan_bank(filename)
+
+    return (info, records)
@@ -206,106 +206,122 @@ def CAkSound__Create(obj):
     cls.CAkParameterNode()
     return cls
 
-def CAkAction__Create(obj, actionType):
-    #CAkAction::Create
-
-    # giant switch in CAkAction::Create
-    # (some don't exist in earlier versions but no apparent type reuse)
-    CAkAction_ActionTypes_056 = {
-        0x01000: CAkActionStop,
-        0x02000: CAkActionPause,
-        0x03000: CAkActionResume,
-        0x04000: CAkActionPlay,
-        0x05000: CAkActionPlayAndContinue,
-        0x06000: CAkActionMute,
-        0x07000: CAkActionMute,
-        0x08000: CAkActionSetPitch,
-        0x09000: CAkActionSetPitch,
-        0x0A000: CAkActionSetVolume,
-        0x0B000: CAkActionSetVolume,
-        0x0C000: CAkActionSetLFE,
-        0x0D000: CAkActionSetLFE,
-        0x0E000: CAkActionSetLPF,
-        0x0F000: CAkActionSetLPF,
-        0x10000: CAkActionUseState,
-        0x11000: CAkActionUseState,
-        0x12000: CAkActionSetState,
-        0x13000: CAkActionSetGameParameter, #v056
-        0x14000: CAkActionSetGameParameter, #v056
-        0x20000: CAkActionEvent,
-        0x30000: CAkActionEvent,
-        0x40000: CAkActionEvent,
-        0x50000: CAkActionDuck,
-        0x60000: CAkActionSetSwitch,
-        0x61000: CAkActionSetRTPC,
-        0x70000: CAkActionBypassFX,
-        0x80000: CAkActionBypassFX,
-        0x90000: CAkActionBreak,
-        0xA0000: CAkActionTrigger,
-        0xB0000: CAkActionSeek,
-    }
-    CAkAction_ActionTypes_072 = {
-        0x0100: CAkActionStop,
-        0x0200: CAkActionPause,
-        0x0300: CAkActionResume,
-        0x0400: CAkActionPlay,
-        0x0500: CAkActionPlayAndContinue, #early (removed in later versions)
-        0x0600: CAkActionMute,
-        0x0700: CAkActionMute,
-        0x0800: CAkActionSetAkProp, #AkPropID_Pitch
-        0x0900: CAkActionSetAkProp, #AkPropID_Pitch
-        0x0A00: CAkActionSetAkProp, #(none) / AkPropID_Volume (~v145) / AkPropID_FirstRtpc (v150) 
-        0x0B00: CAkActionSetAkProp, #(none) / AkPropID_Volume (~v145) / AkPropID_FirstRtpc (v150)
-        0x0C00: CAkActionSetAkProp, #AkPropID_BusVolume
-        0x0D00: CAkActionSetAkProp, #AkPropID_BusVolume
-        0x0E00: CAkActionSetAkProp, #AkPropID_LPF
-        0x0F00: CAkActionSetAkProp, #AkPropID_LPF
-        0x1000: CAkActionUseState,
-        0x1100: CAkActionUseState,
-        0x1200: CAkActionSetState,
-        0x1300: CAkActionSetGameParameter,
-        0x1400: CAkActionSetGameParameter,
-        0x1500: CAkActionEvent, #not in v150
-        0x1600: CAkActionEvent, #not in v150
-        0x1700: CAkActionEvent, #not in v150
-        0x1900: CAkActionSetSwitch,
-        0x1A00: CAkActionBypassFX,
-        0x1B00: CAkActionBypassFX,
-        0x1C00: CAkActionBreak,
-        0x1D00: CAkActionTrigger,
-        0x1E00: CAkActionSeek,
-        0x1F00: CAkActionRelease,
-        0x2000: CAkActionSetAkProp, #AkPropID_HPF
-        0x2100: CAkActionPlayEvent,
-        0x2200: CAkActionResetPlaylist,
-        0x2300: CAkActionPlayEventUnknown, #custom versions, possibly used to trigger both regular or dialogueEvents
-        0x3000: CAkActionSetAkProp, #AkPropID_HPF
-        0x3100: CAkActionSetFX,
-        0x3200: CAkActionSetFX,
-        0x3300: CAkActionBypassFX,
-        0x3400: CAkActionBypassFX,
-        0x3500: CAkActionBypassFX,
-        0x3600: CAkActionBypassFX,
-        0x3700: CAkActionBypassFX,
-    }
-    CAkAction_ActionTypes_150_changes = {
-        0x1A00: CAkActionBreak,
-        0x1B00: CAkActionTrigger,
-    }
-
-    version = wparser.get_version(obj)
-    if version >= 150:
-        CAkAction_ActionTypes_072.update(CAkAction_ActionTypes_150_changes)
+# giant switch in CAkAction::Create, also used to find out action names without parsing
+# (some don't exist in earlier versions but no apparent type reuse)
+CAkAction_ActionTypes_056 = {
+    0x01000: CAkActionStop,
+    0x02000: CAkActionPause,
+    0x03000: CAkActionResume,
+    0x04000: CAkActionPlay,
+    0x05000: CAkActionPlayAndContinue,
+    0x06000: CAkActionMute,
+    0x07000: CAkActionMute,
+    0x08000: CAkActionSetPitch,
+    0x09000: CAkActionSetPitch,
+    0x0A000: CAkActionSetVolume,
+    0x0B000: CAkActionSetVolume,
+    0x0C000: CAkActionSetLFE,
+    0x0D000: CAkActionSetLFE,
+    0x0E000: CAkActionSetLPF,
+    0x0F000: CAkActionSetLPF,
+    0x10000: CAkActionUseState,
+    0x11000: CAkActionUseState,
+    0x12000: CAkActionSetState,
+    0x13000: CAkActionSetGameParameter, #v056
+    0x14000: CAkActionSetGameParameter, #v056
+    0x20000: CAkActionEvent,
+    0x30000: CAkActionEvent,
+    0x40000: CAkActionEvent,
+    0x50000: CAkActionDuck,
+    0x60000: CAkActionSetSwitch,
+    0x61000: CAkActionSetRTPC,
+    0x70000: CAkActionBypassFX,
+    0x80000: CAkActionBypassFX,
+    0x90000: CAkActionBreak,
+    0xA0000: CAkActionTrigger,
+    0xB0000: CAkActionSeek,
+}
+CAkAction_ActionTypes_072 = {
+    0x0100: CAkActionStop,
+    0x0200: CAkActionPause,
+    0x0300: CAkActionResume,
+    0x0400: CAkActionPlay,
+    0x0500: CAkActionPlayAndContinue, #early (removed in later versions)
+    0x0600: CAkActionMute,
+    0x0700: CAkActionMute,
+    0x0800: CAkActionSetAkProp, #AkPropID_Pitch
+    0x0900: CAkActionSetAkProp, #AkPropID_Pitch
+    0x0A00: CAkActionSetAkProp, #(none) / AkPropID_Volume (~v145) / AkPropID_FirstRtpc (v150) 
+    0x0B00: CAkActionSetAkProp, #(none) / AkPropID_Volume (~v145) / AkPropID_FirstRtpc (v150)
+    0x0C00: CAkActionSetAkProp, #AkPropID_BusVolume
+    0x0D00: CAkActionSetAkProp, #AkPropID_BusVolume
+    0x0E00: CAkActionSetAkProp, #AkPropID_LPF
+    0x0F00: CAkActionSetAkProp, #AkPropID_LPF
+    0x1000: CAkActionUseState,
+    0x1100: CAkActionUseState,
+    0x1200: CAkActionSetState,
+    0x1300: CAkActionSetGameParameter,
+    0x1400: CAkActionSetGameParameter,
+    0x1500: CAkActionEvent, #not in v150
+    0x1600: CAkActionEvent, #not in v150
+    0x1700: CAkActionEvent, #not in v150
+    0x1900: CAkActionSetSwitch,
+    0x1A00: CAkActionBypassFX,
+    0x1B00: CAkActionBypassFX,
+    0x1C00: CAkActionBreak,
+    0x1D00: CAkActionTrigger,
+    0x1E00: CAkActionSeek,
+    0x1F00: CAkActionRelease,
+    0x2000: CAkActionSetAkProp, #AkPropID_HPF
+    0x2100: CAkActionPlayEvent,
+    0x2200: CAkActionResetPlaylist,
+    0x2300: CAkActionPlayEventUnknown, #custom versions, possibly used to trigger both regular or dialogueEvents
+    0x3000: CAkActionSetAkProp, #AkPropID_HPF
+    0x3100: CAkActionSetFX,
+    0x3200: CAkActionSetFX,
+    0x3300: CAkActionBypassFX,
+    0x3400: CAkActionBypassFX,
+    0x3500: CAkActionBypassFX,
+    0x3600: CAkActionBypassFX,
+    0x3700: CAkActionBypassFX,
+}
+CAkAction_ActionTypes_150_changes = {
+    0x1A00: CAkActionBreak,
+    0x1B00: CAkActionTrigger,
+}
+
+
+# per version (mask, types), as tables don't change between actions
+_action_types = {}
+
+def _get_action_types(version):
+    action_types = _action_types.get(version)
+    if action_types:
+        return action_types
 
     if   version <= 56:
-        name = CAkAction_ActionTypes_056.get(actionType & 0xFF000)
+        action_types = (0xFF000, CAkAction_ActionTypes_056)
     else:
-        name = CAkAction_ActionTypes_072.get(actionType & 0xFF00)
+        types = CAkAction_ActionTypes_072
+        if version >= 150:
+            types = dict(types)
+            types.update(CAkAction_ActionTypes_150_changes)
+        action_types = (0xFF00, types)
 
-    if name is None:
-        raise wmodel.ParseError("Unknown action type %05x " % (actionType), obj)
+    _action_types[version] = action_types
+    return action_types
 
-    cls = AkClass(obj, name)
+def get_action_name(version, actionType):
+    mask, types = _get_action_types(version)
+    return types.get(actionType & mask)
+
+# per version action callbacks (made on first use, since wparser is loaded on setup)
+_action_dispatch = {}
+
+def _get_action_dispatch(version):
+    CAkAction_dispatch = _action_dispatch.get(version)
+    if CAkAction_dispatch:
+        return CAkAction_dispatch
 
     CAkAction_dispatch = {
         CAkActionStop: (wparser.CAkActionActive__SetActionParams, wparser.CAkActionStop__SetActionSpecificParams),
@@ -337,25 +353,38 @@ def CAkAction__Create(obj, actionType):
         CAkActionPlayEventUnknown: (wparser.CAkActionPlay__SetActionParams, wparser.CAkAction__SetActionSpecificParams),
     }
 
-    if   cls.version == 26:
+    if   version == 26:
         CAkAction_dispatch.update({
             # extends from CAkActionSetLFE (062 from CAkActionSetAkProp and 053 from CAkAction)
             CAkActionSetVolume: (wparser.CAkActionSetValue__SetActionParams, wparser.CAkActionSetAkProp__SetActionSpecificParams),
         })
 
 
-    if   cls.version == 56:
+    if   version == 56:
         CAkAction_dispatch.update({
             # extends from CAkActionSetLFE (062 from CAkActionSetAkProp and 053 from CAkAction)
             CAkActionUseState: (wparser.CAkActionSetValue__SetActionParams, wparser.CAkAction__SetActionSpecificParams),
         })
 
-    if   cls.version <= 122:
+    if   version <= 122:
         CAkAction_dispatch.update({
             CAkActionStop: (wparser.CAkActionActive__SetActionParams, wparser.CAkAction__SetActionSpecificParams),
         })
 
-    dispatch = CAkAction_dispatch.get(cls.name)
+    _action_dispatch[version] = CAkAction_dispatch
+    return CAkAction_dispatch
+
+def CAkAction__Create(obj, actionType):
+    #CAkAction::Create
+
+    version = wparser.get_version(obj)
+    name = get_action_name(version, actionType)
+    if name is None:
+        raise wmodel.ParseError("Unknown action type %05x " % (actionType), obj)
+
+    cls = AkClass(obj, name)
+
+    dispatch = _get_action_dispatch(cls.version).get(cls.name)
     if dispatch:
         cls.CAkAction(*dispatch)
     return cls
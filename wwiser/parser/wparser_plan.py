@@ -0,0 +1,270 @@
+import functools
+from . import wdefs, wmodel
+
+#******************************************************************************
+# COMPILED READERS
+
+# Readers check "cls.version <= N" branches for every object they read, which adds up in banks
+# with lots of sounds/actions/events. Readers marked with @compiled are instead run once per
+# version (and extra args) with placeholder objects, that record fields/nodes that would be read
+# into a flat list of steps (a "plan"), and that plan is what is run for each object. Consecutive
+# fixed-size fields are merged into a wmodel.FieldRun, read at once.
+#
+# Since plans don't see data, parts that depend on read values (lists, flags) must be added as
+# obj.call(reader, ...), though lists of fixed-size records may use obj.records(..., obj.lastval, ...)
+# to be precompiled as well. Calling another compiled reader inlines its steps, and cls.CAkClass__*
+# callbacks are resolved when compiling (they only depend on class and version, so plans are
+# made per class too). Results must be the same as running the reader directly.
+
+# steps are (kind, arg1, arg2) tuples, nodes are flattened as NODE ... END
+STEP_RUN = 0        #(fieldrun, None)
+STEP_FIELD = 1      #(type, name) plain field
+STEP_FIELDX = 2     #(type, (name, size, fmt, hashtype, bits)) field with extras
+STEP_NODE = 3       #(name, None) following steps go to new node, until END
+STEP_END = 4        #(None, None)
+STEP_CALL = 5       #(reader, args)
+STEP_RECORDS = 6    #(fieldrun, (name, subname, count)), count None = lastval
+
+
+# marks a reader as compiled
+def compiled(reader):
+    plans = {}
+
+    @functools.wraps(reader)
+    def run(obj, cls, *args, **kwargs):
+        if type(obj) is PlanObject:
+            reader(obj, cls, *args, **kwargs)
+            return
+
+        if kwargs:
+            key = (cls.version, cls.name, args, tuple(kwargs.items()))
+        else:
+            key = (cls.version, cls.name, args)
+        plan = plans.get(key)
+        if plan is None:
+            plan = _compile(reader, cls, args, kwargs)
+            plans[key] = plan
+        _run(plan, obj, cls)
+
+    run.compiled = True
+    return run
+
+def _compile(reader, cls, args, kwargs):
+    obj = PlanObject(PlanRoot(cls.version))
+    reader(obj, PlanClass(cls), *args, **kwargs)
+    return obj.get_steps()
+
+def _run(steps, obj, cls):
+    parents = []
+    for kind, arg1, arg2 in steps:
+        if   kind == STEP_RUN:
+            obj.fields(arg1)
+        elif kind == STEP_FIELD:
+            obj.field(arg1, arg2)
+        elif kind == STEP_NODE:
+            parents.append(obj)
+            obj = obj.node(arg1)
+        elif kind == STEP_END:
+            obj = parents.pop()
+        elif kind == STEP_CALL:
+            arg1(obj, cls, *arg2)
+        elif kind == STEP_RECORDS:
+            name, subname, count = arg2
+            if count is None:
+                count = obj.lastval
+            obj.records(name, subname, count, arg1)
+        else:
+            name, size, fmt, hashtype, bits = arg2
+            child = obj.field(arg1, name, size=size)
+            if fmt:
+                child.fmt(fmt)
+            if hashtype:
+                child.fnv(hashtype)
+            for bit_name, bit, mask, bit_fmt in bits:
+                child.bit(bit_name, obj.lastval, bit, mask, bit_fmt)
+
+
+#******************************************************************************
+# PLACEHOLDERS
+
+# stand-in for a bank while compiling (only version-dependent info)
+class PlanRoot(object):
+    __slots__ = ['_version', '_defs']
+
+    def __init__(self, version):
+        self._version = version
+        self._defs = wdefs.get_defs(version)
+
+    def get_version(self):
+        return self._version
+
+    def get_defs(self):
+        return self._defs
+
+# stand-in for wparser_cls.AkClass while compiling, callbacks are inlined or recorded as calls
+class PlanClass(object):
+    __slots__ = ['version', 'name', '_cls']
+
+    def __init__(self, cls):
+        self.version = cls.version
+        self.name = cls.name
+        self._cls = cls
+
+    def __getattr__(self, name):
+        if not name.startswith('CAkClass__'):
+            raise AttributeError(name)
+        callback = getattr(self._cls, name)
+        if getattr(callback, 'compiled', False):
+            return callback
+        return lambda obj, cls: obj.call(callback)
+
+# stand-in for a NodeField while compiling
+class PlanField(object):
+    __slots__ = ['type', 'name', 'size', '_fmt', '_hashtype', 'bits']
+
+    def __init__(self, type, name, size):
+        self.type = type
+        self.name = name
+        self.size = size
+        self._fmt = None
+        self._hashtype = None
+        self.bits = []
+
+    def fmt(self, fmt):
+        self._fmt = fmt
+        return self
+
+    def fnv(self, hashtype):
+        self._hashtype = hashtype
+        return self
+
+    # value is ignored (not known yet), bits are always taken from this field's value
+    def bit(self, name, value, bit, mask=1, fmt=None):
+        self.bits.append((name, bit, mask, fmt))
+        return self
+
+    def is_fixed(self):
+        return self.type in wmodel.TYPES_STRUCT and self.type != wmodel.TYPE_4CC
+
+    def get_item(self):
+        return (self.type, self.name, self._fmt, self._hashtype, self.bits)
+
+    def get_step(self):
+        if self.size is None and not self._fmt and not self._hashtype and not self.bits:
+            return (STEP_FIELD, self.type, self.name)
+        return (STEP_FIELDX, self.type, (self.name, self.size, self._fmt, self._hashtype, self.bits))
+
+# stand-in for a NodeObject while compiling
+class PlanObject(object):
+    __slots__ = ['_root', '_steps', 'lastval']
+
+    def __init__(self, root):
+        self._root = root
+        self._steps = []
+        self.lastval = None #data isn't known yet
+
+    def get_root(self):
+        return self._root
+
+    def four(self, name):
+        return self.field(wmodel.TYPE_4CC, name)
+
+    def sid(self, name):
+        return self.field(wmodel.TYPE_SID, name)
+
+    def tid(self, name):
+        return self.field(wmodel.TYPE_TID, name)
+
+    def uni(self, name):
+        return self.field(wmodel.TYPE_UNI, name)
+
+    def var(self, name):
+        return self.field(wmodel.TYPE_VAR, name)
+
+    def s32(self, name):
+        return self.field(wmodel.TYPE_S32, name)
+
+    def u32(self, name):
+        return self.field(wmodel.TYPE_U32, name)
+
+    def U32(self, name):
+        return self.u32(name).fmt(wdefs.fmt_hex)
+
+    def s16(self, name):
+        return self.field(wmodel.TYPE_S16, name)
+
+    def u16(self, name):
+        return self.field(wmodel.TYPE_U16, name)
+
+    def U16(self, name):
+        return self.u16(name).fmt(wdefs.fmt_hex)
+
+    def s8i(self, name):
+        return self.field(wmodel.TYPE_S8, name)
+
+    def u8i(self, name):
+        return self.field(wmodel.TYPE_U8, name)
+
+    def U8x(self, name):
+        return self.u8i(name).fmt(wdefs.fmt_hex)
+
+    def f32(self, name):
+        return self.field(wmodel.TYPE_F32, name)
+
+    def gap(self, name, size):
+        return self.field(wmodel.TYPE_GAP, name, size=size).fmt(wdefs.fmt_hex)
+
+    def field(self, type, name, size=None):
+        child = PlanField(type, name, size)
+        self._steps.append(child)
+        return child
+
+    def node(self, name):
+        child = PlanObject(self._root)
+        self._steps.append((STEP_NODE, name, child))
+        return child
+
+    # calls reader(obj, cls, *args) when run, for data-dependent parts
+    def call(self, reader, *args):
+        self._steps.append((STEP_CALL, reader, args))
+
+    # same as NodeObject.records, but count may be obj.lastval (None here) to use the last value when run
+    def records(self, name, subname, count, layout):
+        run = wmodel.FieldRun([self._get_record_item(*item) for item in layout])
+        self._steps.append((STEP_RECORDS, run, (name, subname, count)))
+
+    def _get_record_item(self, type, name, fmt=None, hashtype=None):
+        return (type, name, fmt, hashtype, [])
+
+    # final steps, with consecutive fixed-size fields merged
+    def get_steps(self):
+        steps = []
+        self._add_steps(steps)
+        return steps
+
+    def _add_steps(self, steps):
+        run = []
+        for step in self._steps:
+            if type(step) is PlanField and step.is_fixed():
+                run.append(step)
+                continue
+
+            self._add_run(steps, run)
+            run = []
+            if type(step) is PlanField:
+                steps.append(step.get_step())
+            elif step[0] == STEP_NODE:
+                steps.append((STEP_NODE, step[1], None))
+                step[2]._add_steps(steps)
+                steps.append((STEP_END, None, None))
+            else:
+                steps.append(step)
+
+        self._add_run(steps, run)
+
+    # a lone field without bits is faster to read normally
+    def _add_run(self, steps, run):
+        if len(run) > 1 or run and run[0].bits:
+            steps.append((STEP_RUN, wmodel.FieldRun([field.get_item() for field in run]), None))
+        elif run:
+            steps.append(run[0].get_step())
@@ -1,4 +1,4 @@
-from . import wdefs
+from . import wdefs, wmodel
 
 #******************************************************************************
 # HIRC: PLUGINS
@@ -625,6 +625,12 @@ plugin_dispatch = {
    #0x00B50007: (no params)
 }
 
+# params used by the txtp generator (wmodel.PROFILE_TXTP), others are left as a gap
+plugin_dispatch_txtp = {
+    0x00650002, #silence duration
+    0x008B0003, #gain
+}
+
 def parse_chunk_default(obj, size, params_name):
     obj = obj.node('AkPluginParam')
 
@@ -661,6 +667,9 @@ def parse_plugin_params(obj, plugin_id, size_name, params_name, always=False):
     #else:
     
     dispatch = plugin_dispatch.get(plugin_id)
+    if dispatch and plugin_id not in plugin_dispatch_txtp and obj.get_root().get_profile() == wmodel.PROFILE_TXTP:
+        dispatch = None
+
     if dispatch:
         dispatch(obj, size)
     else:
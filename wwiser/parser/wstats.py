@@ -0,0 +1,118 @@
+import logging, json, time
+from .. import wversion
+from . import wmodel
+
+# Parse time/bytes/nodes/errors per chunk tag and per HIRC item type, aggregated for all parsed
+# banks, to find out what makes banks slow to parse. Set in banks (NodeRoot.set_parse_stats)
+# so parser functions can record each part. Cached banks aren't parsed so they aren't counted,
+# and with lazy parsing HIRC items only count their header.
+
+SECTION_CHUNK = 'chunk'
+SECTION_HIRC = 'hirc'
+SECTIONS = [SECTION_CHUNK, SECTION_HIRC]
+
+# row values
+_COUNT = 0
+_TIME = 1
+_BYTES = 2
+_NODES = 3
+_ERRORS = 4
+_SKIPS = 5
+
+
+class ParseStats(object):
+    def __init__(self):
+        self._sections = {section: {} for section in SECTIONS}
+        self._overhead = 0.0 #time spent in add(), removed from outer parts (chunks > items)
+
+    # returns current state, to pass to add() once obj is parsed
+    def start(self, obj):
+        root = obj.get_root()
+        r = obj._get_reader()
+        return (time.perf_counter(), self._overhead, r.current(), root.get_error_count(), root.get_skip_count())
+
+    def add(self, section, key, obj, state):
+        now = time.perf_counter()
+        elapsed = now - state[0] - (self._overhead - state[1])
+        root = obj.get_root()
+        r = obj._get_reader()
+
+        row = self._sections[section].get(key)
+        if not row:
+            row = [0, 0.0, 0, 0, 0, 0]
+            self._sections[section][key] = row
+        row[_COUNT] += 1
+        row[_TIME] += elapsed
+        row[_BYTES] += r.current() - state[2]
+        row[_NODES] += wmodel.count_nodes(obj)
+        row[_ERRORS] += root.get_error_count() - state[3]
+        row[_SKIPS] += root.get_skip_count() - state[4]
+
+        self._overhead += time.perf_counter() - now
+
+    # adds stats from other parser (jobs)
+    def merge(self, other):
+        for section, rows in other._sections.items():
+            for key, other_row in rows.items():
+                row = self._sections[section].get(key)
+                if not row:
+                    self._sections[section][key] = list(other_row)
+                    continue
+                for i, value in enumerate(other_row):
+                    row[i] += value
+
+    def is_empty(self):
+        return not any(self._sections.values())
+
+    # slowest first
+    def _get_rows(self, section):
+        rows = self._sections[section]
+        return sorted(rows.items(), key=lambda item: item[1][_TIME], reverse=True)
+
+    def print_table(self):
+        header = ('key', 'count', 'time', 'time%', 'bytes', 'nodes', 'errors', 'skips')
+
+        for section in SECTIONS:
+            items = self._get_rows(section)
+            if not items:
+                continue
+            total = sum(row[_TIME] for _, row in items) or 1.0
+
+            lines = [header]
+            for key, row in items:
+                lines.append((
+                    key,
+                    '%i' % row[_COUNT],
+                    '%.3fs' % row[_TIME],
+                    '%.1f' % (row[_TIME] * 100.0 / total),
+                    '%i' % row[_BYTES],
+                    '%i' % row[_NODES],
+                    '%i' % row[_ERRORS],
+                    '%i' % row[_SKIPS],
+                ))
+
+            widths = [max(len(line[i]) for line in lines) for i in range(len(header))]
+            logging.info("parse stats per %s:", section)
+            for line in lines:
+                cols = [line[0].ljust(widths[0])] + [col.rjust(width) for col, width in zip(line[1:], widths[1:])]
+                logging.info("  %s", '  '.join(cols))
+
+    def save_json(self, filename):
+        items = {'version': wversion.WWISER_VERSION}
+        for section in SECTIONS:
+            items[section] = [
+                {
+                    'key': key,
+                    'count': row[_COUNT],
+                    'time': row[_TIME],
+                    'bytes': row[_BYTES],
+                    'nodes': row[_NODES],
+                    'errors': row[_ERRORS],
+                    'skips': row[_SKIPS],
+                }
+                for key, row in self._get_rows(section)
+            ]
+
+        with open(filename, 'w', encoding='utf-8') as outfile:
+            json.dump(items, outfile, indent=2)
+        logging.info("parser: saved parse stats to %s", filename)
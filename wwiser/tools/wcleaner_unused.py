@@ -91,7 +91,7 @@ class CleanerUnused(object):
             for nchunk in root.get_children():
                 chunkname = nchunk.get_name()
                 if chunkname == 'HircChunk':
-                    items = bank.find(name='listLoadedItem')
+                    items = bank.select1('HircChunk/listLoadedItem')
                     if not items: # media-only banks don't have items
                         continue
 
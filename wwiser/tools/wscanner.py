@@ -0,0 +1,93 @@
+import json, logging, sys, time
+from ..generator import wlang
+
+FORMAT_TABLE = 'table'
+FORMAT_JSON = 'json'
+FORMATS = [FORMAT_TABLE, FORMAT_JSON]
+
+
+# Prints basic info of many banks (version, id, lang, chunks, HIRC items) without parsing
+# them, to quickly check a game's banks (see Parser.scan_banks).
+class Scanner(object):
+    def __init__(self, parser, filenames):
+        self._parser = parser
+        self._filenames = filenames
+        self._format = FORMAT_TABLE
+        self._out = sys.stdout
+
+    def set_format(self, format):
+        if not format:
+            format = FORMAT_TABLE
+        if format not in FORMATS:
+            logging.warning("scanner: WARNING, unknown format '%s'" % (format))
+            format = FORMAT_TABLE
+        self._format = format
+
+    def set_out(self, out):
+        self._out = out
+
+    def process(self):
+        logging.info("scanner: scanning %i banks", len(self._filenames))
+        start = time.perf_counter()
+
+        infos = self._parser.scan_banks(self._filenames)
+
+        errors = sum(1 for info in infos if info['error'])
+        logging.info("scanner: done %i banks, %i errors (%.3fs)", len(infos), errors, time.perf_counter() - start)
+
+        if self._format == FORMAT_JSON:
+            self._print_json(infos)
+        else:
+            self._print_table(infos)
+
+    def _get_lang(self, info):
+        lang = info['lang']
+        if lang is None:
+            return ''
+        name = wlang.get_lang_name(info['version'], lang)
+        if name:
+            return name
+        return '%s' % (lang)
+
+    def _print_json(self, infos):
+        items = []
+        for info in infos:
+            item = dict(info)
+            item['lang_name'] = self._get_lang(info) or None
+            item['chunks'] = [{'tag': tag, 'size': size} for tag, size in info['chunks']]
+            items.append(item)
+
+        json.dump(items, self._out, indent=2)
+        self._out.write('\n')
+
+    def _print_table(self, infos):
+        header = ('file', 'version', 'bank id', 'lang', 'hirc', 'chunks')
+        rows = []
+        for info in infos:
+            version = info['version']
+            if version is None:
+                version = ''
+            elif info['custom']:
+                version = '%s*' % (version)
+            bank_id = info['id']
+            hirc_items = info['hirc_items']
+            chunks = ' '.join(tag for tag, _ in info['chunks'])
+            if info['error']:
+                chunks = ('%s (%s)' % (chunks, info['error'])).lstrip()
+
+            row = (
+                info['filename'],
+                '%s' % (version),
+                '' if bank_id is None else '%s' % (bank_id),
+                self._get_lang(info),
+                '' if hirc_items is None else '%s' % (hirc_items),
+                chunks,
+            )
+            rows.append(row)
+
+        # last column isn't padded
+        widths = [max(len(row[i]) for row in rows + [header]) for i in range(len(header) - 1)]
+        for row in [header] + rows:
+            cols = [col.ljust(width) for col, width in zip(row, widths)]
+            cols.append(row[-1])
+            self._out.write('  '.join(cols).rstrip() + '\n')
@@ -1,4 +1,4 @@
-import logging
+import logging, os, tempfile, shutil
 from . import wloader
 from ..parser import wmodel
 
@@ -50,8 +50,18 @@ class DumpPrinter(object):
         self._hide_attrs = []
         self._skip_types = False
         self._skip_empty = False
+        self._parser = None
+        self._spools = {}
+        self._stream_xml = False
+        self._stream_root = None
+        self._stream_chunks = 0
+        self._stream_printed = False
 
 
+    # dump banks while re-parsing them (see wparser.Parser.stream_bank), rather than from loaded trees
+    def set_stream(self, parser):
+        self._parser = parser
+
     def dump(self):
         if   self._type == TYPE_TXT:
             self.write_txt()
@@ -127,7 +137,7 @@ class DumpPrinter(object):
     #--------------------------------------------------------------------------
 
     def _print_empty_node(self, node):
-        __ = node.get_attrs() #forces names!
+        __ = node.get_attr_items() #forces names!
         children = node.get_children()
 
         if children:
@@ -140,14 +150,18 @@ class DumpPrinter(object):
             text = wloader.Loader.get_resource_text('resources/stylesheet.1.xsl')
             self._file.write(text)
 
-        # may reimplement this as a stack-based printer rather than recursive calls
-        # but time savings are not too big (~3s for bigger files)
-        lines = []
-        for bank in self._banks:
-            self._print_xml_node(bank, 0, lines)
+        if self._parser:
+            self._stream_xml = True
+            self._stream_banks()
+        else:
+            # may reimplement this as a stack-based printer rather than recursive calls
+            # but time savings are not too big (~3s for bigger files)
+            lines = []
+            for bank in self._banks:
+                self._print_xml_node(bank, 0, lines)
 
-        # often big but potentially faster than writting line-by-line
-        self._file.write(''.join(lines))
+            # often big but potentially faster than writting line-by-line
+            self._file.write(''.join(lines))
 
         if self._formatted:
             text = wloader.Loader.get_resource_text('resources/stylesheet.2.xsl')
@@ -157,39 +171,23 @@ class DumpPrinter(object):
         just = '\t' * depth
 
         nodename = node.get_nodename()
-        attrs = node.get_attrs()
+        attrs = node.get_attr_items()
         children = node.get_children()
         #text = node.get_text()
         has_children = children and len(children) > 0
 
-        if self._is_skippable(node, nodename, attrs, children):
-            return False
-
-        # print node attributes
-        line = ""
-        for key, val in attrs.items():
-            # ignore certain fields
-            if self._hide and key in self._hide_attrs:
-                continue
+        # list with items already printed
+        spool = None
+        if self._spools:
+            spool = self._spools.get(node)
+        if spool:
+            attrs = tuple((key, val + spool.count) if key == 'count' else (key, val) for key, val in attrs)
+            has_children = True
 
-            # value
-            if self._formatted and key in self.attr_format:
-                strval = self.attr_format[key] % val
-            else:
-                strval = str(val)
-
-            for chr, rpl in [('&','&amp;'), ('"','&quot;'), ('\'','&apos;'), ('<','&lt;'), ('>','&gt;')]:
-                strval = strval.replace(chr, rpl)
-
-            # rename field
-            if self._smaller and key in self.attr_smaller:
-                key = self.attr_smaller[key]
+        if self._is_skippable(node, nodename, attrs, has_children):
+            return False
 
-            line += " %s=\"%s\"" % (key, strval)
-
-        # rename node
-        if self._smaller and nodename in self.node_smaller:
-            nodename = self.node_smaller[nodename]
+        nodename, line = self._get_xml_tag(nodename, attrs)
 
         if not has_children:
             line = "%s<%s%s/>\n" % (just, nodename, line)
@@ -199,7 +197,10 @@ class DumpPrinter(object):
 
             depth += 1
             has_printed = False
-            for subnode in children:
+            if spool:
+                sublines.append(spool) #copied when writting
+                has_printed = spool.printed
+            for subnode in children or []:
                 is_printed = self._print_xml_node(subnode, depth, sublines)
                 if is_printed:
                     has_printed = True
@@ -217,7 +218,38 @@ class DumpPrinter(object):
 
         return True
 
-    def _is_skippable(self, node, nodename, attrs, children):
+    # returns final node name and attributes text
+    # attrs: node's (key, value) tuples
+    def _get_xml_tag(self, nodename, attrs):
+        line = ""
+        for key, val in attrs:
+            # ignore certain fields
+            if self._hide and key in self._hide_attrs:
+                continue
+
+            # value
+            if self._formatted and key in self.attr_format:
+                strval = self.attr_format[key] % val
+            else:
+                strval = str(val)
+
+            if not isinstance(val, (int, float)): #numbers don't need escaping
+                for chr, rpl in [('&','&amp;'), ('"','&quot;'), ('\'','&apos;'), ('<','&lt;'), ('>','&gt;')]:
+                    strval = strval.replace(chr, rpl)
+
+            # rename field
+            if self._smaller and key in self.attr_smaller:
+                key = self.attr_smaller[key]
+
+            line += " %s=\"%s\"" % (key, strval)
+
+        # rename node
+        if self._smaller and nodename in self.node_smaller:
+            nodename = self.node_smaller[nodename]
+
+        return (nodename, line)
+
+    def _is_skippable(self, node, nodename, attrs, has_children):
         if not self._skip_empty:
             return False
 
@@ -226,8 +258,19 @@ class DumpPrinter(object):
         #if not isinstance(node, wmodel.NodeSkip):
         #    return False
 
+        # single pass over (key, value) attrs
+        name = value = type = valuefmt = None
+        for key, val in attrs:
+            if key == 'name':
+                name = val
+            elif key == 'value':
+                value = val
+            elif key == 'type':
+                type = val
+            elif key == 'valuefmt':
+                valuefmt = val
+
         # useless fields
-        name = attrs.get('name')
         if name in self.ATTR_SKIPPABLE_NAMES:
             return True
 
@@ -236,21 +279,18 @@ class DumpPrinter(object):
         #    return False
 
         # parent nodes skip only if all children are skipped (tested later)
-        if children and len(children) > 0:
+        if has_children:
             return False
 
         # only skips fields with 0
-        value = attrs.get('value')
         if value:
             return False
         
         # floats are used for positioning, don't skip
-        type = attrs.get('type')
         if type == wmodel.TYPE_F32 or type == wmodel.TYPE_D64:
             return False
 
         # formatted values with a description are shown even if 0
-        valuefmt = attrs.get('valuefmt')
         if not value and valuefmt and '[' in valuefmt:
             return False
 
@@ -259,6 +299,11 @@ class DumpPrinter(object):
 
 
     def _print_txt(self):
+        if self._parser:
+            self._stream_xml = False
+            self._stream_banks()
+            return
+
         for bank in self._banks:
             self._print_txt_node(bank, 0, 0)
 
@@ -267,7 +312,7 @@ class DumpPrinter(object):
         ojust = ''.ljust(8)
 
         #nodename = node.get_nodename()
-        attrs = node.get_attrs()
+        attrs = dict(node.get_attr_items())
         children = node.get_children()
         #text = node.get_text()
         has_children = children and len(children) > 0
@@ -323,11 +368,110 @@ class DumpPrinter(object):
             self._file.write(line + '\n')
             depth += 3
 
+        # list with items already printed
+        start = 0
+        if self._spools and node in self._spools:
+            spool = self._spools[node]
+            spool.copy_to(self._file)
+            start = spool.count
 
         if has_children:
             if   isinstance(node, wmodel.NodeList):
-                for index, subnode in enumerate(children):
+                for index, subnode in enumerate(children, start):
                     self._print_txt_node(subnode, depth, index)
             else:
                 for subnode in children:
                     self._print_txt_node(subnode, depth, None)
+
+
+    #--------------------------------------------------------------------------
+    # Streamed banks: list items in chunks are printed to temp files as they are parsed and
+    # discarded, then copied when their chunk is done (so list/parent info is final), giving
+    # the same output as printing the whole tree.
+
+    def _stream_banks(self):
+        for bank in self._banks:
+            root = bank.get_root()
+            filename = os.path.join(root.get_path(), root.get_filename())
+            self._parser.stream_bank(filename, self)
+
+    def _get_depth(self, node):
+        depth = 0
+        parent = node.get_parent()
+        while parent:
+            depth += 1
+            parent = parent.get_parent()
+        return depth
+
+    def start_bank(self, bank):
+        self._stream_chunks = 0
+        self._stream_printed = False
+        if self._stream_xml:
+            # written once some chunk is printed (may be skipped)
+            self._stream_root = self._get_xml_tag(bank.get_nodename(), bank.get_attr_items())
+        else:
+            self._print_txt_node(bank, 0, 0)
+
+    def stream_item(self, list, item):
+        spool = self._spools.get(list)
+        if not spool:
+            spool = _DumpSpool()
+            self._spools[list] = spool
+
+        depth = self._get_depth(item)
+        if self._stream_xml:
+            lines = []
+            if self._print_xml_node(item, depth, lines):
+                spool.printed = True
+            spool.file.write(''.join(lines))
+        else:
+            outfile = self._file
+            self._file = spool.file
+            self._print_txt_node(item, depth * 3, spool.count)
+            self._file = outfile
+        spool.count += 1
+
+    def end_chunk(self, chunk):
+        self._stream_chunks += 1
+        if self._stream_xml:
+            lines = []
+            if self._print_xml_node(chunk, 1, lines):
+                if not self._stream_printed:
+                    self._file.write("<%s%s>\n" % self._stream_root)
+                    self._stream_printed = True
+                for line in lines:
+                    if type(line) is _DumpSpool:
+                        line.copy_to(self._file)
+                    else:
+                        self._file.write(line)
+        else:
+            self._print_txt_node(chunk, 3, None)
+
+        for spool in self._spools.values():
+            spool.close()
+        self._spools = {}
+
+    def end_bank(self, bank):
+        if not self._stream_xml:
+            return
+        if self._stream_printed:
+            self._file.write("</%s>\n" % (self._stream_root[0]))
+        elif not self._stream_chunks:
+            lines = []
+            self._print_xml_node(bank, 0, lines)
+            self._file.write(''.join(lines))
+
+
+# list items printed to a temp file
+class _DumpSpool(object):
+    def __init__(self):
+        self.file = tempfile.TemporaryFile('w+', encoding='utf-8', newline='')
+        self.count = 0
+        self.printed = False
+
+    def copy_to(self, outfile):
+        self.file.seek(0)
+        shutil.copyfileobj(self.file, outfile)
+
+    def close(self):
+        self.file.close()
@@ -154,7 +154,7 @@ class NodePrinter(object):
         nodeid = id(node)
         nodename = node.get_nodename()
         name = node.get_name()
-        attrs = node.get_attrs()
+        attrs = dict(node.get_attr_items()) #made once and shared by stop checks and templates
         children = node.get_children()
         body = ""
         extra = ""
@@ -1,11 +1,11 @@
 import sys, argparse, glob, logging, os, platform, shlex
 
 from . import wversion, wlogs, wtests
-from .names import wnames
-from .parser import wparser
+from .names import wnames, wnamecache
+from .parser import wparser, wcache, wmodel, wstats
 from .viewer import wdumper, wview
 from .generator import wgenerator, wtags, wlocator
-from .tools import wcleaner
+from .tools import wcleaner, wscanner
 from . import wfnv
 
 
@@ -46,12 +46,20 @@ class Cli(object):
         p.add_argument('-c',  '--config',               help="Set config text file\nAllows same CLI options but in a text file\n(may split commands into multiple lines)\n(write '#@new' to start a new process in the same file)")
         p.add_argument('-d',  '--dump-type',            help="Set dump type: txt|xml|xsl|xsl_s|xsl_xs|none (default: auto)", metavar='TYPE')
         p.add_argument('-dn', '--dump-name',            help="Set dump filename (default: auto)", metavar='NAME')
+        p.add_argument('-ds', '--dump-stream',          help="Dump banks while parsing them, without loading them in memory\n(for huge banks, only when dumping without other options)", action='store_true')
         p.add_argument('-l',  '--log',                  help="Write info to wwiser log (has extra messages)", action='store_true')
         p.add_argument('-v',  '--viewer',               help="Start the viewer", action='store_true')
         p.add_argument('-vp', '--viewer-port',          help="Set the viewer port", metavar='PORT', default=wview.DEFAULT_PORT)
         #p.add_argument('-iv', '--ignore-version',      help="Ignore bank version check", action='store_true')
         p.add_argument('-sl', '--save-lst',             help="Clean wwnames.txt and include missing hashnames\n(needs dump set)", action='store_true')
         p.add_argument('-br', '--bank-repeat',          help="Override repeated banks handling:\n  manual / first / last / smallest / biggest / biggest+last")
+        p.add_argument('-j',  '--jobs',                 help="Parse banks and big wwnames.txt in N processes (default: 1)\n(faster when loading many banks)", metavar='N', type=int)
+        p.add_argument('-bc', '--bank-cache',           help="Save parsed banks to a cache folder and load them from there next time\n(faster when loading the same banks often, default folder: wwiser.cache)", metavar='DIR', nargs='?', const='*')
+        p.add_argument('-bcr','--bank-cache-rebuild',   help="Ignore cached banks (parse and save them again)", action='store_true')
+        p.add_argument('-bcm','--bank-cache-max',       help="Set max cache folder size in MB (default: 256)\n(least recently used banks are removed first)", metavar='MB', type=int)
+        p.add_argument('-pf', '--prefetch',             help="Read next banks in memory while parsing, up to MB\n(faster when loading many banks from slow storage)", metavar='MB', type=int)
+        p.add_argument('-sc', '--scan',                 help="Print bank info reading headers only (version/id/lang/chunks/HIRC items)\n(quick check of many banks, scans in all CPUs unless -j is set)", action='store_true')
+        p.add_argument('-scf','--scan-format',          help="Set scan output format: table|json (default: table)", metavar='FORMAT')
 
         p = parser.add_argument_group('txtp options')
         p.add_argument('-g',  '--txtp',                 help="Generate TXTP", action='store_true')
@@ -98,7 +106,16 @@ class Cli(object):
 
         p = parser.add_argument_group('extra options (for testing)')
         p.add_argument('-nl', '--names-lst',            help="Set wwnames.txt companion file (default: auto)", metavar='NAME')
-        p.add_argument('-nd', '--names-db',             help="Set wwnames.db3 companion file (default: auto)", metavar='NAME')
+        p.add_argument('-nd', '--names-db',             help="Set wwnames.db3 companion file (default: auto)\n(or a wwnames.wwidx index, used by default if there is no wwnames.db3)", metavar='NAME')
+        p.add_argument('-nbi','--names-build-index',    help="Make a wwnames.wwidx name index from files (wwnames.db3/wwnames.txt)\n(faster than wwnames.db3 for huge name lists)", metavar='NAME')
+        p.add_argument('-nc', '--names-cache',          help="Save names parsed from companion files (SoundbanksInfo.xml, etc) to a cache folder\nand load them from there while files don't change (default folder: wwiser.cache)", metavar='DIR', nargs='?', const='*')
+        p.add_argument('-ncr','--names-cache-rebuild',  help="Ignore cached names (parse companion files and save them again)", action='store_true')
+        p.add_argument('-pl', '--parse-lazy',           help="Parse HIRC objects on demand, when used\n(faster when generating a few filtered TXTP from big banks)", action='store_true')
+        p.add_argument('-pp', '--parse-profile',        help="Set bank parse profile: auto|full|txtp (default: auto)\n(auto skips details not needed for TXTP when only generating them)", metavar='PROFILE')
+        p.add_argument('-pg', '--parse-gc',             help="Set garbage collector handling when parsing: auto|pause|none (default: auto)\n(auto pauses it while parsing and freezes loaded banks, so later\npasses when generating TXTP skip them)", metavar='MODE')
+        p.add_argument('-ps', '--profile-parse',        help="Print parse time/bytes/nodes/errors per chunk and HIRC type\n(to find out what makes banks slow to parse)", action='store_true')
+        p.add_argument('-psj','--profile-parse-json',   help="Save parse profile to JSON file too (for comparing versions)", metavar='FILE')
+        p.add_argument('-rm', '--reader-mode',          help="Set bank reader mode: auto|mmap|file (default: auto)\n(auto memory-maps banks when possible)", metavar='MODE')
         p.add_argument('-sd', '--save-db',              help="Save/update wwnames.db3 with hashnames used in fields\n(needs dump set, or save-all)", action='store_true')
         p.add_argument('-gm', '--txtp-move',            help="Move all .wem referenced in loaded banks to wem dir", action='store_true')
 
@@ -255,7 +272,11 @@ class Cli(object):
             logging.info("no valid files found")
             return
 
-        if args.multi:
+        if args.scan:
+            self._scan(args, filenames)
+        elif args.names_build_index:
+            wnames.build_index(args.names_build_index, filenames)
+        elif args.multi:
             for filename in filenames:
                 self._execute(args, [filename])
         else:
@@ -264,17 +285,69 @@ class Cli(object):
         logging.info("(done)")
 
 
+    def _scan(self, args, filenames):
+        jobs = args.jobs
+        if not jobs:
+            jobs = os.cpu_count()
+
+        parser = wparser.Parser()
+        parser.set_reader_mode(args.reader_mode)
+        parser.set_jobs(jobs)
+
+        scanner = wscanner.Scanner(parser, filenames)
+        scanner.set_format(args.scan_format)
+        scanner.process()
+
     def _execute(self, args, filenames):
 
+        # default dump type
+        if args.dump_type is None:
+            if args.save_lst:
+                 #forces all names without making a file
+                args.dump_type = wdumper.TYPE_EMPTY
+            elif args.txtp or args.viewer:
+                # not very useful for txtp/viewer
+                args.dump_type = wdumper.TYPE_NONE
+            else:
+                # default without other flags
+                args.dump_type = wdumper.TYPE_XSL_SMALLER
+
+        stream = self._get_stream(args)
+
+        gcstats = wlogs.GcStats()
+        gcstats.start()
+
         # process banks
         parser = wparser.Parser()
         #parser.set_ignore_version(args.ignore_version)
+        parser.set_reader_mode(args.reader_mode)
+        parser.set_lazy(args.parse_lazy)
+        parser.set_jobs(args.jobs)
+        parser.set_profile(self._get_profile(args))
+        parser.set_stream(stream)
+        parser.set_repeat_mode(args.bank_repeat)
+        parser.set_gc_mode(args.parse_gc)
+        parse_stats = None
+        if args.profile_parse or args.profile_parse_json:
+            parse_stats = wstats.ParseStats()
+            parser.set_parse_stats(parse_stats)
+        if args.prefetch:
+            parser.set_prefetch(args.prefetch * 1024 * 1024)
+        if args.bank_cache:
+            cache = wcache.BankCache(args.bank_cache, args.bank_cache_max)
+            cache.set_rebuild(args.bank_cache_rebuild)
+            parser.set_cache(cache)
         parser.parse_banks(filenames)
         banks = parser.get_banks(args.bank_repeat)
 
 
         # load names
         names = wnames.Names()
+        names.set_jobs(args.jobs)
+        if args.names_cache:
+            names_cache = wnamecache.NameCache(args.names_cache)
+            names_cache.set_rebuild(args.names_cache_rebuild)
+            names.set_cache(names_cache)
         names.parse_files(banks, parser.get_filenames(), lst=args.names_lst, db=args.names_db)
         parser.set_names(names)
 
@@ -286,20 +359,17 @@ class Cli(object):
             else:
                 dump_name = 'banks'
 
-        # default dump type
-        if args.dump_type is None:
-            if args.save_lst:
-                 #forces all names without making a file
-                args.dump_type = wdumper.TYPE_EMPTY
-            elif args.txtp or args.viewer:
-                # not very useful for txtp/viewer
-                args.dump_type = wdumper.TYPE_NONE
-            else:
-                # default without other flags
-                args.dump_type = wdumper.TYPE_XSL_SMALLER
         dumper = wdumper.DumpPrinter(banks, args.dump_type, dump_name)
+        if stream:
+            dumper.set_stream(parser)
         dumper.dump()
 
+        # after dumping as streamed banks are parsed then
+        if parse_stats:
+            parse_stats.print_table()
+            if args.profile_parse_json:
+                parse_stats.save_json(args.profile_parse_json)
+
         # start viewer
         if args.viewer:
             viewer = wview.Viewer(parser)
@@ -350,6 +420,32 @@ class Cli(object):
         if args.tests:
             wtests.Tests().main()
 
+        gcstats.stop()
+        gcstats.report()
+        parser.unfreeze_gc()
+
+    # banks can be parsed while dumping only if nothing else uses them
+    def _get_stream(self, args):
+        if not args.dump_stream:
+            return False
+
+        dump_file = args.dump_type not in [wdumper.TYPE_EMPTY, wdumper.TYPE_NONE]
+        if not dump_file or args.txtp or args.viewer or args.file_cleaner:
+            logging.info("dump stream ignored (only for dumps without other options)")
+            return False
+        return True
+
+    # banks only need full detail if something shows or saves them
+    def _get_profile(self, args):
+        profile = args.parse_profile
+        if profile and profile != 'auto':
+            return profile
+
+        txtp_only = args.txtp and args.dump_type == wdumper.TYPE_NONE and not args.viewer
+        if txtp_only and not args.save_lst and not args.save_db:
+            return wmodel.PROFILE_TXTP
+        return wmodel.PROFILE_FULL
+
     def _generate(self, args, banks, locator, names, tags):
             # generate txtp
         if not args.txtp:
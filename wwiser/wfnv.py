@@ -1,5 +1,14 @@
 import re
 
+# optional, for faster bulk hashing
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# min names to use numpy (setup is slower for a few names)
+NUMPY_MIN_NAMES = 256
+
 class Fnv(object):
     FNV_DICT = '0123456789abcdefghijklmnopqrstuvwxyz_'
     FNV_FORMAT = re.compile(r"^[a-z_][a-z0-9\_]*$")
@@ -51,9 +60,7 @@ class Fnv(object):
         hash = 2166136261 #FNV offset basis
 
         for namebyte in namebytes:  #for i in range(len(namebytes)):
-            hash = hash * 16777619 #FNV prime
-            hash = hash ^ namebyte #FNV xor
-            hash = hash & 0xFFFFFFFF #python clamp
+            hash = ((hash * 16777619) ^ namebyte) & 0xFFFFFFFF #FNV prime, FNV xor, python clamp (single op is faster)
         return hash
 
     def get_hash(self, name):
@@ -62,3 +69,41 @@ class Fnv(object):
     def get_hash_lw(self, lowname):
         namebytes = bytes(lowname, 'UTF-8')
         return self._get_hash(namebytes)
+
+    # Same as get_hash_lw for a list of names, returning a list of hashes. Faster for big lists
+    # (like wwnames.txt tokens) when numpy is installed.
+    def get_hashes_lw(self, lownames):
+        names = [bytes(lowname, 'UTF-8') for lowname in lownames]
+        if numpy and len(names) >= NUMPY_MIN_NAMES:
+            return self._get_hashes_numpy(names)
+        return [self._get_hash(namebytes) for namebytes in names]
+
+    # Hashes all names at once, one char column at a time. Names are sorted by length (longest
+    # first) and put in a zero-padded matrix, so each column only updates names that reach it.
+    def _get_hashes_numpy(self, names):
+        count = len(names)
+        lengths = numpy.fromiter(map(len, names), dtype=numpy.int64, count=count)
+        order = numpy.argsort(-lengths, kind='stable')
+        lengths = lengths[order]
+        max_length = int(lengths[0]) if count else 0
+
+        # place each name's bytes in its row
+        data = numpy.frombuffer(b''.join([names[i] for i in order.tolist()]), dtype=numpy.uint8)
+        rows = numpy.repeat(numpy.arange(count), lengths)
+        starts = numpy.repeat(numpy.cumsum(lengths) - lengths, lengths)
+        cols = numpy.arange(len(data)) - starts
+        matrix = numpy.zeros((count, max_length), dtype=numpy.uint8)
+        matrix[rows, cols] = data
+
+        # names reaching each column (lengths are descending)
+        actives = numpy.searchsorted(-lengths, -numpy.arange(max_length), side='left')
+
+        hashes = numpy.full(count, 2166136261, dtype=numpy.uint32) #FNV offset basis
+        prime = numpy.uint32(16777619) #FNV prime (uint32 math clamps)
+        for col in range(max_length):
+            active = actives[col]
+            hashes[:active] = (hashes[:active] * prime) ^ matrix[:active, col]
+
+        results = numpy.empty(count, dtype=numpy.uint32)
+        results[order] = hashes
+        return results.tolist()
@@ -1,4 +1,4 @@
-import logging
+import logging, gc, time
 
 
 def setup_clean_logging():
@@ -38,6 +38,34 @@ def setup_file_logging():
             filename='wwiser.log'
     )
 
+# captures log records (for sending from worker processes to the main process)
+def setup_records_logging(level):
+    setup_clean_logging()
+    handler = _RecordsLogHandler()
+    logging.root.addHandler(handler)
+    logging.root.setLevel(level)
+    return handler.records
+
+# re-emits captured log records in the current process' handlers
+def replay_records(records):
+    for record in records:
+        logging.getLogger(record.name).handle(record)
+
+class _RecordsLogHandler(logging.Handler):
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.records = []
+
+    def emit(self, record):
+        # args/exceptions may not be picklable, so make the final message
+        msg = self.format(record)
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = msg
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        self.records.append(record)
+
 class _GuiLogHandler(logging.Handler):
     def __init__(self, txt):
         logging.Handler.__init__(self)
@@ -50,3 +78,31 @@ class _GuiLogHandler(logging.Handler):
         txt.insert('end', msg + '\n')
         txt.see('end')
         txt.config(state='disabled')
+
+# Counts gc collections and time spent in them between start and stop, for reports
+class GcStats(object):
+    def __init__(self):
+        self._counts = [0] * len(gc.get_count()) #per generation
+        self._elapsed = 0.0
+        self._start = None
+
+    def start(self):
+        gc.callbacks.append(self._callback)
+
+    def stop(self):
+        if self._callback in gc.callbacks:
+            gc.callbacks.remove(self._callback)
+
+    def _callback(self, phase, info):
+        if phase == 'start':
+            self._start = time.perf_counter()
+            return
+        if self._start is None:
+            return
+        self._elapsed += time.perf_counter() - self._start
+        self._counts[info['generation']] += 1
+        self._start = None
+
+    def report(self):
+        gens = ', '.join('gen%i %i' % (i, count) for i, count in enumerate(self._counts))
+        logging.debug("gc: %i collections (%s), %.3fs paused, %i frozen objects", sum(self._counts), gens, self._elapsed, gc.get_freeze_count())